@@ -0,0 +1,106 @@
+"""
+BENCHMARK - CAMPAIGN JSON MERGE PEAK MEMORY
+Generates synthetic master/working campaign databases and runs merge_json_campaigns
+and sync_campaigns in fresh processes, in-memory vs streaming, reporting wall time
+and peak RSS of each
+
+    python3 scripts/bench_campaign_merge.py [--campaigns 10000] [--compact] [--json]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict
+
+from sync_bench_data import make_campaign_databases
+from sync_metrics import peak_rss_mb
+
+
+def _child(operation: str, mode: str, directory: str, compact: bool) -> Dict:
+    """One measured run (in its own process, so peak RSS is not shared between modes)"""
+    import shutil
+    from sync_system import ThreeLayerSync
+
+    output_dir = os.path.join(directory, f"{operation}-{mode}")
+    os.makedirs(output_dir, exist_ok=True)
+    working_copy = os.path.join(output_dir, 'working.json')
+    shutil.copyfile(os.path.join(directory, 'working.json'), working_copy)
+    # Only the campaign paths are used; everything the sync writes stays in output_dir
+    sync = ThreeLayerSync(
+        master_paths={'json_campaigns': os.path.join(directory, 'master.json')},
+        working_paths={'json_campaigns': working_copy, 'json_app': os.path.join(output_dir, 'app.json')},
+        temporal_paths={'csv': os.path.join(output_dir, 'temp', 'merged.csv'),
+                        'json_campaigns': os.path.join(output_dir, 'merged.json'),
+                        'conflicts': os.path.join(output_dir, 'temp', 'merge_conflicts.json')},
+        backup_dir=os.path.join(output_dir, 'backups')
+    )
+    sync.backup_all_files = lambda reason='': None
+
+    baseline_mb = peak_rss_mb()
+    started = time.perf_counter()
+    if operation == 'merge':
+        sync.merge_json_campaigns(streaming=mode == 'streaming', compact=compact)
+        output = sync.temporal_paths['json_campaigns']
+    else:
+        sync.sync_campaigns(streaming=mode == 'streaming', compact=compact)
+        output = sync.working_paths['json_app']
+    return {
+        "seconds": round(time.perf_counter() - started, 2),
+        "baseline_rss_mb": round(baseline_mb, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "output": output,
+        "output_mb": round(os.path.getsize(output) / (1024 * 1024), 1)
+    }
+
+
+def _contractors(path: str) -> Dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['contractors']
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="In-memory vs streaming campaign merge (peak RSS)")
+    parser.add_argument('--campaigns', type=int, default=10_000)
+    parser.add_argument('--sequences', type=int, default=5)
+    parser.add_argument('--body-bytes', type=int, default=1200)
+    parser.add_argument('--compact', action='store_true')
+    parser.add_argument('--json', action='store_true')
+    parser.add_argument('--child', nargs=3, metavar=('OPERATION', 'MODE', 'DIR'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_child(*args.child, compact=args.compact)))
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory(prefix='bench_campaigns_') as directory:
+        paths = make_campaign_databases(directory, args.campaigns, args.sequences, args.body_bytes)
+        input_mb = {side: round(os.path.getsize(path) / (1024 * 1024), 1) for side, path in paths.items()}
+
+        results = {"campaigns": args.campaigns, "input_mb": input_mb, "runs": {}}
+        for operation in ('merge', 'sync'):
+            for mode in ('in_memory', 'streaming'):
+                command = [sys.executable, os.path.abspath(__file__), '--child', operation, mode, directory]
+                if args.compact:
+                    command.append('--compact')
+                completed = subprocess.run(command, capture_output=True, text=True, check=True,
+                                           cwd=os.path.dirname(os.path.abspath(__file__)))
+                results['runs'][f"{operation}/{mode}"] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+        # Both modes must produce the same campaigns (checked last: loading them is what the children avoid)
+        for operation in ('merge', 'sync'):
+            outputs = [results['runs'][f"{operation}/{mode}"]['output'] for mode in ('in_memory', 'streaming')]
+            assert _contractors(outputs[0]) == _contractors(outputs[1]), f"{operation}: outputs differ"
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"📊 Campaign merge: {args.campaigns} campaigns "
+              f"(master {input_mb['master']} MB, working {input_mb['working']} MB)")
+        for name, run in results['runs'].items():
+            print(f"  {name:<20} {run['seconds']:>7.2f} s | peak RSS {run['peak_rss_mb']:>8.1f} MB "
+                  f"(after imports {run['baseline_rss_mb']:.1f} MB) | output {run['output_mb']} MB")
@@ -0,0 +1,221 @@
+"""
+BENCHMARK - CAMPAIGN RECORDS VS DICTS
+Loads synthetic master/working campaign databases (sync_bench_data) as plain
+dicts and as sync_campaign_records models, each in a fresh process, and runs
+the two campaign merges on them:
+
+    overlay  merge_json_campaigns (working processing_status / sequences over master)
+    status   sync_campaigns' _merge_campaign_data (master content + working email status)
+
+Reports memory retained by the loaded databases and by the merge results
+(tracemalloc), load time, merge throughput and serialization time per model.
+The dict model is the sync's default, records are opt-in
+(SYNC_CAMPAIGN_RECORDS=1); both must produce the same JSON. With --compare, records results more than the
+threshold slower or bigger than an earlier run are regressions (exit 1).
+
+    python3 scripts/bench_campaign_records.py [--campaigns 10000] [--runs 3]
+                                              [--output records.json] [--compare baseline.json]
+"""
+
+import hashlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+from sync_bench_data import make_campaign_databases
+from sync_campaign_records import CAMPAIGN_MODELS, plain_database
+
+MODELS = ('dict', 'records')
+
+
+# Loaded, merged and written the way ThreeLayerSync does it with each model
+IMPLEMENTATIONS: Dict[str, Dict[str, Callable]] = {
+    name: {"load": model.load, "overlay": model.overlay, "status": model.status}
+    for name, model in CAMPAIGN_MODELS.items()
+}
+
+
+# ----------------------------------------------------------------------
+# Measured steps
+# ----------------------------------------------------------------------
+
+def _load(path: str, load: Callable) -> Dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return load(f)['contractors']
+
+
+def _overlay_all(master: Dict, working: Dict, overlay: Callable) -> Dict:
+    merged = dict(master)
+    for contractor_id, working_campaign in working.items():
+        merged[contractor_id] = overlay(merged.get(contractor_id), working_campaign)
+    return merged
+
+
+def _status_all(master: Dict, working: Dict, status: Callable) -> Tuple[Dict, Dict]:
+    contractors = {}
+    changes = {}
+    for contractor_id, master_data in master.items():
+        contractors[contractor_id], sequence_changes = status(master_data, working.get(contractor_id))
+        if sequence_changes:
+            changes[contractor_id] = sequence_changes
+    return contractors, changes
+
+
+def _dumps(contractors: Dict) -> str:
+    return json.dumps(plain_database({"contractors": contractors}), indent=2, ensure_ascii=False)
+
+
+def _child(model: str, directory: str, runs: int) -> Dict:
+    """One model, in its own process so tracemalloc and the allocator start clean"""
+    functions = IMPLEMENTATIONS[model]
+    paths = {side: os.path.join(directory, f"{side}.json") for side in ('master', 'working')}
+
+    # Memory: what the loaded databases and the merge results keep alive
+    tracemalloc.start()
+    master = _load(paths['master'], functions['load'])
+    working = _load(paths['working'], functions['load'])
+    loaded_bytes, load_peak_bytes = tracemalloc.get_traced_memory()
+    overlaid = _overlay_all(master, working, functions['overlay'])
+    merged_bytes = tracemalloc.get_traced_memory()[0] - loaded_bytes
+    synced = _status_all(master, working, functions['status'])
+    synced_bytes = tracemalloc.get_traced_memory()[0] - loaded_bytes - merged_bytes
+    tracemalloc.stop()
+    digests = {"overlay": hashlib.sha1(_dumps(overlaid).encode('utf-8')).hexdigest(),
+               "status": hashlib.sha1((_dumps(synced[0]) + json.dumps(synced[1])).encode('utf-8')).hexdigest()}
+    del overlaid, synced
+
+    # Time: median of runs
+    timings = {"load": [], "overlay": [], "status": [], "write": []}
+    for _ in range(runs):
+        started = time.perf_counter()
+        master = _load(paths['master'], functions['load'])
+        working = _load(paths['working'], functions['load'])
+        timings['load'].append(time.perf_counter() - started)
+        started = time.perf_counter()
+        overlaid = _overlay_all(master, working, functions['overlay'])
+        timings['overlay'].append(time.perf_counter() - started)
+        started = time.perf_counter()
+        synced = _status_all(master, working, functions['status'])
+        timings['status'].append(time.perf_counter() - started)
+        started = time.perf_counter()
+        _dumps(overlaid)
+        timings['write'].append(time.perf_counter() - started)
+        del overlaid, synced
+
+    seconds = {step: round(statistics.median(values), 4) for step, values in timings.items()}
+    return {
+        "loaded_mb": round(loaded_bytes / (1024 * 1024), 2),
+        "load_peak_mb": round(load_peak_bytes / (1024 * 1024), 2),
+        "overlay_result_mb": round(merged_bytes / (1024 * 1024), 2),
+        "status_result_mb": round(synced_bytes / (1024 * 1024), 2),
+        "seconds": seconds,
+        "campaigns_per_second": {step: round(len(working if step == 'overlay' else master) / max(seconds[step], 1e-9))
+                                 for step in ('overlay', 'status')},
+        "digests": digests
+    }
+
+
+# Smaller is better for all of these
+COMPARED_METRICS = ('loaded_mb', 'overlay_result_mb', 'status_result_mb', 'seconds.load', 'seconds.overlay',
+                    'seconds.status', 'seconds.write')
+
+
+def _metric(result: Dict, name: str) -> float:
+    value = result
+    for part in name.split('.'):
+        value = value[part]
+    return value
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """Records results against an earlier results file, flagged above 1 + threshold"""
+    previous = baseline.get('results', {}).get('records')
+    if previous is None:
+        return []
+    rows = []
+    for name in COMPARED_METRICS:
+        before, after = _metric(previous, name), _metric(current['results']['records'], name)
+        ratio = after / max(before, 1e-9)
+        rows.append({"metric": name, "before": before, "after": after, "ratio": round(ratio, 3),
+                     "regression": ratio > 1 + threshold})
+    return rows
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Campaign merges on dicts vs sync_campaign_records")
+    parser.add_argument('--campaigns', type=int, default=10_000)
+    parser.add_argument('--sequences', type=int, default=5)
+    parser.add_argument('--body-bytes', type=int, default=1200)
+    parser.add_argument('--runs', type=int, default=3, help="Timed runs per model (the median is reported)")
+    parser.add_argument('--output', help="Save the results JSON to this path")
+    parser.add_argument('--compare', help="Earlier results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Allowed growth before flagging")
+    parser.add_argument('--json', action='store_true', help="Print results as JSON only")
+    parser.add_argument('--child', nargs=2, metavar=('MODEL', 'DIR'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_child(*args.child, runs=args.runs)))
+        sys.exit(0)
+
+    results = {
+        "suite": "campaign_records",
+        "created": datetime.now().isoformat(),
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "config": {"campaigns": args.campaigns, "sequences": args.sequences, "body_bytes": args.body_bytes,
+                   "runs": args.runs},
+        "results": {}
+    }
+    with tempfile.TemporaryDirectory(prefix='bench_records_') as directory:
+        make_campaign_databases(directory, args.campaigns, args.sequences, args.body_bytes)
+        for model in MODELS:
+            command = [sys.executable, os.path.abspath(__file__), '--child', model, directory, '--runs', str(args.runs)]
+            completed = subprocess.run(command, capture_output=True, text=True, check=True,
+                                       cwd=os.path.dirname(os.path.abspath(__file__)))
+            results['results'][model] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    # Both models must merge to the same JSON
+    digests = [results['results'][model].pop('digests') for model in MODELS]
+    assert digests[0] == digests[1], f"dict and records merges differ: {digests}"
+
+    comparison = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            comparison = compare(results, json.load(f), args.threshold)
+        results['comparison'] = {"baseline": args.compare, "threshold": args.threshold, "rows": comparison}
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        dicts, records = results['results']['dict'], results['results']['records']
+        print(f"📊 Campaign records vs dicts: {args.campaigns} campaigns x {args.sequences} emails ({args.runs} runs)")
+        for name in COMPARED_METRICS:
+            before, after = _metric(dicts, name), _metric(records, name)
+            unit = 's' if name.startswith('seconds') else 'MB'
+            print(f"  {name:<20} dict {before:>9.3f} {unit:<2} | records {after:>9.3f} {unit:<2} "
+                  f"| x{after / max(before, 1e-9):.2f}")
+        for step in ('overlay', 'status'):
+            print(f"  {step + ' throughput':<20} dict {dicts['campaigns_per_second'][step]:>9,} /s | "
+                  f"records {records['campaigns_per_second'][step]:>9,} /s")
+        for row in comparison or []:
+            flag = "❌ regression" if row['regression'] else "✅"
+            print(f"  {flag} {row['metric']:<20} x{row['ratio']:.2f} vs baseline")
+        if args.output:
+            print(f"💾 Results: {args.output}")
+
+    sys.exit(1 if any(row['regression'] for row in comparison or []) else 0)
@@ -0,0 +1,204 @@
+"""
+BENCHMARK - STARTUP AND IMPORT COST PER CLI COMMAND
+Every /api/sync request spawns a fresh `python3 sync_system.py ...`, so import
+time is paid per request. This runs each command against a small synthetic
+SYNC_ROOT under `python -X importtime` and reports wall time, total import
+time, modules imported and whether pandas / numpy were loaded.
+
+Commands listed in sync_system.STDLIB_COMMANDS must not load them: doing so is
+always reported as a regression. With --compare, import time above the
+baseline by more than the threshold (and IMPORT_SLACK_MS) is one too.
+
+    python3 scripts/bench_startup.py [--runs 5] [--output startup.json] [--compare baseline.json]
+"""
+
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SYNC_SCRIPT = os.path.join(SCRIPTS_DIR, 'sync_system.py')
+
+# Imports that only frame-based commands may pay for
+HEAVY_MODULES = ('pandas', 'numpy')
+
+# Import time growth below this is noise, whatever the ratio
+IMPORT_SLACK_MS = 5.0
+
+BENCH_CONTRACTORS = 200
+
+
+def _commands(root: str, nombre_id: str) -> List[List[str]]:
+    batch_path = os.path.join(root, 'nombre_batch.json')
+    with open(batch_path, 'w', encoding='utf-8') as f:
+        json.dump({nombre_id: 'Startup Batch'}, f)
+    return [
+        ['--status'],
+        ['--status', '--json'],
+        ['--journal'],
+        ['--list-backups'],
+        ['--changes-since', '0'],
+        ['--schedule', '2025-09-01', '2025-09-30'],
+        ['--sync-campaigns'],
+        ['--update-nombre', nombre_id, 'Startup Bench'],
+        ['--update-nombre-batch', batch_path],
+        ['--apply-nombre-changes'],
+        ['--backup'],
+        ['--prune-backups'],
+        ['--full-sync'],
+    ]
+
+
+def prepare(root: str) -> str:
+    """A small profile root (ROOT_LAYOUT) after one full sync, returns a contractor id in both CSVs"""
+    from bench_sync_suite import generate
+    from sync_profiles import ROOT_LAYOUT
+
+    data_dir = os.path.join(root, 'data')
+    os.makedirs(data_dir, exist_ok=True)
+    meta = generate(data_dir, BENCH_CONTRACTORS, campaign_share=0.5, raw_json_bytes=2000, seed=7)
+    sources = {
+        ('master_paths', 'csv'): 'master.csv',
+        ('master_paths', 'json_campaigns'): 'master.json',
+        ('working_paths', 'csv'): 'working.csv',
+        ('working_paths', 'json_campaigns'): 'working.json',
+        ('working_paths', 'json_app'): 'working.json',
+    }
+    for (group, file_type), name in sources.items():
+        destination = os.path.join(root, ROOT_LAYOUT[group][file_type])
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        shutil.copyfile(os.path.join(data_dir, name), destination)
+    _run(root, ['--full-sync'])
+    return meta['nombre_id']
+
+
+def _run(root: str, argv: List[str], importtime: bool = False) -> subprocess.CompletedProcess:
+    env = {**os.environ, 'SYNC_ROOT': root}
+    env.pop('SYNC_PROFILE', None)
+    command = [sys.executable, *(['-X', 'importtime'] if importtime else []), SYNC_SCRIPT, *argv]
+    completed = subprocess.run(command, capture_output=True, text=True, env=env, cwd=SCRIPTS_DIR)
+    if completed.returncode != 0:
+        raise RuntimeError(f"sync_system.py {' '.join(argv)} failed:\n{completed.stdout[-1000:]}{completed.stderr[-2000:]}")
+    return completed
+
+
+def parse_importtime(stderr: str) -> Dict:
+    """Total self time (ms), module count and heavy packages of one -X importtime log"""
+    total_us = 0
+    modules = 0
+    heavy = set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        total_us += int(self_us)
+        modules += 1
+        package = name.strip().split('.')[0]
+        if package in HEAVY_MODULES:
+            heavy.add(package)
+    return {"import_ms": round(total_us / 1000, 2), "modules": modules, "heavy": sorted(heavy)}
+
+
+def bench_command(root: str, argv: List[str], runs: int) -> Dict:
+    walls = []
+    imports = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        completed = _run(root, argv, importtime=True)
+        walls.append((time.perf_counter() - started) * 1000)
+        imports.append(parse_importtime(completed.stderr))
+    median_import = statistics.median(sample['import_ms'] for sample in imports)
+    return {
+        "wall_ms": round(statistics.median(walls), 2),
+        "import_ms": round(median_import, 2),
+        "modules": imports[-1]['modules'],
+        "heavy": sorted(set().union(*(sample['heavy'] for sample in imports)))
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    rows = []
+    for command, result in current['results'].items():
+        previous = baseline.get('results', {}).get(command)
+        if previous is None:
+            continue
+        ratio = result['import_ms'] / max(previous['import_ms'], 1e-9)
+        rows.append({
+            "command": command,
+            "import_ms": {"before": previous['import_ms'], "after": result['import_ms'], "ratio": round(ratio, 3)},
+            "new_heavy": sorted(set(result['heavy']) - set(previous['heavy'])),
+            "regression": (ratio > 1 + threshold and result['import_ms'] - previous['import_ms'] > IMPORT_SLACK_MS)
+                          or bool(set(result['heavy']) - set(previous['heavy']))
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from sync_system import STDLIB_COMMANDS
+
+    parser = argparse.ArgumentParser(description="Startup / import cost of each sync_system.py command")
+    parser.add_argument('--runs', type=int, default=5, help="Runs per command (the median is reported)")
+    parser.add_argument('--output', help="Save the results JSON to this path")
+    parser.add_argument('--compare', help="Earlier results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Allowed import time growth before flagging")
+    parser.add_argument('--json', action='store_true', help="Print results as JSON only")
+    args = parser.parse_args()
+
+    results = {
+        "suite": "startup",
+        "created": datetime.now().isoformat(),
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "config": {"runs": args.runs, "contractors": BENCH_CONTRACTORS},
+        "results": {}
+    }
+    root = tempfile.mkdtemp(prefix='bench_startup_')
+    try:
+        nombre_id = prepare(root)
+        for argv in _commands(root, nombre_id):
+            result = bench_command(root, argv, args.runs)
+            result["stdlib_only"] = argv[0] in STDLIB_COMMANDS
+            result["regression"] = result["stdlib_only"] and bool(result['heavy'])
+            results['results'][' '.join(argv).replace(root, '<root>')] = result
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    comparison = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            comparison = compare(results, json.load(f), args.threshold)
+        results['comparison'] = {"baseline": args.compare, "threshold": args.threshold, "rows": comparison}
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    regressions = [command for command, result in results['results'].items() if result['regression']]
+    regressions += [row['command'] for row in comparison or [] if row['regression']]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"📊 sync_system.py startup ({args.runs} runs, {BENCH_CONTRACTORS} contractors)")
+        for command, result in results['results'].items():
+            flag = "❌" if result['regression'] else "✅"
+            heavy = ', '.join(result['heavy']) or 'stdlib only'
+            print(f"  {flag} {command:<38} wall {result['wall_ms']:>8.1f} ms | imports {result['import_ms']:>7.1f} ms "
+                  f"({result['modules']:>4} modules) | {heavy}")
+        for row in comparison or []:
+            flag = "❌ regression" if row['regression'] else "✅"
+            print(f"  {flag} {row['command']:<38} imports x{row['import_ms']['ratio']:.2f}"
+                  + (f" | now loads {', '.join(row['new_heavy'])}" if row['new_heavy'] else ''))
+        if args.output:
+            print(f"💾 Results: {args.output}")
+
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,134 @@
+"""
+BENCHMARK - COLD SPAWN VS WARM SYNC SERVICE
+Times the same sync_system.py command run as a fresh `python3` process per call
+(what /api/sync does today) against a request to an already-running sync_service.py
+
+    python3 scripts/bench_sync_service.py [--runs 10] [--json] [-- --status]
+"""
+
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SYNC_SCRIPT = os.path.join(SCRIPTS_DIR, 'sync_system.py')
+SERVICE_SCRIPT = os.path.join(SCRIPTS_DIR, 'sync_service.py')
+
+
+def _summarize(samples_ms: List[float]) -> Dict:
+    ordered = sorted(samples_ms)
+    p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+    return {
+        "runs": len(ordered),
+        "mean_ms": round(statistics.mean(ordered), 2),
+        "median_ms": round(statistics.median(ordered), 2),
+        "p95_ms": round(ordered[p95_index], 2),
+        "min_ms": round(ordered[0], 2),
+        "max_ms": round(ordered[-1], 2)
+    }
+
+
+def bench_cold(argv: List[str], runs: int) -> Dict:
+    """One fresh interpreter per command: startup + imports + __init__ + parse + work"""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, SYNC_SCRIPT, *argv], stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=False)
+        samples.append((time.perf_counter() - started) * 1000)
+    return _summarize(samples)
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_service(url: str, timeout: float) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/health", timeout=1) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.05)
+    raise RuntimeError(f"Sync service did not come up at {url} within {timeout}s")
+
+
+def _post_run(url: str, argv: List[str]) -> Dict:
+    request = urllib.request.Request(
+        f"{url}/run",
+        data=json.dumps({"args": argv}).encode('utf-8'),
+        headers={'Content-Type': 'application/json'},
+        method='POST'
+    )
+    with urllib.request.urlopen(request, timeout=60) as response:
+        return json.loads(response.read())
+
+
+def bench_warm(argv: List[str], runs: int) -> Dict:
+    """Round trip to a running service (HTTP + command only, datasets already parsed)"""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    service = subprocess.Popen([sys.executable, SERVICE_SCRIPT, '--port', str(port)],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        startup_started = time.perf_counter()
+        _wait_for_service(url, timeout=60)
+        startup_ms = (time.perf_counter() - startup_started) * 1000
+
+        samples = []
+        server_side = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            result = _post_run(url, argv)
+            samples.append((time.perf_counter() - started) * 1000)
+            server_side.append(result['duration_ms'])
+
+        summary = _summarize(samples)
+        summary["server_median_ms"] = round(statistics.median(server_side), 2)
+        summary["service_startup_ms"] = round(startup_ms, 2)
+        return summary
+    finally:
+        service.terminate()
+        service.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Cold-spawn vs warm-service sync latency")
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--json', action='store_true', help="Print results as JSON only")
+    parser.add_argument('command', nargs=argparse.REMAINDER,
+                        help="sync_system.py arguments to benchmark (default: --status)")
+    args = parser.parse_args()
+
+    command = [a for a in args.command if a != '--'] or ['--status']
+
+    results = {
+        "command": command,
+        "cold_spawn": bench_cold(command, args.runs),
+        "warm_service": bench_warm(command, args.runs)
+    }
+    results["speedup_median"] = round(
+        results["cold_spawn"]["median_ms"] / max(results["warm_service"]["median_ms"], 0.001), 1
+    )
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"📊 Benchmark: sync_system.py {' '.join(command)} ({args.runs} runs)")
+        for label in ('cold_spawn', 'warm_service'):
+            r = results[label]
+            print(f"  {label:<13} median {r['median_ms']:>9.2f} ms | p95 {r['p95_ms']:>9.2f} ms | mean {r['mean_ms']:>9.2f} ms")
+        print(f"  ⚡ Warm service is {results['speedup_median']}x faster (median)")
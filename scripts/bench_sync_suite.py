@@ -0,0 +1,277 @@
+"""
+BENCHMARK - THREE LAYER SYNC SUITE
+Generates production-shaped master/working contractor CSVs and campaign databases
+(sync_bench_data) at several sizes and times the main ThreeLayerSync operations,
+each in a fresh process against its own copy of the data:
+
+    merge_csv_contractors, merge_json_campaigns, full_sync, sync_campaigns, update_nombre_field
+
+Reports wall time, throughput, peak RSS and I/O per operation (from the
+operation's sync_metrics report). Results can be saved as JSON and compared with
+an earlier run to catch regressions:
+
+    python3 scripts/bench_sync_suite.py [--sizes 1000,10000,100000] [--runs 3] [--warm]
+                                        [--output results.json] [--compare baseline.json]
+"""
+
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from typing import Dict, List
+
+from sync_bench_data import RAW_JSON_BYTES, make_campaign_databases, make_contractor_csvs
+
+# Read-only operations first: later ones rewrite working files (each run gets its own copy anyway)
+OPERATIONS = ('merge_csv_contractors', 'merge_json_campaigns', 'full_sync', 'sync_campaigns', 'update_nombre_field')
+
+# What an operation's throughput counts
+OPERATION_UNITS = {
+    'merge_csv_contractors': 'contractors',
+    'merge_json_campaigns': 'campaigns',
+    'full_sync': 'contractors',
+    'sync_campaigns': 'campaigns',
+    'update_nombre_field': 'updates'
+}
+
+DATA_FILES = ('master.csv', 'working.csv', 'master.json', 'working.json')
+
+
+def generate(directory: str, contractors: int, campaign_share: float, raw_json_bytes: int, seed: int) -> Dict:
+    """Write the data set for one size into directory (reused when the parameters match)"""
+    params = {"contractors": contractors, "campaign_share": campaign_share,
+              "raw_json_bytes": raw_json_bytes, "seed": seed}
+    meta_path = os.path.join(directory, 'meta.json')
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['params'] == params and all(os.path.exists(os.path.join(directory, name)) for name in DATA_FILES):
+            return meta
+    except (OSError, ValueError, KeyError):
+        pass
+
+    csvs = make_contractor_csvs(directory, contractors, raw_json_bytes=raw_json_bytes, seed=seed)
+    campaigns = int(contractors * campaign_share)
+    make_campaign_databases(directory, campaigns, seed=seed, contractor_ids=csvs['shared_ids'])
+    meta = {
+        "params": params,
+        "campaigns": campaigns,
+        # A contractor in both CSVs, addressed by its zero-padded form like the app does
+        "nombre_id": f"{csvs['shared_ids'][0]:05d}",
+        "input_mb": {name: round(os.path.getsize(os.path.join(directory, name)) / (1024 * 1024), 1)
+                     for name in DATA_FILES}
+    }
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def _sync_for(run_dir: str):
+    from sync_system import ThreeLayerSync
+
+    return ThreeLayerSync(
+        master_paths={'csv': os.path.join(run_dir, 'master.csv'),
+                      'json_enhanced': os.path.join(run_dir, 'enhanced.json'),
+                      'json_campaigns': os.path.join(run_dir, 'master.json')},
+        working_paths={'csv': os.path.join(run_dir, 'working.csv'),
+                       'json_campaigns': os.path.join(run_dir, 'working.json'),
+                       'json_app': os.path.join(run_dir, 'app.json')},
+        temporal_paths={'csv': os.path.join(run_dir, 'temp', 'merged_contractors.csv'),
+                        'json_campaigns': os.path.join(run_dir, 'temp', 'merged_campaigns.json'),
+                        'conflicts': os.path.join(run_dir, 'temp', 'merge_conflicts.json')},
+        backup_dir=os.path.join(run_dir, 'backups')
+    )
+
+
+def _child(operation: str, run_dir: str, nombre_id: str, warm: bool) -> Dict:
+    """One measured operation (in its own process, so caches and peak RSS start clean)"""
+    from sync_metrics import peak_rss_mb, reset_peak_rss
+
+    sync = _sync_for(run_dir)
+    run = {
+        'merge_csv_contractors': sync.merge_csv_contractors,
+        'merge_json_campaigns': sync.merge_json_campaigns,
+        'full_sync': sync.full_sync,
+        'sync_campaigns': sync.sync_campaigns,
+        'update_nombre_field': lambda: sync.update_nombre_field(nombre_id, 'Benchmark Owner')
+    }[operation]
+    if warm:
+        # Untimed first pass: snapshots, stat caches and the backup store are populated
+        run()
+    reset_peak_rss()
+    baseline_mb = peak_rss_mb()
+    result = run()
+    if result is False:
+        raise RuntimeError(f"{operation} failed")
+
+    report = sync.metrics.last
+    return {
+        "seconds": report['wall_seconds'],
+        "cpu_seconds": report['cpu_seconds'],
+        "peak_rss_mb": report['peak_rss_mb'],
+        "baseline_rss_mb": round(baseline_mb, 1),
+        "read_mb": round(report['read_bytes'] / (1024 * 1024), 1),
+        "written_mb": round(report['written_bytes'] / (1024 * 1024), 1),
+        "stages": {name: stage['wall_seconds'] for name, stage in report['stages'].items()}
+    }
+
+
+def _run_dir(data_dir: str, scratch: str) -> str:
+    """A private copy of the data set (hardlinks: every sync writer replaces files, none edits in place)"""
+    run_dir = tempfile.mkdtemp(prefix='run_', dir=scratch)
+    for name in DATA_FILES:
+        source = os.path.join(data_dir, name)
+        try:
+            os.link(source, os.path.join(run_dir, name))
+        except OSError:
+            shutil.copyfile(source, os.path.join(run_dir, name))
+    return run_dir
+
+
+def bench_size(data_dir: str, meta: Dict, runs: int, warm: bool, operations: List[str]) -> Dict:
+    units = {'contractors': meta['params']['contractors'], 'campaigns': meta['campaigns'], 'updates': 1}
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='bench_runs_', dir=data_dir) as scratch:
+        for operation in operations:
+            samples = []
+            for _ in range(runs):
+                run_dir = _run_dir(data_dir, scratch)
+                command = [sys.executable, os.path.abspath(__file__), '--child', operation, run_dir, meta['nombre_id']]
+                if warm:
+                    command.append('--warm')
+                completed = subprocess.run(command, capture_output=True, text=True,
+                                           cwd=os.path.dirname(os.path.abspath(__file__)))
+                if completed.returncode != 0:
+                    raise RuntimeError(f"{operation} failed:\n{completed.stderr[-2000:]}")
+                samples.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+                shutil.rmtree(run_dir, ignore_errors=True)
+
+            seconds = statistics.median(sample['seconds'] for sample in samples)
+            unit = OPERATION_UNITS[operation]
+            median_run = min(samples, key=lambda sample: abs(sample['seconds'] - seconds))
+            results[operation] = {
+                **median_run,
+                "seconds": round(seconds, 3),
+                "runs": [sample['seconds'] for sample in samples],
+                "peak_rss_mb": max(sample['peak_rss_mb'] for sample in samples),
+                "throughput": round(units[unit] / max(seconds, 1e-9), 1),
+                "throughput_unit": f"{unit}/s"
+            }
+    return results
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """Per size/operation ratios against an earlier results file, flagged above 1 + threshold"""
+    rows = []
+    for size, operations in current['results'].items():
+        for operation, result in operations.items():
+            previous = baseline.get('results', {}).get(size, {}).get(operation)
+            if previous is None:
+                continue
+            row = {"size": size, "operation": operation}
+            for metric in ('seconds', 'peak_rss_mb'):
+                ratio = result[metric] / max(previous[metric], 1e-9)
+                row[metric] = {"before": previous[metric], "after": result[metric], "ratio": round(ratio, 3)}
+            row["regression"] = any(row[metric]['ratio'] > 1 + threshold for metric in ('seconds', 'peak_rss_mb'))
+            rows.append(row)
+    return rows
+
+
+def _versions() -> Dict:
+    import numpy as np
+    import pandas as pd
+    return {"python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+            "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="ThreeLayerSync benchmark suite on synthetic data")
+    parser.add_argument('--sizes', default='1000,10000,100000', help="Contractor counts, comma separated")
+    parser.add_argument('--runs', type=int, default=3, help="Runs per operation (the median is reported)")
+    parser.add_argument('--operations', default=','.join(OPERATIONS))
+    parser.add_argument('--warm', action='store_true', help="Time a second pass (caches populated)")
+    parser.add_argument('--campaign-share', type=float, default=0.5, help="Contractors that have a campaign")
+    parser.add_argument('--raw-json-bytes', type=int, default=RAW_JSON_BYTES)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--data-dir', help="Keep generated data here and reuse it on later runs")
+    parser.add_argument('--output', help="Save the results JSON to this path")
+    parser.add_argument('--compare', help="Earlier results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.1, help="Allowed slowdown/growth before flagging")
+    parser.add_argument('--json', action='store_true', help="Print results as JSON only")
+    parser.add_argument('--child', nargs=3, metavar=('OPERATION', 'DIR', 'NOMBRE_ID'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_child(*args.child, warm=args.warm)))
+        sys.exit(0)
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    operations = [operation for operation in args.operations.split(',') if operation]
+    unknown = set(operations).difference(OPERATIONS)
+    if unknown:
+        parser.error(f"Unknown operations: {', '.join(sorted(unknown))}")
+
+    results = {
+        "suite": "three_layer_sync",
+        "created": datetime.now().isoformat(),
+        "environment": _versions(),
+        "config": {"runs": args.runs, "warm": args.warm, "campaign_share": args.campaign_share,
+                   "raw_json_bytes": args.raw_json_bytes, "seed": args.seed},
+        "inputs": {},
+        "results": {}
+    }
+    data_root = args.data_dir
+    cleanup = None
+    if data_root is None:
+        cleanup = tempfile.TemporaryDirectory(prefix='bench_sync_suite_')
+        data_root = cleanup.name
+    try:
+        for size in sizes:
+            data_dir = os.path.join(data_root, f"contractors_{size}")
+            os.makedirs(data_dir, exist_ok=True)
+            if not args.json:
+                print(f"⏳ {size} contractors: generating/checking data in {data_dir}", file=sys.stderr)
+            meta = generate(data_dir, size, args.campaign_share, args.raw_json_bytes, args.seed)
+            results['inputs'][str(size)] = {"campaigns": meta['campaigns'], "input_mb": meta['input_mb']}
+            results['results'][str(size)] = bench_size(data_dir, meta, args.runs, args.warm, operations)
+    finally:
+        if cleanup is not None:
+            cleanup.cleanup()
+
+    comparison = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            comparison = compare(results, json.load(f), args.threshold)
+        results['comparison'] = {"baseline": args.compare, "threshold": args.threshold, "rows": comparison}
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for size, operations_results in results['results'].items():
+            inputs = results['inputs'][size]
+            print(f"📊 {size} contractors, {inputs['campaigns']} campaigns "
+                  f"(CSV {inputs['input_mb']['master.csv']} MB, campaigns {inputs['input_mb']['master.json']} MB)")
+            for operation, result in operations_results.items():
+                print(f"  {operation:<22} {result['seconds']:>8.3f} s | {result['throughput']:>10.1f} "
+                      f"{result['throughput_unit']:<14} | peak RSS {result['peak_rss_mb']:>7.1f} MB | "
+                      f"read {result['read_mb']:>7.1f} MB | written {result['written_mb']:>7.1f} MB")
+        for row in comparison or []:
+            flag = "❌ regression" if row['regression'] else "✅"
+            print(f"  {flag} {row['size']:>7} {row['operation']:<22} time x{row['seconds']['ratio']:.2f} "
+                  f"| peak RSS x{row['peak_rss_mb']['ratio']:.2f}")
+        if args.output:
+            print(f"💾 Results: {args.output}")
+
+    sys.exit(1 if comparison and any(row['regression'] for row in comparison) else 0)
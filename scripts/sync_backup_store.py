@@ -0,0 +1,295 @@
+"""
+BACKUP STORE - CONTENT-ADDRESSED, DEDUPLICATED FILE VERSIONS
+Each file version is stored once under its SHA-256 (optionally gzip-compressed)
+and every backup is a small manifest pointing at those objects, so backing up
+unchanged data costs a hash check instead of a full copy
+
+Layout:
+    <root>/objects/ab/abcdef...[.gz]   file contents
+    <root>/manifests/sync_<ts>.json    one manifest per backup
+    <root>/stat_cache.json             path -> (mtime, size, sha256) to skip re-hashing
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Files at least this large are stored gzip-compressed (None disables compression)
+COMPRESS_MIN_BYTES = 1024 * 1024
+COMPRESS_LEVEL = 3
+
+# Retention: newest N backups are always kept, plus the newest backup of each of the last D days
+KEEP_LAST = 20
+KEEP_DAYS = 7
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BackupStore:
+    def __init__(self, root: str, compress_min_bytes: Optional[int] = COMPRESS_MIN_BYTES):
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        self.manifests_dir = os.path.join(root, 'manifests')
+        self.stat_cache_path = os.path.join(root, 'stat_cache.json')
+        self.compress_min_bytes = compress_min_bytes
+        # Cost of the last snapshot(): files, bytes, hashed_bytes, stored_bytes, new_manifest
+        self.last_snapshot = None
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.manifests_dir, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Objects
+    # ------------------------------------------------------------------
+
+    def _object_path(self, sha256: str, compressed: bool) -> str:
+        name = f"{sha256}.gz" if compressed else sha256
+        return os.path.join(self.objects_dir, sha256[:2], name)
+
+    def _find_object(self, sha256: str) -> Optional[str]:
+        for compressed in (False, True):
+            path = self._object_path(sha256, compressed)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _store_object(self, source_path: str, sha256: str, size: int) -> str:
+        """Copy a file into the object store unless that content is already there"""
+        existing = self._find_object(sha256)
+        if existing:
+            return existing
+
+        compressed = self.compress_min_bytes is not None and size >= self.compress_min_bytes
+        object_path = self._object_path(sha256, compressed)
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        tmp_path = f"{object_path}.tmp-{os.getpid()}"
+        with open(source_path, 'rb') as src:
+            if compressed:
+                with gzip.open(tmp_path, 'wb', compresslevel=COMPRESS_LEVEL) as dst:
+                    shutil.copyfileobj(src, dst, CHUNK_SIZE)
+            else:
+                with open(tmp_path, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, CHUNK_SIZE)
+        os.replace(tmp_path, object_path)
+        return object_path
+
+    # ------------------------------------------------------------------
+    # Hashing with a stat cache
+    # ------------------------------------------------------------------
+
+    def _load_stat_cache(self) -> Dict:
+        try:
+            with open(self.stat_cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def hash_cache(self) -> Dict:
+        """path -> {"mtime_ns", "size", "sha256"} of every file hashed by a backup"""
+        return self._load_stat_cache()
+
+    def _save_stat_cache(self, cache: Dict) -> None:
+        tmp_path = f"{self.stat_cache_path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, self.stat_cache_path)
+
+    @staticmethod
+    def _hash_with_cache(path: str, stat: os.stat_result, cache: Dict) -> str:
+        """Reuse the recorded hash while mtime and size are unchanged"""
+        entry = cache.get(path)
+        if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            return entry['sha256']
+        sha256 = file_sha256(path)
+        cache[path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": sha256}
+        return sha256
+
+    # ------------------------------------------------------------------
+    # Manifests
+    # ------------------------------------------------------------------
+
+    def snapshot(self, files: Dict[str, str], reason: str = '') -> str:
+        """
+        Back up {label: path} and return the manifest id
+
+        Content already in the store is not copied again. When every file matches
+        the latest manifest no new manifest is written and its id is returned.
+        What it cost (bytes hashed, bytes stored) is left in .last_snapshot.
+        """
+        stat_cache = self._load_stat_cache()
+        entries = {}
+        cost = {"files": 0, "bytes": 0, "hashed_bytes": 0, "stored_bytes": 0, "new_manifest": False}
+        for label, path in files.items():
+            if not os.path.exists(path):
+                continue
+            stat = os.stat(path)
+            cached = stat_cache.get(path)
+            if not (cached and cached['mtime_ns'] == stat.st_mtime_ns and cached['size'] == stat.st_size):
+                cost['hashed_bytes'] += stat.st_size
+            sha256 = self._hash_with_cache(path, stat, stat_cache)
+            if self._find_object(sha256) is None:
+                cost['stored_bytes'] += stat.st_size
+            object_path = self._store_object(path, sha256, stat.st_size)
+            cost['files'] += 1
+            cost['bytes'] += stat.st_size
+            entries[label] = {
+                "path": path,
+                "sha256": sha256,
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "compressed": object_path.endswith('.gz')
+            }
+        self._save_stat_cache(stat_cache)
+
+        self.last_snapshot = cost
+
+        latest = self.latest_manifest()
+        if latest and self._same_content(latest['files'], entries):
+            logger.info(f"Backup unchanged since {latest['id']}")
+            return latest['id']
+
+        manifest_id = f"sync_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        manifest = {
+            "id": manifest_id,
+            "created": datetime.now().isoformat(),
+            "reason": reason,
+            "files": entries
+        }
+        tmp_path = os.path.join(self.manifests_dir, f".{manifest_id}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path(manifest_id))
+        cost['new_manifest'] = True
+
+        previous_shas = {entry['sha256'] for entry in (latest or {}).get('files', {}).values()}
+        new_versions = sum(1 for entry in entries.values() if entry['sha256'] not in previous_shas)
+        logger.info(f"Backup {manifest_id}: {len(entries)} files, {new_versions} new versions")
+        return manifest_id
+
+    @staticmethod
+    def _same_content(previous: Dict, current: Dict) -> bool:
+        return (previous.keys() == current.keys()
+                and all(previous[label]['sha256'] == current[label]['sha256']
+                        and previous[label]['path'] == current[label]['path'] for label in current))
+
+    def manifest_path(self, manifest_id: str) -> str:
+        return os.path.join(self.manifests_dir, f"{manifest_id}.json")
+
+    def manifest_ids(self) -> List[str]:
+        """All manifest ids, newest first"""
+        return sorted(
+            (name[:-len('.json')] for name in os.listdir(self.manifests_dir)
+             if name.endswith('.json') and not name.startswith('.')),
+            reverse=True
+        )
+
+    def load_manifest(self, manifest_id: str) -> Dict:
+        with open(self.manifest_path(manifest_id), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def latest_manifest(self) -> Optional[Dict]:
+        ids = self.manifest_ids()
+        return self.load_manifest(ids[0]) if ids else None
+
+    def list_manifests(self, limit: Optional[int] = None) -> List[Dict]:
+        return [self.load_manifest(manifest_id) for manifest_id in self.manifest_ids()[:limit]]
+
+    # ------------------------------------------------------------------
+    # Restore
+    # ------------------------------------------------------------------
+
+    def restore(self, manifest_id: str, labels: Optional[Iterable[str]] = None,
+                target_dir: Optional[str] = None) -> Dict[str, str]:
+        """
+        Write files of a manifest back and return {label: restored path}
+
+        By default files go back to their original paths (atomically replaced);
+        with target_dir they are written there as <label>_<basename> instead.
+        """
+        manifest = self.load_manifest(manifest_id)
+        selected = list(labels) if labels else list(manifest['files'])
+        unknown = [label for label in selected if label not in manifest['files']]
+        if unknown:
+            raise KeyError(f"Labels not in backup {manifest_id}: {', '.join(unknown)}")
+
+        restored = {}
+        for label in selected:
+            entry = manifest['files'][label]
+            object_path = self._find_object(entry['sha256'])
+            if object_path is None:
+                raise FileNotFoundError(f"Missing object {entry['sha256']} for {label} in {manifest_id}")
+
+            if target_dir:
+                os.makedirs(target_dir, exist_ok=True)
+                destination = os.path.join(target_dir, f"{label}_{os.path.basename(entry['path'])}")
+            else:
+                destination = entry['path']
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+
+            tmp_path = f"{destination}.restore-{os.getpid()}"
+            opener = gzip.open if object_path.endswith('.gz') else open
+            with opener(object_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+                shutil.copyfileobj(src, dst, CHUNK_SIZE)
+            os.replace(tmp_path, destination)
+            restored[label] = destination
+            logger.info(f"Restored {label} from {manifest_id}: {destination}")
+        return restored
+
+    # ------------------------------------------------------------------
+    # Retention
+    # ------------------------------------------------------------------
+
+    def prune(self, keep_last: int = KEEP_LAST, keep_days: int = KEEP_DAYS) -> Dict:
+        """Drop manifests outside the retention policy, then objects no manifest references"""
+        ids = self.manifest_ids()
+        keep = set(ids[:keep_last])
+
+        cutoff = (datetime.now() - timedelta(days=keep_days)).strftime('%Y%m%d')
+        newest_per_day = {}
+        for manifest_id in ids:
+            day = manifest_id[len('sync_'):len('sync_') + 8]
+            if day >= cutoff and day not in newest_per_day:
+                newest_per_day[day] = manifest_id
+        keep.update(newest_per_day.values())
+
+        removed_manifests = [manifest_id for manifest_id in ids if manifest_id not in keep]
+        for manifest_id in removed_manifests:
+            os.remove(self.manifest_path(manifest_id))
+
+        referenced = set()
+        for manifest_id in keep:
+            referenced.update(entry['sha256'] for entry in self.load_manifest(manifest_id)['files'].values())
+
+        removed_objects = 0
+        freed_bytes = 0
+        for shard in os.listdir(self.objects_dir):
+            shard_dir = os.path.join(self.objects_dir, shard)
+            for name in os.listdir(shard_dir):
+                if name.split('.')[0] not in referenced:
+                    object_path = os.path.join(shard_dir, name)
+                    freed_bytes += os.path.getsize(object_path)
+                    os.remove(object_path)
+                    removed_objects += 1
+
+        if removed_manifests or removed_objects:
+            logger.info(f"Pruned {len(removed_manifests)} backups and {removed_objects} objects ({freed_bytes} bytes)")
+        return {
+            "manifests_removed": len(removed_manifests),
+            "manifests_kept": len(keep),
+            "objects_removed": removed_objects,
+            "bytes_freed": freed_bytes
+        }
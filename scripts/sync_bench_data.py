@@ -0,0 +1,300 @@
+"""
+BENCHMARK DATA - SYNTHETIC CONTRACTOR CSVS AND CAMPAIGN DATABASES
+Generators shared by the bench_*.py scripts. The data follows the production
+files rather than a toy schema:
+
+- contractor CSVs with the 207 columns of the contractor sheet (same names and
+  order, including its unnamed column, a ~7 KB raw_json_record and five review
+  texts per row) plus the app's nombre column
+- the ID quirks seen in the wild: master ids are plain ("4549"), working ids
+  are a mix of plain, zero-padded ("04549") and float ("4549.0"), campaign keys
+  and raw_json_record carry the zero-padded form
+- campaign databases with the MASTER_CAMPAIGN_DATABASE structure (campaign_data
+  with email_sequences keyed by email_number, contact_timing, ...); the working
+  copy adds the execution status the app records per email
+
+Everything is seeded, so a size and seed always produce the same files.
+"""
+
+import os
+import random
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from sync_json_stream import JsonObjectWriter
+
+WORDS = ['roofing', 'estimate', 'schedule', 'inspection', 'warranty', 'crew', 'quote', 'permit',
+         'gutter', 'storm', 'insurance', 'shingle', 'review', 'follow-up', 'season', 'project']
+
+STATES = [('KY', 'Kentucky'), ('KS', 'Kansas'), ('TX', 'Texas'), ('OH', 'Ohio'), ('FL', 'Florida')]
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+TRADES = ['Roofing contractor', 'Plumber', 'Electrician', 'HVAC contractor', 'General contractor']
+
+# Average size of raw_json_record in the production sheet
+RAW_JSON_BYTES = 7000
+
+# Rows generated per pandas chunk (bounds generator memory at 100k contractors)
+CHUNK_ROWS = 5000
+
+
+def _contractor_columns() -> List[str]:
+    """Column names of the contractor sheet, in file order"""
+    review = ['rating', 'text', 'date', 'relative_time', 'author', 'keywords']
+    opportunity = ['id', 'category', 'title', 'severity', 'est_value_low', 'est_value_high', 'evidence',
+                   'solution_outline', 'playbook_hint', 'priority', 'channels', 'success_metrics']
+    psi = [f"{device}_{metric}" for device in ('mobile', 'desktop', 'avg')
+           for metric in ('performance', 'accessibility', 'best_practices', 'seo')]
+    l1 = [
+        'company_name', 'category', 'primary_email', None, 'phone', 'phone_unformatted', 'website',
+        'address_full', 'street', 'city', 'state_code', 'state_full', 'postal_code', 'country', 'latitude',
+        'longitude', 'google_maps_url', 'email_count', 'emails_found', 'has_email', 'source_file',
+        'google_rating', 'google_reviews_count', 'google_place_id', 'google_maps_reviews_url', 'business_status',
+        'business_types', 'price_level', 'has_opening_hours', 'is_open_now', 'weekday_hours',
+        'reviews_total_analyzed', 'reviews_average_rating', 'latest_review_date', 'days_since_latest_review',
+        'review_frequency', 'review_targeting_flags', 'targeting_business_health', 'targeting_outreach_priority',
+        'targeting_best_approach', 'targeting_pain_points', 'targeting_opportunities', 'targeting_timing',
+        *(f"review_{n}_{field}" for n in range(1, 6) for field in review),
+        'whois_domain', 'whois_registrar', 'whois_creation_date', 'whois_expiry_date', 'whois_domain_age_years',
+        'whois_days_until_expiry', 'whois_recently_registered', 'whois_expiring_soon',
+        'builder_platform', 'builder_category', 'builder_method', 'builder_timestamp', 'builder_is_detected',
+        'builder_status', 'builder_detection_scope',
+        *(f"psi_{name}" for name in psi),
+        'psi_mobile_fid', 'psi_desktop_fid', 'psi_mobile_cls', 'psi_desktop_cls', 'psi_mobile_lcp_ms',
+        'psi_desktop_lcp_ms'
+    ]
+    l2 = ['email_quality', 'website_normalized', 'utm_removed', 'normalized_domain', 'geo_validation',
+          'reviews_recency_bucket', 'performance_mobile_bucket', 'performance_desktop_bucket',
+          'cms_vs_hosting_consistency', 'sophistication_score', 'sophistication_classification',
+          'sophistication_indicators', 'trust_score', 'targeting_flags']
+    l3 = ['owner_names', 'family_owned_is_family', 'family_owned_indicators', 'family_owned_confidence',
+          'phone_area_zone', 'brand_cluster_key', 'franchise_chain', 'platform_triangulation_cms',
+          'platform_triangulation_hosting', 'platform_triangulation_dns_hint', 'platform_triangulation_whois_registrar',
+          'platform_triangulation_conflict', 'platform_triangulation_confidence', 'sophistication_intelligence_score',
+          'sophistication_intelligence_tier', 'sophistication_intelligence_email_score',
+          'sophistication_intelligence_phone_score', 'sophistication_intelligence_address_score',
+          'sophistication_intelligence_business_types_score', 'email_intelligence_domain_type',
+          'email_intelligence_credibility_score', 'email_intelligence_professional_setup',
+          'email_intelligence_credibility_gap', 'owner_names_enhanced_detected', 'owner_names_enhanced_confidence',
+          'owner_names_enhanced_method', 'address_intelligence_sophistication_level', 'address_intelligence_tier',
+          'address_intelligence_type', 'industry_psychology_triggers', 'industry_psychology_multiplier',
+          'industry_psychology_profile']
+    l4 = [*(f"opportunity_{n}_{field}" for n in range(1, 4) for field in opportunity), 'total_opportunities_count']
+    l5 = ['targeting_sophistication_tier', 'targeting_pricing_psychology', 'targeting_urgency_triggers',
+          'targeting_credibility_gaps', 'targeting_improvement_opportunities', 'outreach_primary_angle',
+          'outreach_messaging_framework', 'outreach_conversion_probability', 'outreach_competition_level']
+    return [
+        'business_id', 'schema_version', 'processing_timestamp', 'data_completion_score', 'validation_flags',
+        'layers_present', 'data_sources',
+        # The sheet has one unnamed column right after L1_primary_email
+        *('' if name is None else f"L1_{name}" for name in l1),
+        *(f"L2_{name}" for name in l2), *(f"L3_{name}" for name in l3),
+        *(f"L4_{name}" for name in l4), *(f"L5_{name}" for name in l5),
+        'data_freshness_days', 'raw_json_record'
+    ]
+
+
+SHEET_COLUMNS = _contractor_columns()
+CONTRACTOR_COLUMNS = SHEET_COLUMNS + ['nombre']
+
+
+def _empty_share(name: str) -> float:
+    """How often a column is blank (sparser enrichment layers, later reviews/opportunities)"""
+    if name.startswith('L1_review_') and name.split('_')[2].isdigit():
+        return 0.15 * int(name.split('_')[2])
+    if name.startswith('L4_opportunity_'):
+        return {'1': 0.05, '2': 0.7, '3': 0.95}[name.split('_')[2]]
+    if name.startswith(('L1_psi_', 'L1_whois_', 'L3_owner_names', 'L3_platform_triangulation_')):
+        return 0.6
+    if name == 'nombre':
+        return 0.97
+    return 0.1
+
+
+def _text_pool(rng: np.random.Generator, count: int, words: int) -> np.ndarray:
+    return np.array([' '.join(rng.choice(WORDS, words)) for _ in range(count)], dtype=object)
+
+
+def _column_values(name: str, ids: np.ndarray, rng: np.random.Generator, pools: Dict,
+                   raw_json_bytes: int) -> np.ndarray:
+    n = len(ids)
+    if name == 'raw_json_record':
+        filler = pools['raw'][:max(raw_json_bytes - 80, 0)]
+        return np.array([f'{{"BUSINESS_ID":"{contractor_id:05d}","SCHEMA_VERSION":"4.0.0",'
+                         f'"LAYER_1_FIXED_DATA":"{filler}"}}' for contractor_id in ids], dtype=object)
+    if name == 'schema_version':
+        return np.full(n, '4.0.0', dtype=object)
+    if name.endswith('_text') or name.endswith('_evidence') or name.endswith('weekday_hours'):
+        return pools['long'][rng.integers(0, len(pools['long']), n)]
+    if name.endswith(('_date', '_timestamp')):
+        days = rng.integers(0, 3000, n)
+        return (pd.Timestamp('2017-01-01') + pd.to_timedelta(days, unit='D')).strftime('%Y-%m-%d').to_numpy(dtype=object)
+    if name.endswith(('_score', '_rating', '_count', '_performance', '_accessibility', '_best_practices',
+                      '_seo', '_ms', '_priority', '_low', '_high', '_days', '_level')):
+        return rng.integers(0, 100, n).astype(str).astype(object)
+    if name.endswith(('_confidence', '_multiplier', '_cls', '_fid', '_years', 'latitude', 'longitude')):
+        return np.round(rng.random(n) * 10, 4).astype(str).astype(object)
+    if name.startswith(('L1_has_', 'L1_is_')) or name.endswith(('_detected', '_registered', '_soon', '_chain',
+                                                                    '_conflict', '_family', '_removed', '_setup')) \
+            or name == '':
+        return rng.integers(0, 2, n).astype(str).astype(object)
+    if name == 'L1_state_code':
+        return np.array([STATES[i][0] for i in rng.integers(0, len(STATES), n)], dtype=object)
+    return pools['short'][rng.integers(0, len(pools['short']), n)]
+
+
+def _contractor_frame(ids: np.ndarray, id_text: Sequence[str], processed_from: str,
+                      rng: np.random.Generator, pools: Dict, raw_json_bytes: int) -> pd.DataFrame:
+    n = len(ids)
+    data = {}
+    for name in CONTRACTOR_COLUMNS:
+        if name == 'business_id':
+            values = np.array(id_text, dtype=object)
+        elif name == 'processing_timestamp':
+            seconds = rng.integers(0, 86400 * 30, n)
+            values = (pd.Timestamp(processed_from) + pd.to_timedelta(seconds, unit='s')) \
+                .strftime('%Y-%m-%dT%H:%M:%S.000Z').to_numpy(dtype=object)
+        else:
+            values = _column_values(name, ids, rng, pools, raw_json_bytes)
+            values = values.copy()
+            values[rng.random(n) < _empty_share(name)] = ''
+        data[name] = values
+    return pd.DataFrame(data, columns=CONTRACTOR_COLUMNS)
+
+
+def _working_id(contractor_id: int, draw: float) -> str:
+    """The working CSV mixes plain, zero-padded and float-formatted ids"""
+    if draw < 0.25:
+        return f"{contractor_id:05d}"
+    if draw < 0.4:
+        return f"{contractor_id}.0"
+    return str(contractor_id)
+
+
+def make_contractor_csvs(directory: str, contractors: int, overlap: float = 0.9, edited: float = 0.05,
+                         raw_json_bytes: int = RAW_JSON_BYTES, seed: int = 7) -> Dict:
+    """
+    master.csv + working.csv with `contractors` rows each
+
+    `overlap` of the master contractors are also in working (the rest of working
+    is working-only); working was processed later except for an `edited` share of
+    rows where master is newer. Returns {"master", "working": path, "shared_ids",
+    "master_ids", "working_only_ids": [int]}.
+    """
+    rng = np.random.default_rng(seed)
+    pools = {
+        'short': _text_pool(rng, 400, 3),
+        'long': _text_pool(rng, 400, 40),
+        'raw': ' '.join(rng.choice(WORDS, raw_json_bytes // 5 + 1))[:raw_json_bytes]
+    }
+    # Sparse, unordered ids like the production sheet's
+    universe = rng.permutation(np.arange(1, contractors * 3 + 1))
+    master_ids = universe[:contractors]
+    shared_count = int(contractors * overlap)
+    shared_ids = master_ids[:shared_count]
+    working_only_ids = universe[contractors:contractors + contractors - shared_count]
+
+    paths = {"master": os.path.join(directory, 'master.csv'), "working": os.path.join(directory, 'working.csv')}
+    os.makedirs(directory, exist_ok=True)
+    with open(paths['master'], 'w', encoding='utf-8', newline='') as master_file, \
+            open(paths['working'], 'w', encoding='utf-8', newline='') as working_file:
+        for start in range(0, contractors, CHUNK_ROWS):
+            chunk_ids = master_ids[start:start + CHUNK_ROWS]
+            master_df = _contractor_frame(chunk_ids, [str(i) for i in chunk_ids], '2025-08-01', rng, pools,
+                                          raw_json_bytes)
+            master_df.to_csv(master_file, index=False, header=start == 0)
+
+            # Working: the shared rows with tracking edits, newer timestamps and quirky ids
+            shared_mask = start + np.arange(len(chunk_ids)) < shared_count
+            working_df = master_df[shared_mask].copy()
+            working_df['business_id'] = [_working_id(i, draw) for i, draw in
+                                         zip(chunk_ids[shared_mask], rng.random(shared_mask.sum()))]
+            master_newer = rng.random(len(working_df)) < edited
+            working_df['processing_timestamp'] = np.where(
+                master_newer,
+                working_df['processing_timestamp'].str.replace('2025-08-', '2025-07-', regex=False),
+                working_df['processing_timestamp'].str.replace('2025-08-', '2025-09-', regex=False)
+            )
+            for name in ('L1_targeting_outreach_priority', 'L2_trust_score', 'L5_outreach_conversion_probability'):
+                changed = rng.random(len(working_df)) < 0.1
+                working_df.loc[changed, name] = pools['short'][rng.integers(0, len(pools['short']), changed.sum())]
+            working_df.to_csv(working_file, index=False, header=start == 0)
+
+        for start in range(0, len(working_only_ids), CHUNK_ROWS):
+            chunk_ids = working_only_ids[start:start + CHUNK_ROWS]
+            working_df = _contractor_frame(chunk_ids, [_working_id(i, draw) for i, draw in
+                                                       zip(chunk_ids, rng.random(len(chunk_ids)))],
+                                           '2025-09-01', rng, pools, raw_json_bytes)
+            working_df.to_csv(working_file, index=False, header=False)
+
+    return {**paths, "master_ids": master_ids.tolist(), "shared_ids": shared_ids.tolist(),
+            "working_only_ids": working_only_ids.tolist()}
+
+
+def _campaign(rng: random.Random, contractor_id: str, sequences: int, body_bytes: int, sent: bool) -> Dict:
+    company = f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {contractor_id}"
+    emails = []
+    for number in range(1, sequences + 1):
+        email = {
+            "body": ' '.join(rng.choices(WORDS, k=body_bytes // 8)),
+            "email_number": number,
+            "send_day": DAYS[(number - 1) * 2 % len(DAYS)],
+            "send_time": "6:30 AM",
+            "subject": f"{'Re: ' if number > 1 else ''}A quick fix for {company}?"
+        }
+        if sent and number <= rng.randint(0, sequences):
+            email.update({"status": "sent", "sent_date": f"2025-09-{number:02d}",
+                          "opened_date": f"2025-09-{number + 1:02d}" if rng.random() < 0.4 else None})
+        emails.append(email)
+    state = rng.choice(STATES)[1]
+    return {
+        "campaign_data": {
+            "business_id": contractor_id,
+            "company_name": company,
+            "contact_timing": {"best_day_email_1": "Monday", "best_day_email_2": "Wednesday",
+                               "best_day_email_3": "Friday", "window_a_time": "6:30 AM", "window_b_time": "7:30 PM"},
+            "email_sequences": emails,
+            "messaging_preferences": {"email_length": "B", "proof_preference": "Local references/Case studies"}
+        },
+        "company_name": company,
+        "cost": round(rng.random() / 100, 7),
+        "duration_minutes": rng.random() * 5,
+        "location": f"{rng.choice(WORDS).title()}, {state}",
+        "processing_status": "completed",
+        "timestamp": "2025-08-30T09:01:34.531267",
+        "tokens": rng.randint(20000, 60000),
+        "trade": rng.choice(TRADES)
+    }
+
+
+def make_campaign_databases(directory: str, campaigns: int, sequences: int = 3,
+                            body_bytes: int = 415, seed: int = 7,
+                            contractor_ids: Optional[Sequence[int]] = None) -> Dict[str, str]:
+    """
+    master.json + working.json (90% shared ids, 10% working-only), written entry by entry
+
+    Keys are zero-padded contractor ids (contractor_ids[:campaigns] when given,
+    0, 1, 2, ... otherwise); working entries carry sent/opened status on some emails
+    """
+    rng = random.Random(seed)
+    ids = list(contractor_ids[:campaigns]) if contractor_ids is not None else list(range(campaigns))
+    ids += [max(ids, default=0) + 1 + extra for extra in range(campaigns - len(ids))]
+    paths = {"master": os.path.join(directory, 'master.json'), "working": os.path.join(directory, 'working.json')}
+    info = {"database_info": {"generated_date": "2025-09-01T00:00:00", "total_contractors": campaigns,
+                              "system_version": "FOCUS-INTEL V2.0"}}
+    os.makedirs(directory, exist_ok=True)
+
+    with JsonObjectWriter(paths['master'], prelude=info) as writer:
+        for contractor_id in ids:
+            key = f"{contractor_id:05d}"
+            writer.write(key, _campaign(rng, key, sequences, body_bytes, sent=False))
+
+    shared = int(campaigns * 0.9)
+    working_ids = ids[campaigns - shared:] + [max(ids, default=0) + 1 + extra for extra in range(campaigns - shared)]
+    with JsonObjectWriter(paths['working'], prelude=info) as writer:
+        for contractor_id in working_ids:
+            key = f"{contractor_id:05d}"
+            writer.write(key, _campaign(rng, key, sequences, body_bytes, sent=True))
+    return paths
+
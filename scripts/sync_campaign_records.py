@@ -0,0 +1,512 @@
+"""
+CAMPAIGN RECORDS - COMPACT TYPED MODEL OF THE CAMPAIGN DATABASES
+A parsed campaign database is ~10 dicts per contractor (the campaign, its
+campaign_data and one per email sequence), each with its own key table. Here
+every campaign, campaign_data and email sequence is a slotted record: a
+RecordLayout (the key names in file order, interned so all records written the
+same way share one) plus a tuple of values. A record costs a fraction of the
+dict it replaces and converts back to exactly that dict, key order included:
+
+    record = CampaignRecord.from_dict(entry)
+    record.campaign_data.email_sequences[0].status
+    record.to_dict() == entry                           # and json.dumps of both match
+
+Records read like dicts (get, [], `in`, keys, items, ==); updated()
+returns a new record that shares everything unchanged with the old one, which
+is how the campaign merges below build their output. json.dump writes records
+through `default=to_json`.
+
+Values other than campaign_data and its email_sequences (contact_timing,
+messaging_preferences, ...) stay plain JSON values.
+
+In CPython records hold a little less memory than dicts but read and update
+slower (bench_campaign_records), so the sync keeps json.load dicts unless
+SYNC_CAMPAIGN_RECORDS=1: campaign_model() returns the functions of either.
+"""
+
+import gc
+import json
+import operator
+import os
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, ItemsView, Iterable, Iterator, List, Optional, Tuple
+
+# Email status fields owned by working (the app records them as emails go out)
+EMAIL_STATUS_FIELDS = ('status', 'sent_date', 'opened_date', 'responded_date')
+
+_MISSING = object()
+
+# Campaign model of the sync unless ThreeLayerSync is told otherwise (SYNC_CAMPAIGN_RECORDS=1: records)
+DEFAULT_CAMPAIGN_RECORDS = os.environ.get('SYNC_CAMPAIGN_RECORDS', '') == '1'
+
+
+class RecordLayout:
+    """Key names of a record in file order, plus their positions"""
+
+    __slots__ = ('keys', 'index', '_extended')
+
+    def __init__(self, keys: Tuple[str, ...]):
+        self.keys = keys
+        self.index = {key: position for position, key in enumerate(keys)}
+        # Layout + appended keys -> layout (updated() adds keys in a handful of ways)
+        self._extended = {}
+
+    def extended(self, added: Tuple[str, ...]) -> 'RecordLayout':
+        layout = self._extended.get(added)
+        if layout is None:
+            layout = self._extended[added] = layout_of(self.keys + added)
+        return layout
+
+
+_LAYOUTS: Dict[Tuple[str, ...], RecordLayout] = {}
+
+
+def layout_of(keys: Tuple[str, ...]) -> RecordLayout:
+    """The shared layout of these keys"""
+    layout = _LAYOUTS.get(keys)
+    if layout is None:
+        layout = _LAYOUTS[keys] = RecordLayout(keys)
+    return layout
+
+
+class JsonRecord:
+    """
+    One JSON object as a layout + values tuple (read-only, with the dict reading
+    methods; not a collections.abc.Mapping, whose isinstance checks are slow)
+    """
+
+    __slots__ = ('layout', 'values')
+
+    def __init__(self, layout: RecordLayout, values: Tuple):
+        self.layout = layout
+        self.values = values
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'JsonRecord':
+        return cls(layout_of(tuple(data)), tuple(data.values()))
+
+    def to_dict(self) -> Dict:
+        return dict(zip(self.layout.keys, self.values))
+
+    def __getitem__(self, key: str) -> Any:
+        return self.values[self.layout.index[key]]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        position = self.layout.index.get(key)
+        return default if position is None else self.values[position]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.layout.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.layout.keys)
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.layout.keys
+
+    def items(self) -> ItemsView:
+        return dict(zip(self.layout.keys, self.values)).items()
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, JsonRecord):
+            if other.layout is self.layout:
+                return other.values == self.values
+            other = dict(zip(other.layout.keys, other.values))
+        elif not isinstance(other, dict):
+            return NotImplemented
+        # Like dicts, records with the same items in another order are equal
+        return dict(zip(self.layout.keys, self.values)) == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def updated(self, changes: Dict[str, Any]) -> 'JsonRecord':
+        """
+        A copy with these values set: existing keys keep their position, new ones
+        are appended in the order given (the same result as {**record, **changes})
+        """
+        index = self.layout.index
+        values = list(self.values)
+        added = []
+        for key, value in changes.items():
+            position = index.get(key)
+            if position is None:
+                added.append(key)
+                values.append(value)
+            else:
+                values[position] = value
+        layout = self.layout.extended(tuple(added)) if added else self.layout
+        return type(self)(layout, tuple(values))
+
+    def _field(self, key: str) -> Any:
+        position = self.layout.index.get(key)
+        return None if position is None else self.values[position]
+
+
+class EmailSequence(JsonRecord):
+    """One email of a campaign (content from master, status fields from working)"""
+
+    __slots__ = ()
+
+    email_number = property(lambda self: self._field('email_number'))
+    subject = property(lambda self: self._field('subject'))
+    status = property(lambda self: self._field('status'))
+    sent_date = property(lambda self: self._field('sent_date'))
+    opened_date = property(lambda self: self._field('opened_date'))
+    responded_date = property(lambda self: self._field('responded_date'))
+
+    def key(self, position: int) -> str:
+        """email_number as text; sequences without one fall back to their 1-based position"""
+        number = self.layout.index.get('email_number')
+        return str(position + 1 if number is None else self.values[number])
+
+
+class CampaignData(JsonRecord):
+    """A campaign's campaign_data; email_sequences holds EmailSequence records"""
+
+    __slots__ = ()
+
+    business_id = property(lambda self: self._field('business_id'))
+    company_name = property(lambda self: self._field('company_name'))
+    contact_timing = property(lambda self: self._field('contact_timing'))
+    email_sequences = property(lambda self: self._field('email_sequences'))
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CampaignData':
+        values = tuple(data.values())
+        layout = layout_of(tuple(data))
+        position = layout.index.get('email_sequences')
+        if position is not None and isinstance(values[position], list):
+            values = values[:position] + (_sequences(values[position]),) + values[position + 1:]
+        return cls(layout, values)
+
+    def to_dict(self) -> Dict:
+        data = dict(zip(self.layout.keys, self.values))
+        sequences = data.get('email_sequences')
+        if isinstance(sequences, list):
+            data['email_sequences'] = [plain(sequence) for sequence in sequences]
+        return data
+
+
+class CampaignRecord(JsonRecord):
+    """One contractor's entry of a campaign database"""
+
+    __slots__ = ()
+
+    company_name = property(lambda self: self._field('company_name'))
+    processing_status = property(lambda self: self._field('processing_status'))
+    timestamp = property(lambda self: self._field('timestamp'))
+    campaign_data = property(lambda self: self._field('campaign_data'))
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CampaignRecord':
+        values = tuple(data.values())
+        layout = layout_of(tuple(data))
+        position = layout.index.get('campaign_data')
+        if position is not None and isinstance(values[position], dict):
+            values = values[:position] + (CampaignData.from_dict(values[position]),) + values[position + 1:]
+        return cls(layout, values)
+
+    def to_dict(self) -> Dict:
+        data = dict(zip(self.layout.keys, self.values))
+        if isinstance(data.get('campaign_data'), JsonRecord):
+            data['campaign_data'] = data['campaign_data'].to_dict()
+        return data
+
+
+EMPTY_CAMPAIGN_DATA = CampaignData(layout_of(()), ())
+
+
+def _sequences(sequences: List) -> List:
+    return [EmailSequence.from_dict(sequence) if isinstance(sequence, dict) else sequence for sequence in sequences]
+
+
+def plain(value: Any) -> Any:
+    """A record as the dict it came from (anything else as is)"""
+    return value.to_dict() if isinstance(value, JsonRecord) else value
+
+
+def campaign_record(entry: Any) -> Any:
+    """A campaign database entry as a CampaignRecord (anything but an object is kept as is)"""
+    return CampaignRecord.from_dict(entry) if isinstance(entry, dict) else entry
+
+
+def campaign_records(contractors: Dict[str, Any]) -> Dict[str, Any]:
+    """{contractor id: CampaignRecord} of a database's 'contractors' member"""
+    with gc_paused():
+        return {contractor_id: campaign_record(entry) for contractor_id, entry in contractors.items()}
+
+
+def load_database(f) -> Dict:
+    """json.load a campaign database (open text file), its entries as CampaignRecords"""
+    with gc_paused():
+        data = json.load(f)
+        if isinstance(data, dict) and isinstance(data.get('contractors'), dict):
+            data['contractors'] = campaign_records(data['contractors'])
+    return data
+
+
+@contextmanager
+def gc_paused():
+    """
+    No cyclic GC while a database is built: records are always GC-tracked, and
+    every collection triggered halfway through rescans all those already built
+    (JSON never forms cycles, so nothing is left for it to collect)
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def plain_database(data: Dict) -> Dict:
+    """
+    A campaign database with its entries as plain dicts, for json.dump: converting
+    them all up front is cheaper than json calling default=to_json per record
+    """
+    contractors = data.get('contractors')
+    if not isinstance(contractors, dict):
+        return data
+    with gc_paused():
+        return {**data, 'contractors': {contractor_id: plain(entry) for contractor_id, entry in contractors.items()}}
+
+
+def to_json(value: Any) -> Any:
+    """json.dump(..., default=to_json): records are written as the dicts they came from"""
+    if isinstance(value, JsonRecord):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# ----------------------------------------------------------------------
+# Merges
+# ----------------------------------------------------------------------
+
+_STATUS_PLANS: Dict[Tuple[RecordLayout, RecordLayout], Tuple[Tuple, Tuple]] = {}
+
+
+def _status_plan(master: RecordLayout, working: RecordLayout) -> Tuple[Tuple, Tuple]:
+    """
+    For a pair of sequence layouts: (field, master position or None, working
+    position) of the status fields working has, and (field, master position) of
+    those only master has. Layouts are shared, so there are only a few pairs.
+    """
+    plan = _STATUS_PLANS.get((master, working))
+    if plan is None:
+        compared = tuple((field, master.index.get(field), working.index[field])
+                         for field in EMAIL_STATUS_FIELDS if field in working.index)
+        master_only = tuple((field, master.index[field]) for field in EMAIL_STATUS_FIELDS
+                            if field in master.index and field not in working.index)
+        plan = _STATUS_PLANS[(master, working)] = (compared, master_only)
+    return plan
+
+
+def merge_sequences(master_sequences: List[EmailSequence],
+                    working_sequences: Iterable[EmailSequence]) -> Tuple[List[EmailSequence], Dict]:
+    """
+    Master sequence content + working execution state, matched by email_number
+
+    Returns (sequences, changes). changes maps email_number -> {field: value} for
+    every sequence whose status fields differ from the working one (what the app
+    shows now; a sequence working lacks is listed with all its status fields) and
+    email_number -> None for working sequences that are gone.
+
+    Sequences that need no update are master's own records.
+    """
+    working_by_key = {sequence.key(position): sequence for position, sequence in enumerate(working_sequences)}
+    sequences = []
+    changes = {}
+    for position, master_sequence in enumerate(master_sequences):
+        key = master_sequence.key(position)
+        working_sequence = working_by_key.pop(key, None)
+        if working_sequence is None:
+            sequences.append(master_sequence)
+            changes[key] = {field: master_sequence[field] for field in EMAIL_STATUS_FIELDS
+                            if field in master_sequence}
+            continue
+        if working_sequence is master_sequence:
+            # Working still holds the record an earlier merge produced from master
+            sequences.append(master_sequence)
+            continue
+
+        compared, master_only = _status_plan(master_sequence.layout, working_sequence.layout)
+        master_values, working_values = master_sequence.values, working_sequence.values
+        status = {field: working_values[working_position] for field, master_position, working_position in compared
+                  if master_position is None or master_values[master_position] != working_values[working_position]}
+        sequences.append(master_sequence.updated(status) if status else master_sequence)
+        # Master values only survive where working has no value of its own
+        if master_only:
+            changes[key] = {field: master_values[master_position] for field, master_position in master_only}
+
+    for key in working_by_key:
+        changes[key] = None
+    return sequences, changes
+
+
+def merge_status(master: CampaignRecord, working: Optional[CampaignRecord]) -> Tuple[CampaignRecord, Dict]:
+    """
+    One contractor's master campaign with working's email execution state
+
+    Returns (campaign, sequence changes) as merge_sequences does; when master has
+    no sequences yet, working's are adopted as they are (no changes).
+    """
+    working_data = None if working is None else working.get('campaign_data')
+    working_sequences = working_data.get('email_sequences') if working_data else None
+    campaign_data = master.get('campaign_data')
+
+    if campaign_data is None or 'email_sequences' not in campaign_data:
+        if working_sequences is None:
+            return master, {}
+        return master.updated({'campaign_data': (campaign_data or EMPTY_CAMPAIGN_DATA).updated(
+            {'email_sequences': working_sequences})}), {}
+
+    master_sequences = campaign_data['email_sequences']
+    sequences, changes = merge_sequences(master_sequences, working_sequences or [])
+    if len(sequences) == len(master_sequences) and all(map(operator.is_, sequences, master_sequences)):
+        # No status to take over: master's record is the merge (and stays shared with it)
+        return master, changes
+    return master.updated({'campaign_data': campaign_data.updated({'email_sequences': sequences})}), changes
+
+
+def overlay_working(master: Optional[CampaignRecord], working: CampaignRecord) -> CampaignRecord:
+    """
+    Working's campaign over master's (master may be None): master keeps the
+    campaign content, working brings processing_status, timestamp, email_sequences
+    and contact_timing (and campaign_data altogether when master has none)
+    """
+    if master is None:
+        # New campaign from working - added as it is
+        return working
+
+    working_index, working_values = working.layout.index, working.values
+    changes = {}
+    for field in ('processing_status', 'timestamp', 'campaign_data'):
+        position = working_index.get(field)
+        if position is not None:
+            changes[field] = working_values[position]
+
+    master_data = master.get('campaign_data', _MISSING)
+    if 'campaign_data' in changes and master_data is not _MISSING:
+        working_data = changes['campaign_data']
+        changes['campaign_data'] = master_data.updated(
+            {field: working_data[field] for field in ('email_sequences', 'contact_timing') if field in working_data})
+
+    return master.updated(changes) if changes else master
+
+
+# ----------------------------------------------------------------------
+# Dict model: the same merges on json.load output (the default)
+# ----------------------------------------------------------------------
+
+def _sequence_key(sequence: Dict, position: int) -> str:
+    # Sequences without an email_number fall back to their 1-based position
+    return str(sequence.get('email_number', position + 1))
+
+
+def merge_dict_sequences(master_sequences: List[Dict], working_sequences: List[Dict]) -> Tuple[List[Dict], Dict]:
+    """
+    merge_sequences on dicts
+
+    Neither input is modified. Sequences that need no update are shared with
+    master, so the result must be treated as read-only.
+    """
+    working_by_key = {_sequence_key(sequence, position): sequence
+                      for position, sequence in enumerate(working_sequences)}
+    sequences = []
+    changes = {}
+    for position, master_sequence in enumerate(master_sequences):
+        key = _sequence_key(master_sequence, position)
+        working_sequence = working_by_key.pop(key, None)
+        if working_sequence is None:
+            sequences.append(master_sequence)
+            changes[key] = {field: master_sequence[field] for field in EMAIL_STATUS_FIELDS
+                            if field in master_sequence}
+            continue
+
+        status = {field: working_sequence[field] for field in EMAIL_STATUS_FIELDS
+                  if field in working_sequence and master_sequence.get(field, _MISSING) != working_sequence[field]}
+        sequences.append({**master_sequence, **status} if status else master_sequence)
+        # Master values only survive where working has no value of its own
+        kept = {field: master_sequence[field] for field in EMAIL_STATUS_FIELDS
+                if field in master_sequence and field not in working_sequence}
+        if kept:
+            changes[key] = kept
+
+    for key in working_by_key:
+        changes[key] = None
+    return sequences, changes
+
+
+def merge_dict_status(master_data: Dict, working_data: Optional[Dict]) -> Tuple[Dict, Dict]:
+    """merge_status on dicts"""
+    working_sequences = ((working_data or {}).get('campaign_data') or {}).get('email_sequences')
+    campaign_data = master_data.get('campaign_data')
+
+    if campaign_data is None or 'email_sequences' not in campaign_data:
+        if working_sequences is None:
+            return master_data, {}
+        return {**master_data, 'campaign_data': {**(campaign_data or {}), 'email_sequences': working_sequences}}, {}
+
+    sequences, changes = merge_dict_sequences(campaign_data['email_sequences'], working_sequences or [])
+    return {**master_data, 'campaign_data': {**campaign_data, 'email_sequences': sequences}}, changes
+
+
+def overlay_dict(master_campaign: Optional[Dict], working_campaign: Dict) -> Dict:
+    """overlay_working on dicts (neither input is modified)"""
+    if master_campaign is None:
+        # New campaign from working - add directly
+        return working_campaign.copy()
+
+    # MERGE STRATEGY: Preserve campaign content, update states
+    merged = master_campaign.copy()
+    if 'processing_status' in working_campaign:
+        merged['processing_status'] = working_campaign['processing_status']
+    if 'timestamp' in working_campaign:
+        merged['timestamp'] = working_campaign['timestamp']
+
+    if 'campaign_data' in working_campaign:
+        if 'campaign_data' not in merged:
+            merged['campaign_data'] = working_campaign['campaign_data']
+        else:
+            # New email sequences and contact timing from working, the rest from master
+            merged_campaign_data = merged['campaign_data'].copy()
+            for field in ('email_sequences', 'contact_timing'):
+                if field in working_campaign['campaign_data']:
+                    merged_campaign_data[field] = working_campaign['campaign_data'][field]
+            merged['campaign_data'] = merged_campaign_data
+    return merged
+
+
+class CampaignModel:
+    """The functions the campaign merges run with one in-memory model"""
+
+    def __init__(self, name: str, load: Callable, entry: Callable, overlay: Callable, status: Callable):
+        """
+        load: json.load for a campaign database; entry: one parsed entry into the
+        model; overlay: overlay_working; status: merge_status
+        """
+        self.name = name
+        self.records = name == 'records'
+        self.load = load
+        self.entry = entry
+        self.overlay = overlay
+        self.status = status
+
+
+CAMPAIGN_MODELS = {
+    "dict": CampaignModel('dict', json.load, lambda entry: entry, overlay_dict, merge_dict_status),
+    "records": CampaignModel('records', load_database, campaign_record, overlay_working, merge_status),
+}
+
+
+def campaign_model(records: Optional[bool] = None) -> CampaignModel:
+    """Records if asked (None: DEFAULT_CAMPAIGN_RECORDS), else dicts"""
+    return CAMPAIGN_MODELS['records' if (DEFAULT_CAMPAIGN_RECORDS if records is None else records) else 'dict']
@@ -0,0 +1,338 @@
+"""
+CHANGE FEED - REVISIONED DELTAS OF THE APP-FACING DATASETS
+Every sync operation that changes the working contractor CSV or the app's
+campaigns JSON gets the next revision number and one small delta file, so the
+app can ask for "changes since rev N" instead of re-downloading both datasets.
+
+Each dataset section of a delta has the same shape:
+
+    {"added":   {id: full record},        # new, or replaced as a whole
+     "changed": {id: {field: new value}}, # only the fields that changed
+     "removed": [id, ...],
+     "columns": [...]}                    # contractors only, when the CSV header changed
+
+Campaign fields are the top-level keys of a contractor's campaign entry.
+
+Layout:
+    <root>/head.json                 {"revision": N, "oldest": M}
+    <root>/deltas/<revision>.json    one delta per revision
+    <root>/state/                    last published contractors frame + campaigns file (diff base)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import pickle
+import shutil
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from sync_csv_records import write_atomic
+from sync_json_stream import COMPACT_SEPARATORS, JsonObjectIndex
+from sync_lazy import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+logger = logging.getLogger(__name__)
+
+# Deltas kept on disk; consumers further behind are told to reload everything
+FEED_MAX_REVISIONS = 200
+
+ID_COLUMN = 'business_id'
+
+_MISSING = object()
+
+
+def _empty_section() -> Dict:
+    return {"added": {}, "changed": {}, "removed": []}
+
+
+def _json_value(value: Any) -> Any:
+    """Plain JSON value of a DataFrame cell (NaN/NA -> None, numpy scalars -> Python)"""
+    if value is None or (not isinstance(value, (list, dict)) and pd.isna(value)):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _row_record(df: pd.DataFrame, position: int) -> Dict:
+    return {column: _json_value(value) for column, value in zip(df.columns, df.iloc[position].tolist())}
+
+
+def diff_contractors(old: pd.DataFrame, new: pd.DataFrame) -> Dict:
+    """Contractor section of a delta between two keyed frames"""
+    section = _empty_section()
+    if list(new.columns) != list(old.columns):
+        section['columns'] = list(new.columns)
+
+    old_ids = old.index
+    new_ids = new.index
+    for position in np.flatnonzero(~new_ids.isin(old_ids)):
+        section['added'][new_ids[position]] = _row_record(new, position)
+    section['removed'] = old_ids[~old_ids.isin(new_ids)].tolist()
+
+    common = new_ids[new_ids.isin(old_ids)]
+    if not len(common):
+        return section
+    current = new.loc[common]
+    previous = old.reindex(index=common)
+    changed: Dict[str, Dict] = {}
+    for column in new.columns:
+        values = current[column].to_numpy(dtype=object)
+        if column in previous.columns:
+            before = previous[column].to_numpy(dtype=object)
+            # Object comparison treats 5 and 5.0 as equal, so dtype drift is not a change
+            differs = (values != before) & ~(pd.isna(values) & pd.isna(before))
+        else:
+            differs = ~pd.isna(values)
+        for position in np.flatnonzero(differs):
+            changed.setdefault(common[position], {})[column] = _json_value(values[position])
+    section['changed'] = changed
+    return section
+
+
+def diff_campaigns(old_path: Optional[str], new_path: str) -> Dict:
+    """Campaign section of a delta between two campaign database files, entry by entry"""
+    section = _empty_section()
+    with JsonObjectIndex(old_path) as old, JsonObjectIndex(new_path) as new:
+        for contractor_id in new.names:
+            if contractor_id not in old:
+                section['added'][contractor_id] = new.entry(contractor_id)
+                continue
+            if old.raw(contractor_id) == new.raw(contractor_id):
+                continue
+            before, after = old.entry(contractor_id), new.entry(contractor_id)
+            if before == after:
+                # Same content, different layout (e.g. --compact)
+                continue
+            if any(field not in after for field in before):
+                section['added'][contractor_id] = after
+            else:
+                section['changed'][contractor_id] = {field: value for field, value in after.items()
+                                                     if before.get(field, _MISSING) != value}
+        section['removed'] = [contractor_id for contractor_id in old.names if contractor_id not in new]
+    return section
+
+
+def _is_empty(section: Dict) -> bool:
+    return not (section['added'] or section['changed'] or section['removed'] or 'columns' in section)
+
+
+def compose_sections(earlier: Dict, later: Dict) -> Dict:
+    """One section equivalent to applying earlier, then later (earlier is updated in place)"""
+    for record_id in later['removed']:
+        earlier['added'].pop(record_id, None)
+        earlier['changed'].pop(record_id, None)
+        if record_id not in earlier['removed']:
+            earlier['removed'].append(record_id)
+    for record_id, record in later['added'].items():
+        earlier['added'][record_id] = record
+        earlier['changed'].pop(record_id, None)
+        if record_id in earlier['removed']:
+            earlier['removed'].remove(record_id)
+    for record_id, fields in later['changed'].items():
+        if record_id in earlier['added']:
+            earlier['added'][record_id] = {**earlier['added'][record_id], **fields}
+        else:
+            earlier['changed'][record_id] = {**earlier['changed'].get(record_id, {}), **fields}
+    if 'columns' in later:
+        earlier['columns'] = later['columns']
+    return earlier
+
+
+class ChangeFeed:
+    def __init__(self, root: str, normalize_ids: Callable[[pd.Series], pd.Series]):
+        """
+        root: feed directory
+        normalize_ids: business_id normalization shared with the CSV merge
+        """
+        self.root = root
+        self.normalize_ids = normalize_ids
+        self.deltas_dir = os.path.join(root, 'deltas')
+        self.state_dir = os.path.join(root, 'state')
+        self.head_path = os.path.join(root, 'head.json')
+        self.contractors_state = os.path.join(self.state_dir, 'contractors.pkl')
+        self.campaigns_state = os.path.join(self.state_dir, 'campaigns.json')
+
+    # ------------------------------------------------------------------
+    # Head / deltas
+    # ------------------------------------------------------------------
+
+    def head(self) -> Dict:
+        try:
+            with open(self.head_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"revision": 0, "oldest": 1}
+
+    @property
+    def revision(self) -> int:
+        return self.head()['revision']
+
+    def _delta_path(self, revision: int) -> str:
+        return os.path.join(self.deltas_dir, f"{revision:08d}.json")
+
+    def _write_json(self, path: str, payload: Dict) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_atomic(path, json.dumps(payload, separators=COMPACT_SEPARATORS,
+                                      ensure_ascii=False).encode('utf-8'))
+
+    def _append(self, operation: str, sections: Dict[str, Dict], baseline: bool = False) -> int:
+        head = self.head()
+        revision = head['revision'] + 1
+        delta = {
+            "revision": revision,
+            "created": datetime.now().isoformat(),
+            "operation": operation,
+            **({"baseline": True} if baseline else sections)
+        }
+        self._write_json(self._delta_path(revision), delta)
+
+        # A baseline has nothing to replay from: everyone before it reloads
+        oldest = revision + 1 if baseline else max(head['oldest'], revision - FEED_MAX_REVISIONS + 1)
+        for stale in range(head['oldest'], min(oldest, revision)):
+            if os.path.exists(self._delta_path(stale)):
+                os.remove(self._delta_path(stale))
+        self._write_json(self.head_path, {"revision": revision, "oldest": oldest})
+        return revision
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def _keyed(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Frame indexed by normalized business_id (first row wins for duplicate ids)"""
+        keyed = df.set_axis(self.normalize_ids(df[ID_COLUMN]).to_numpy(), axis=0)
+        return keyed[~keyed.index.duplicated()]
+
+    def _load_contractors_state(self) -> Optional[pd.DataFrame]:
+        try:
+            with open(self.contractors_state, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _save_contractors_state(self, keyed: pd.DataFrame) -> None:
+        os.makedirs(self.state_dir, exist_ok=True)
+        write_atomic(self.contractors_state, pickle.dumps(keyed, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def _save_campaigns_state(self, campaigns_path: str, publisher) -> None:
+        os.makedirs(self.state_dir, exist_ok=True)
+        if publisher is not None:
+            # Published files are replaced, never rewritten, so a hardlink is a stable copy
+            publisher.publish_file(campaigns_path, [self.campaigns_state])
+        else:
+            tmp_path = f"{self.campaigns_state}.tmp-{os.getpid()}"
+            shutil.copyfile(campaigns_path, tmp_path)
+            os.replace(tmp_path, self.campaigns_state)
+
+    def record(self, operation: str, contractors: Optional[pd.DataFrame] = None,
+               campaigns_path: Optional[str] = None, publisher=None) -> Optional[int]:
+        """
+        Diff the datasets an operation published against the last recorded ones
+
+        contractors: the working contractor frame as now written
+        campaigns_path: the app's campaigns file as now written
+        Returns the new revision, or None when nothing changed. The first recording
+        of a dataset is a baseline revision (consumers reload once).
+        """
+        sections = {}
+        baseline = False
+
+        if contractors is not None:
+            keyed = self._keyed(contractors)
+            previous = self._load_contractors_state()
+            if previous is None:
+                baseline = True
+            else:
+                sections['contractors'] = diff_contractors(previous, keyed)
+            self._save_contractors_state(keyed)
+
+        if campaigns_path is not None and os.path.exists(campaigns_path):
+            if not os.path.exists(self.campaigns_state):
+                baseline = True
+            else:
+                sections['campaigns'] = diff_campaigns(self.campaigns_state, campaigns_path)
+            self._save_campaigns_state(campaigns_path, publisher)
+
+        sections = {name: section for name, section in sections.items() if not _is_empty(section)}
+        if not sections and not baseline:
+            return None
+        revision = self._append(operation, sections, baseline=baseline)
+        logger.info(f"Change feed revision {revision} ({operation}): " + (
+            "baseline" if baseline else
+            ', '.join(f"{name} +{len(s['added'])} ~{len(s['changed'])} -{len(s['removed'])}"
+                      for name, s in sections.items())))
+        return revision
+
+    def record_contractor_fields(self, operation: str, changes: Dict[str, Dict[str, Any]]) -> Optional[int]:
+        """Record known field edits ({id: {column: value}}) without re-reading the CSV"""
+        state = self._load_contractors_state()
+        if state is None or not changes:
+            # No diff base yet: the next full recording becomes the baseline
+            return None
+
+        ids = self.normalize_ids(pd.Series(list(changes), dtype=object)).tolist()
+        changed = {}
+        for record_id, fields in zip(ids, changes.values()):
+            if record_id not in state.index:
+                continue
+            for column, value in fields.items():
+                if column not in state.columns:
+                    continue
+                dtype = state[column].dtype
+                if not (pd.api.types.is_object_dtype(dtype)
+                        or (pd.api.types.is_string_dtype(dtype) and isinstance(value, str))):
+                    state[column] = state[column].astype(object)
+                state.loc[record_id, column] = value
+            changed[record_id] = dict(fields)
+        if not changed:
+            return None
+        self._save_contractors_state(state)
+
+        section = _empty_section()
+        section['changed'] = changed
+        revision = self._append(operation, {"contractors": section})
+        logger.info(f"Change feed revision {revision} ({operation}): contractors ~{len(changed)}")
+        return revision
+
+    def invalidate(self, operation: str) -> int:
+        """Drop the diff base after a failed recording: consumers reload, the next recording is a baseline"""
+        for path in (self.contractors_state, self.campaigns_state):
+            if os.path.exists(path):
+                os.remove(path)
+        return self._append(operation, {}, baseline=True)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def changes_since(self, revision: int) -> Dict:
+        """
+        Everything that changed after revision, folded into one delta
+
+        {"revision": head, "since": revision, "full_reload": True} when the deltas
+        needed are gone (or revision is unknown): the consumer reloads both datasets.
+        """
+        head = self.head()
+        result = {"revision": head['revision'], "since": revision}
+        if revision == head['revision']:
+            return {**result, "contractors": _empty_section(), "campaigns": _empty_section()}
+        if revision > head['revision'] or revision + 1 < head['oldest']:
+            return {**result, "full_reload": True}
+
+        sections = {"contractors": _empty_section(), "campaigns": _empty_section()}
+        for number in range(revision + 1, head['revision'] + 1):
+            try:
+                with open(self._delta_path(number), 'r', encoding='utf-8') as f:
+                    delta = json.load(f)
+            except (OSError, ValueError):
+                return {**result, "full_reload": True}
+            for name in sections:
+                if name in delta:
+                    compose_sections(sections[name], delta[name])
+        return {**result, **sections}
@@ -0,0 +1,168 @@
+"""
+SYNC COALESCE - ONE RUN FOR A BURST OF IDENTICAL SYNC REQUESTS
+Overlapping CLI processes (bursty /api/sync clicks) used to each load and
+rewrite the same files. With the profile lock (sync_lock) they now queue up, and
+this layer makes the queue cheap:
+
+- Operations (--full-sync, --sync-campaigns, ...): a request that waited while a
+  run of the same command STARTED AFTER the request was made gets that run's
+  output and exit code instead of running again; the run saw every input the
+  request could have seen.
+- Point updates (--update-nombre): edits are appended to a queue before waiting
+  for the lock; whoever gets the lock applies every queued edit in one batch
+  (one rewrite of each CSV) and leaves each requester its statuses.
+
+State lives next to the lock (<backups>/requests/): a run counter per command
+and the nombre queue. Files are replaced atomically, never edited in place.
+"""
+
+import io
+import json
+import logging
+import os
+import re
+import sys
+import uuid
+from contextlib import redirect_stdout
+from typing import Callable, Dict, List, Optional
+
+from sync_csv_records import write_atomic
+from sync_lock import FileLock
+
+logger = logging.getLogger(__name__)
+
+
+class _Tee(io.TextIOBase):
+    """stdout that also keeps a copy (the output replayed to coalesced requests)"""
+
+    def __init__(self, stream, copy: io.StringIO):
+        self.stream = stream
+        self.copy = copy
+
+    def write(self, text: str) -> int:
+        self.copy.write(text)
+        return self.stream.write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+class RequestCoalescer:
+    def __init__(self, state_dir: str, lock: FileLock):
+        """
+        state_dir: run counters and the nombre queue (shared by every process of a profile)
+        lock: the profile lock that serializes writers
+        """
+        self.state_dir = state_dir
+        self.lock = lock
+        self.runs_dir = os.path.join(state_dir, 'runs')
+        self.queue_path = os.path.join(state_dir, 'nombre_queue.jsonl')
+        self.results_dir = os.path.join(state_dir, 'nombre_results')
+        # Short critical sections only: appending to / draining the queue
+        self._queue_lock = FileLock(os.path.join(state_dir, 'nombre_queue.lock'))
+
+    def _run_path(self, key: str) -> str:
+        return os.path.join(self.runs_dir, re.sub(r'[^A-Za-z0-9]+', '_', key).strip('_') + '.json')
+
+    def _run_state(self, key: str) -> Dict:
+        try:
+            with open(self._run_path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"started": 0}
+
+    def _save_json(self, path: str, payload: Dict) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_atomic(path, json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+
+    def run(self, key: str, command: Callable[[], int]) -> int:
+        """
+        Run command (prints to stdout, returns an exit code) under the exclusive lock,
+        or replay the run of the same key that started while this request waited
+        """
+        # Read before waiting: any run numbered above this one started after the request
+        requested_after = self._run_state(key)['started']
+        with self.lock.hold():
+            state = self._run_state(key)
+            # Holding the lock, a started run is finished unless its process died mid-run
+            if state['started'] > requested_after and state.get('finished') == state['started']:
+                logger.info(f"Coalesced '{key}' with run #{state['finished']}")
+                print(f"🔁 Coalesced with a '{key}' run that started while this request waited")
+                sys.stdout.write(state['output'])
+                return state['exit_code']
+
+            number = state['started'] + 1
+            self._save_json(self._run_path(key), {"started": number})
+            output = io.StringIO()
+            with redirect_stdout(_Tee(sys.stdout, output)):
+                exit_code = command()
+            self._save_json(self._run_path(key), {"started": number, "finished": number,
+                                                  "exit_code": exit_code, "output": output.getvalue()})
+            return exit_code
+
+    def submit_nombre(self, changes: Dict[str, str],
+                      apply: Callable[[Dict[str, str]], Dict[str, str]]) -> Dict[str, str]:
+        """
+        Queue nombre edits and return {contractor_id: status} once they are applied
+
+        apply is ThreeLayerSync.update_nombre_fields; it runs once per drained batch
+        with every queued edit. A later edit of the same contractor wins: an earlier
+        request whose value it replaced gets 'superseded' for that contractor (as
+        update_nombre_fields reports), unless both asked for the same value.
+        """
+        ticket = f"{os.getpid()}-{uuid.uuid4().hex}"
+        line = json.dumps({"ticket": ticket, "changes": changes}, ensure_ascii=False) + '\n'
+        os.makedirs(self.state_dir, exist_ok=True)
+        with self._queue_lock.hold():
+            with open(self.queue_path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+        with self.lock.hold():
+            results = self._take_results(ticket)
+            if results is None:
+                self._drain(apply)
+                results = self._take_results(ticket)
+        if results is None:
+            # The batch holding these edits was lost (its process died mid-apply)
+            return {contractor_id: 'error' for contractor_id in changes}
+        return results
+
+    def _take_results(self, ticket: str) -> Optional[Dict[str, str]]:
+        path = os.path.join(self.results_dir, f"{ticket}.json")
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                results = json.load(f)
+        except (OSError, ValueError):
+            return None
+        os.remove(path)
+        return results
+
+    def _drain(self, apply: Callable[[Dict[str, str]], Dict[str, str]]) -> None:
+        """Apply every queued edit in one batch (caller holds the profile lock)"""
+        with self._queue_lock.hold():
+            try:
+                with open(self.queue_path, 'r', encoding='utf-8') as f:
+                    entries: List[Dict] = [json.loads(line) for line in f if line.strip()]
+                os.remove(self.queue_path)
+            except FileNotFoundError:
+                return
+        if not entries:
+            return
+
+        batch = {}
+        # contractor id -> ticket of the request whose value is in the batch
+        winners = {}
+        for entry in entries:
+            batch.update(entry['changes'])
+            winners.update(dict.fromkeys(entry['changes'], entry['ticket']))
+        logger.info(f"Applying {len(batch)} queued nombre edits from {len(entries)} requests in one batch")
+        statuses = {}
+        try:
+            statuses = apply(batch)
+        finally:
+            for entry in entries:
+                self._save_json(os.path.join(self.results_dir, f"{entry['ticket']}.json"),
+                                {contractor_id: statuses.get(contractor_id, 'error')
+                                 if winners[contractor_id] == entry['ticket'] or batch[contractor_id] == value
+                                 else 'superseded'
+                                 for contractor_id, value in entry['changes'].items()})
@@ -0,0 +1,228 @@
+"""
+SYNC CONFLICTS - MASTER/WORKING DISAGREEMENTS FOUND WHILE MERGING
+The merges resolve every disagreement by policy; this module records them so
+they stop being silent. Detection happens inside the merge pass itself:
+
+- CSV: each column pair the merge resolves is compared as whole arrays (one
+  vectorized comparison per column, on the rows both layers have a value for)
+- Campaigns: each contractor present in both layers gets a field-level diff
+  while its entry is merged (skipped outright when the entries are equal)
+
+The result is temp/merge_conflicts.json with one section per merge:
+
+    {"csv": {"conflicting_cells": 12, "columns": {"L1_company_name": {"conflicts": 3,
+             "master_won": 0, "working_won": 3, "policy": "newest_wins"}, ...},
+             "contractors": {"4549": {"conflicts": 2, "columns": {"L1_company_name": "working", ...}}}},
+     "campaigns": {"conflicting_fields": 4, "fields": {"campaign_data.email_sequences[].status": 2, ...},
+                   "contractors": {"4549": {"conflicts": 1, "fields": {"processing_status": "working"}}}}}
+
+Per contractor only the winner of each conflicting column/field is kept (the
+values themselves are in the merged files), and the file is written compact:
+on diverged layers it holds one entry per conflicting cell.
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sync_campaign_records import JsonRecord
+from sync_lazy import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+
+# Campaign fields the merge takes from working (everything else keeps master's value)
+WORKING_CAMPAIGN_FIELDS = (
+    'processing_status',
+    'timestamp',
+    'campaign_data.email_sequences',
+    'campaign_data.contact_timing',
+)
+# Prefixes of the nested paths under those fields
+WORKING_CAMPAIGN_PREFIXES = tuple(f"{field}{sep}" for field in WORKING_CAMPAIGN_FIELDS for sep in ('.', '['))
+
+
+def conflicting_cells(master: pd.Series, working: pd.Series) -> np.ndarray:
+    """Rows where both layers have a value and the values differ (aligned Series)"""
+    both = master.notna().to_numpy() & working.notna().to_numpy()
+    if not both.any():
+        return both
+
+    master_numeric = pd.api.types.is_numeric_dtype(master.dtype)
+    working_numeric = pd.api.types.is_numeric_dtype(working.dtype)
+    if master_numeric and working_numeric:
+        with np.errstate(invalid='ignore'):
+            return both & (master.to_numpy(dtype=np.float64, na_value=np.nan)
+                           != working.to_numpy(dtype=np.float64, na_value=np.nan))
+
+    rows = np.flatnonzero(both)
+    if master_numeric != working_numeric:
+        # One file parsed the column as numbers, the other as text: "50" and 50.0 agree
+        numbers, text = (master, working) if master_numeric else (working, master)
+        parsed = pd.to_numeric(text.iloc[rows].astype(object), errors='coerce').to_numpy(dtype=np.float64)
+        differs = ~(parsed == numbers.iloc[rows].to_numpy(dtype=np.float64, na_value=np.nan))
+    else:
+        differs = (master.iloc[rows].to_numpy(dtype=object) != working.iloc[rows].to_numpy(dtype=object))
+    result = np.zeros(len(both), dtype=bool)
+    result[rows[differs]] = True
+    return result
+
+
+class CsvConflicts:
+    """Conflicting cells of one CSV merge, keyed by contractor once rows are assigned"""
+
+    def __init__(self):
+        self.contractors: Dict[str, Dict[str, str]] = {}
+        self.policies: Dict[str, str] = {}
+        self.compared = 0
+        self._cells: List[Tuple[str, np.ndarray, np.ndarray]] = []
+
+    def compare(self, master_part: pd.DataFrame, working_part: pd.DataFrame, columns: Iterable[str],
+                policy: str, prefer_master: np.ndarray) -> None:
+        """Compare aligned column pairs resolved by one policy (prefer_master: rows where master wins)"""
+        for col in columns:
+            self.policies[col] = policy
+            rows = np.flatnonzero(conflicting_cells(master_part[col], working_part[col]))
+            if len(rows):
+                self._cells.append((col, rows, prefer_master[rows]))
+
+    def assign_rows(self, keys: pd.Series) -> None:
+        """Turn the recorded row positions into contractor ids (keys: canonical id per aligned row)"""
+        keys = keys.to_numpy()
+        for col, rows, master_won in self._cells:
+            for key, won in zip(keys[rows].tolist(), master_won.tolist()):
+                self.contractors.setdefault(key, {})[col] = 'master' if won else 'working'
+        self._cells = []
+
+    def section(self, previous: Optional[Dict] = None, replaced: Iterable[str] = ()) -> Dict:
+        """
+        The "csv" section of merge_conflicts.json
+
+        previous/replaced: an incremental merge re-merged only the replaced contractors,
+        the others keep their entries from the previous section
+        """
+        contractors = _carry_over(previous, replaced, 'columns')
+        contractors.update(self.contractors)
+        policies = dict((previous or {}).get('policies', {}))
+        policies.update(self.policies)
+
+        columns = {}
+        for conflict_columns in contractors.values():
+            for col, winner in conflict_columns.items():
+                stats = columns.setdefault(col, {"conflicts": 0, "master_won": 0, "working_won": 0,
+                                                 "policy": policies.get(col)})
+                stats["conflicts"] += 1
+                stats[f"{winner}_won"] += 1
+        return {
+            "generated_date": datetime.now().isoformat(),
+            "compared_contractors": self.compared,
+            "conflicting_cells": sum(stats["conflicts"] for stats in columns.values()),
+            "contractors_with_conflicts": len(contractors),
+            "policies": policies,
+            "columns": dict(sorted(columns.items(), key=lambda item: -item[1]["conflicts"])),
+            "contractors": {key: {"conflicts": len(conflict_columns), "columns": conflict_columns}
+                            for key, conflict_columns in sorted(contractors.items())}
+        }
+
+
+# Campaign entries are compared as json.load dicts or as sync_campaign_records records
+_JSON_OBJECTS = (dict, JsonRecord)
+
+
+def _shared_members(master, working) -> Iterable[Tuple[str, object, object]]:
+    """(key, master value, working value) of every key both JSON objects have, in master order"""
+    if isinstance(master, JsonRecord) and isinstance(working, JsonRecord):
+        if master.layout is working.layout:
+            return zip(master.layout.keys, master.values, working.values)
+        master = dict(zip(master.layout.keys, master.values))
+        working = dict(zip(working.layout.keys, working.values))
+    elif isinstance(master, JsonRecord) or isinstance(working, JsonRecord):
+        master, working = dict(master), dict(working)
+    return ((key, value, working[key]) for key, value in master.items() if key in working)
+
+
+def _sequence_map(sequences: List) -> Optional[Dict[str, Dict]]:
+    """email_number -> sequence for a list of sequences (None for any other list)"""
+    if not all(isinstance(sequence, _JSON_OBJECTS) for sequence in sequences):
+        return None
+    # Sequences without an email_number fall back to their 1-based position
+    return {str(sequence.get('email_number', position + 1)): sequence
+            for position, sequence in enumerate(sequences)}
+
+
+def _diff(master, working, path: str, found: List[str]) -> None:
+    if master == working or master is None or working is None:
+        return
+    if isinstance(master, _JSON_OBJECTS) and isinstance(working, _JSON_OBJECTS):
+        for key, master_value, working_value in _shared_members(master, working):
+            _diff(master_value, working_value, f"{path}.{key}" if path else key, found)
+        return
+    if isinstance(master, list) and isinstance(working, list):
+        master_map, working_map = _sequence_map(master), _sequence_map(working)
+        if master_map is not None and working_map is not None:
+            for key in master_map:
+                if key in working_map:
+                    _diff(master_map[key], working_map[key], f"{path}[{key}]", found)
+            return
+    found.append(path)
+
+
+def campaign_field_conflicts(master_campaign: Dict, working_campaign: Dict) -> Dict[str, str]:
+    """Field path -> resolved layer ('master'/'working') for every value both entries set differently"""
+    found = []
+    _diff(master_campaign, working_campaign, '', found)
+    return {path: 'working' if path.startswith(WORKING_CAMPAIGN_PREFIXES) or path in WORKING_CAMPAIGN_FIELDS
+            else 'master' for path in found}
+
+
+class CampaignConflicts:
+    """Field-level conflicts of one campaign merge"""
+
+    def __init__(self):
+        self.contractors: Dict[str, Dict[str, str]] = {}
+        self.compared = 0
+
+    def compare(self, contractor_id: str, master_campaign: Optional[Dict], working_campaign: Dict) -> None:
+        """Diff one contractor's entries (no-op when master has none)"""
+        if master_campaign is None:
+            return
+        self.compared += 1
+        found = campaign_field_conflicts(master_campaign, working_campaign)
+        if found:
+            self.contractors[contractor_id] = found
+
+    def section(self, previous: Optional[Dict] = None, replaced: Iterable[str] = ()) -> Dict:
+        """The "campaigns" section of merge_conflicts.json (previous/replaced as in CsvConflicts)"""
+        contractors = _carry_over(previous, replaced, 'fields')
+        contractors.update(self.contractors)
+
+        paths = {}
+        for found in contractors.values():
+            for path in found:
+                paths[path] = paths.get(path, 0) + 1
+        fields = {}
+        for path, count in paths.items():
+            # email_sequences[2].status and [3].status count as one field
+            field = re.sub(r'\[[^\]]*\]', '[]', path)
+            fields[field] = fields.get(field, 0) + count
+        return {
+            "generated_date": datetime.now().isoformat(),
+            "compared_contractors": self.compared,
+            "conflicting_fields": sum(fields.values()),
+            "contractors_with_conflicts": len(contractors),
+            "fields": dict(sorted(fields.items(), key=lambda item: -item[1])),
+            "contractors": {key: {"conflicts": len(found), "fields": found}
+                            for key, found in sorted(contractors.items())}
+        }
+
+
+def _carry_over(previous: Optional[Dict], replaced: Iterable[str], detail: str) -> Dict:
+    """Per-contractor details of a previous section minus the re-merged contractors"""
+    if not previous:
+        return {}
+    replaced = set(replaced)
+    return {key: entry[detail] for key, entry in previous.get('contractors', {}).items()
+            if key not in replaced}
@@ -0,0 +1,140 @@
+"""
+CONTRACTOR INDEX - ONE CANONICAL KEY PER CONTRACTOR ID
+business_id reaches the sync as "4549", "04549", "4549.0" or 4549.0 depending
+on which tool last wrote the file. canonical_id / canonical_id_series map every
+variant to one key (numeric ids by value, anything else as stripped text), and
+ContractorIndex maps those keys to the row positions of one loaded CSV.
+canonical_id is the only Python rule: the byte-level record index of
+sync_csv_records uses it too, and src/lib/utils/canonical-id.ts mirrors it for
+the app.
+
+The index is built once per file version (ThreeLayerSync.contractor_index) and
+shared by the merge, the manifest hashes and lookups. Duplicate contractors and
+alias spellings of one id are found while it is built.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Optional
+
+from sync_lazy import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# Alias / duplicate examples kept in a report (the counts are always complete)
+REPORT_EXAMPLES = 20
+
+
+def canonical_id(value) -> str:
+    """
+    Canonical key of one business_id ('' for a missing id)
+
+    Mirrors the old `astype(str) == id | == int(id)` mask: numeric ids compare by
+    value ("04549", "4549" and "4549.0" are the same contractor), others as text.
+    str / int / float ids never load pandas (stdlib-only commands use this).
+    """
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    if not isinstance(value, (str, int, float)) and pd.isna(value):
+        return ''
+    text = str(value).strip()
+    try:
+        number = float(text)
+    except ValueError:
+        return text
+    if number.is_integer():
+        return str(int(number))
+    return text
+
+
+def canonical_id_series(ids: pd.Series) -> pd.Series:
+    """Vectorized canonical_id (object dtype, same index)"""
+    present = ids.notna()
+    result = pd.Series('', index=ids.index, dtype=object)
+    if not present.any():
+        return result
+
+    values = ids[present]
+    if pd.api.types.is_integer_dtype(values.dtype):
+        result[present] = values.astype(str).to_numpy(dtype=object)
+        return result
+    if pd.api.types.is_float_dtype(values.dtype):
+        numbers = values.to_numpy(dtype=np.float64)
+    else:
+        # to_numeric ignores surrounding blanks, so only non-numeric ids need stripping
+        numbers = pd.to_numeric(values.astype(object), errors='coerce').to_numpy(dtype=np.float64)
+
+    # Numeric text compares by value: "04549", "4549.0" and "4549" are one contractor
+    with np.errstate(invalid='ignore'):
+        integral = np.isfinite(numbers) & (numbers == np.floor(numbers))
+    text = np.empty(len(values), dtype=object)
+    text[integral] = numbers[integral].astype(np.int64).astype(str)
+    other = ~integral
+    if other.any():
+        text[other] = values[other].astype(str).str.strip().to_numpy(dtype=object)
+    result[present] = text
+    return result
+
+
+class ContractorIndex:
+    """Canonical business_id -> row position(s) of one contractor frame"""
+
+    def __init__(self, ids: pd.Series):
+        """ids: the business_id column as loaded (positions follow its order)"""
+        ids = ids.reset_index(drop=True)
+        self.keys = canonical_id_series(ids)
+        keys = self.keys.to_numpy()
+        identified = keys != ''
+        self.missing_ids = int((~identified).sum())
+
+        # First row wins, as in every other id lookup of the sync
+        positions = np.flatnonzero(identified)
+        self.positions: Dict[str, int] = dict(zip(keys[positions[::-1]], positions[::-1].tolist()))
+
+        repeated = self.keys.duplicated(keep=False).to_numpy() & identified
+        self.duplicates: Dict[str, List[int]] = {}
+        for position in np.flatnonzero(repeated).tolist():
+            self.duplicates.setdefault(keys[position], []).append(position)
+
+        # Differently spelled rows of one key: only visible in text columns (numbers are parsed already)
+        self.aliases: Dict[str, List[str]] = {}
+        if self.duplicates and not pd.api.types.is_numeric_dtype(ids.dtype):
+            for key, rows in self.duplicates.items():
+                spellings = list(dict.fromkeys(str(ids[row]).strip() for row in rows))
+                if len(spellings) > 1:
+                    self.aliases[key] = spellings
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, column: str = 'business_id') -> 'ContractorIndex':
+        return cls(df[column])
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __contains__(self, contractor_id) -> bool:
+        return canonical_id(contractor_id) in self.positions
+
+    def position(self, contractor_id) -> Optional[int]:
+        """Row of a contractor given any spelling of its id (None if absent)"""
+        return self.positions.get(canonical_id(contractor_id))
+
+    def positions_of(self, contractor_id) -> List[int]:
+        """Every row of a contractor (more than one only for duplicates)"""
+        key = canonical_id(contractor_id)
+        if key in self.duplicates:
+            return list(self.duplicates[key])
+        return [self.positions[key]] if key in self.positions else []
+
+    def report(self) -> Dict:
+        """Counts plus a few examples of duplicated contractors and alias spellings"""
+        return {
+            "rows": len(self.keys),
+            "contractors": len(self.positions),
+            "missing_ids": self.missing_ids,
+            "duplicates": len(self.duplicates),
+            "aliases": len(self.aliases),
+            "duplicate_examples": dict(list(self.duplicates.items())[:REPORT_EXAMPLES]),
+            "alias_examples": dict(list(self.aliases.items())[:REPORT_EXAMPLES])
+        }
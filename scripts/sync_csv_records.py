@@ -0,0 +1,223 @@
+"""
+CSV RECORD STORE - BYTE-LEVEL POINT UPDATES
+Indexes the records of a CSV file by a key column without parsing the other
+columns, so a single cell can be changed by re-serializing only its record and
+splicing it back into the file bytes
+"""
+
+import codecs
+import csv
+import io
+import os
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sync_contractor_index import canonical_id
+
+ENCODING = 'utf-8'
+
+# One CSV field: quoted (quotes inside doubled, newlines allowed) or bare
+_FIELD = rb'(?:"[^"]*(?:""[^"]*)*"|[^,"\r\n]*)'
+_FIELD_RE = re.compile(_FIELD)
+
+
+class CsvRecordFile:
+    """Header + byte spans of every record in a CSV, indexed by one key column"""
+
+    def __init__(self, path: str, data: bytes, key_column: str,
+                 normalize_key: Callable[[str], str] = canonical_id):
+        self.path = path
+        self.data = data
+        self.key_column = key_column
+        self.normalize_key = normalize_key
+        self.newline = b'\r\n' if data.split(b'\n', 1)[0].endswith(b'\r') else b'\n'
+
+        self.spans = self._scan_spans(data)
+        if not self.spans:
+            raise ValueError(f"Empty CSV file: {path}")
+        # Excel exports start with a UTF-8 BOM: not part of the first column name
+        # (only records are ever rewritten, so its bytes stay in the file)
+        header_start, header_end = self.spans[0]
+        if data.startswith(codecs.BOM_UTF8):
+            header_start += len(codecs.BOM_UTF8)
+        self.header = self._parse((header_start, header_end))
+        if key_column not in self.header:
+            raise KeyError(f"{key_column} column not found in {path}")
+        self.key_position = self.header.index(key_column)
+
+        # Field position -> pattern skipping that many fields of a record
+        self._skip_patterns: Dict[int, re.Pattern] = {}
+
+        # Normalized key -> record numbers (1-based, 0 is the header)
+        self.index: Dict[str, List[int]] = {}
+        for row in range(1, len(self.spans)):
+            self.index.setdefault(self.normalize_key(self._key_text(row)), []).append(row)
+
+    @classmethod
+    def load(cls, path: str, key_column: str = 'business_id',
+             normalize_key: Callable[[str], str] = canonical_id) -> 'CsvRecordFile':
+        with open(path, 'rb') as f:
+            return cls(path, f.read(), key_column, normalize_key)
+
+    @staticmethod
+    def _scan_spans(data: bytes) -> List[Tuple[int, int]]:
+        """(start, end) of every record, end includes the line terminator
+
+        A physical line only ends a record when the quotes seen so far are balanced,
+        so quoted fields containing newlines stay in one record
+        """
+        spans = []
+        start = 0
+        position = 0
+        open_quote = False
+        length = len(data)
+        while position < length:
+            newline = data.find(b'\n', position)
+            end = length if newline == -1 else newline + 1
+            if data.count(b'"', position, end) % 2:
+                open_quote = not open_quote
+            position = end
+            if not open_quote:
+                if data[start:end].strip():
+                    spans.append((start, end))
+                start = end
+        if start < length and data[start:].strip():
+            spans.append((start, length))
+        return spans
+
+    def _parse(self, span: Tuple[int, int]) -> List[str]:
+        text = self.data[span[0]:span[1]].decode(ENCODING)
+        return next(csv.reader(io.StringIO(text, newline='')))
+
+    def _key_text(self, row: int) -> str:
+        start, end = self.spans[row]
+        # Fast path: key is the first column and not quoted
+        if self.key_position == 0 and self.data[start:start + 1] != b'"':
+            comma = self.data.find(b',', start, end)
+            stop = comma if comma != -1 else end
+            return self.data[start:stop].decode(ENCODING).rstrip('\r\n')
+        fields = self._parse(self.spans[row])
+        return fields[self.key_position] if self.key_position < len(fields) else ''
+
+    def find(self, key: str) -> List[int]:
+        """Record numbers matching a requested id (empty if absent)"""
+        return self.index.get(self.normalize_key(key), [])
+
+    @property
+    def duplicate_keys(self) -> List[str]:
+        return [key for key, rows in self.index.items() if len(rows) > 1]
+
+    def record(self, row: int) -> Dict[str, str]:
+        """One record as a column -> raw text mapping"""
+        return dict(zip(self.header, self._parse(self.spans[row])))
+
+    def _field_span(self, row: int, position: int) -> Optional[Tuple[int, int]]:
+        """Byte span of one field of a record, found without parsing the others (None if malformed/short)"""
+        start, end = self.spans[row]
+        skip = self._skip_patterns.get(position)
+        if skip is None:
+            skip = self._skip_patterns[position] = re.compile(rb'(?:%s,){%d}' % (_FIELD, position))
+        match = skip.match(self.data, start, end)
+        if match is None:
+            return None
+        field_end = _FIELD_RE.match(self.data, match.end(), end).end()
+        if field_end < end and self.data[field_end:field_end + 1] not in (b',', b'\r', b'\n'):
+            return None
+        return match.end(), field_end
+
+    def fields(self, row: int, columns: List[str]) -> Dict[str, str]:
+        """Some columns of one record (missing columns -> ''), parsing only those fields"""
+        values = {}
+        for column in columns:
+            if column not in self.header:
+                values[column] = ''
+                continue
+            span = self._field_span(row, self.header.index(column))
+            if span is None:
+                return {column: self.record(row).get(column, '') for column in columns}
+            text = self.data[span[0]:span[1]].decode(ENCODING)
+            values[column] = text[1:-1].replace('""', '"') if text.startswith('"') else text
+        return values
+
+    def record_bytes(self, row: int) -> bytes:
+        start, end = self.spans[row]
+        return self.data[start:end]
+
+    def _serialize(self, fields: List[str], terminated: bool) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator=self.newline.decode()).writerow(fields)
+        encoded = buffer.getvalue().encode(ENCODING)
+        return encoded if terminated else encoded[:-len(self.newline)]
+
+    def _encode_field(self, value) -> bytes:
+        text = '' if value is None else str(value)
+        # A lone empty field would be written as "" (csv keeps empty rows distinguishable)
+        return self._serialize([text], terminated=False) if text else b''
+
+    def _patch_fields(self, row: int, columns: Dict[str, str]) -> Optional[bytes]:
+        """The record with only the given fields replaced (None when a field cannot be located)"""
+        spans = []
+        for column, value in columns.items():
+            span = self._field_span(row, self.header.index(column))
+            if span is None:
+                return None
+            spans.append((span, self._encode_field(value)))
+        start, end = self.spans[row]
+        pieces = []
+        cursor = start
+        for (field_start, field_end), encoded in sorted(spans):
+            pieces.append(self.data[cursor:field_start])
+            pieces.append(encoded)
+            cursor = field_end
+        pieces.append(self.data[cursor:end])
+        return b''.join(pieces)
+
+    def patch(self, updates: Dict[int, Dict[str, str]]) -> Tuple[bytes, Dict[int, Tuple[bytes, bytes]]]:
+        """
+        Apply {record number: {column: new text}} and return the new file bytes
+
+        Only the touched fields are replaced (a record whose fields cannot be located
+        is parsed and re-serialized as a whole); everything else is copied byte for
+        byte. Also returns {record number: (old bytes, new bytes)}.
+        """
+        for columns in updates.values():
+            for column in columns:
+                if column not in self.header:
+                    raise KeyError(f"{column} column not found in {self.path}")
+
+        pieces = []
+        changed = {}
+        cursor = 0
+        for row in sorted(updates):
+            start, end = self.spans[row]
+            old_bytes = self.data[start:end]
+            new_bytes = self._patch_fields(row, updates[row])
+            if new_bytes is None:
+                fields = self._parse((start, end))
+                fields += [''] * (len(self.header) - len(fields))
+                for column, value in updates[row].items():
+                    fields[self.header.index(column)] = '' if value is None else str(value)
+                new_bytes = self._serialize(fields, terminated=old_bytes.endswith(b'\n'))
+            pieces.append(self.data[cursor:start])
+            pieces.append(new_bytes)
+            cursor = end
+            if new_bytes != old_bytes:
+                changed[row] = (old_bytes, new_bytes)
+        pieces.append(self.data[cursor:])
+        return b''.join(pieces), changed
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """Write bytes next to the target and rename over it (readers never see a partial file)"""
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,413 @@
+"""
+SYNC JOURNAL - WRITE-AHEAD LOG OF OPERATIONS THAT REPLACE SEVERAL FILES
+Every file is replaced atomically, but an operation that replaces two of them
+(a nombre edit of master + working, sync_campaigns publishing both working
+campaign files) could die between the two renames and leave the layers
+disagreeing. Such operations now append their intent to a journal before the
+first file is touched and mark it done after the last one:
+
+    {"id": "20250101_120000_000001-4242", "event": "begin", "operation": "update_nombre",
+     "time": "...", "changes": [{"kind": "records", "path": ..., "size": ..., "new_size": ...,
+                                 "records": [[offset, "old record", "new record"], ...]}, ...]}
+    {"id": "20250101_120000_000001-4242", "event": "commit", "time": "..."}
+
+Change kinds:
+- records: records spliced into a CSV (byte offset in the old file, old and
+  new text); replaying splices them again
+- file: a whole file replaced by content with a known SHA-256 (size, and the
+  staged file it came from); replaying copies it from the staged file or from
+  another destination of the operation that already holds it
+
+Replay is idempotent: a change whose file already holds the new content is left
+alone. recover() runs whenever the profile lock is taken exclusively (the only
+time no operation can be in flight) and rolls every operation that began but
+never ended forward; one whose files no longer hold either version is aborted
+and reported instead of being forced.
+
+The journal also replaces the per-edit delta backups: old and new record text
+of every point edit stays in it until a checkpoint folds it into a backup
+snapshot (every backup_all_files, and whenever the journal outgrows
+CHECKPOINT_BYTES) and truncates it.
+
+Layout (<backups>/journal/):
+    journal.jsonl      one JSON entry per line, appended and fsync'ed
+    open/<id>          marker of an operation that began and has not ended
+    checkpoint.json    {"created", "backup", "operations", "bytes"} of the last checkpoint
+"""
+
+import hashlib
+import itertools
+import json
+import logging
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+from sync_csv_records import write_atomic
+
+logger = logging.getLogger(__name__)
+
+# Fold the journal into a backup snapshot once it grows past this many bytes
+CHECKPOINT_BYTES = 64 * 1024 * 1024
+
+CHUNK_SIZE = 1024 * 1024
+
+# What a change's file holds now
+BEFORE = 'before'
+AFTER = 'after'
+OTHER = 'other'
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _fsync_dir(path: str) -> None:
+    """Make a new/removed directory entry durable (no-op where directories can't be opened)"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+# ----------------------------------------------------------------------
+# Change kinds
+# ----------------------------------------------------------------------
+
+def records_change(path: str, old_data: bytes, new_data: bytes, records: List) -> Dict:
+    """
+    A CSV rewritten by splicing records: records is [(offset in old_data, old bytes,
+    new bytes), ...] in file order
+    """
+    return {
+        "kind": "records",
+        "path": path,
+        "size": len(old_data),
+        "new_size": len(new_data),
+        "records": [[offset, old.decode('utf-8'), new.decode('utf-8')] for offset, old, new in records]
+    }
+
+
+def _records_state(change: Dict, data: Optional[bytes]) -> str:
+    if data is None:
+        return OTHER
+    shift = 0
+    before = len(data) == change['size']
+    after = len(data) == change['new_size']
+    for offset, old, new in change['records']:
+        old, new = old.encode('utf-8'), new.encode('utf-8')
+        before = before and data[offset:offset + len(old)] == old
+        after = after and data[offset + shift:offset + shift + len(new)] == new
+        shift += len(new) - len(old)
+        if not (before or after):
+            return OTHER
+    return AFTER if after else BEFORE
+
+
+def _records_apply(change: Dict, data: bytes) -> bytes:
+    pieces = []
+    cursor = 0
+    for offset, old, new in change['records']:
+        pieces.append(data[cursor:offset])
+        pieces.append(new.encode('utf-8'))
+        cursor = offset + len(old.encode('utf-8'))
+    pieces.append(data[cursor:])
+    return b''.join(pieces)
+
+
+def _read(path: str) -> Optional[bytes]:
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _holds(path: str, sha256: str, size: int) -> bool:
+    try:
+        if os.path.getsize(path) != size:
+            return False
+    except OSError:
+        return False
+    return _file_sha256(path) == sha256
+
+
+def _copy_atomic(source: str, destination: str) -> None:
+    tmp_path = f"{destination}.replay-{os.getpid()}"
+    try:
+        shutil.copyfile(source, tmp_path)
+        with open(tmp_path, 'rb') as f:
+            os.fsync(f.fileno())
+        if os.path.exists(destination):
+            os.chmod(tmp_path, os.stat(destination).st_mode & 0o777)
+        os.replace(tmp_path, destination)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def change_states(changes: List[Dict]) -> List[str]:
+    """BEFORE / AFTER / OTHER per change (file changes are AFTER or BEFORE, never OTHER)"""
+    states = []
+    for change in changes:
+        if change['kind'] == 'records':
+            states.append(_records_state(change, _read(change['path'])))
+        else:
+            states.append(AFTER if _holds(change['path'], change['sha256'], change['size']) else BEFORE)
+    return states
+
+
+def replay_changes(changes: List[Dict]) -> int:
+    """
+    Bring every change to its new content, returns files rewritten
+
+    Raises ValueError (before writing anything) when a file holds neither version
+    or a replaced file's content is nowhere to be found
+    """
+    states = change_states(changes)
+    if OTHER in states:
+        stuck = [change['path'] for change, state in zip(changes, states) if state == OTHER]
+        raise ValueError(f"changed since the operation began: {', '.join(stuck)}")
+
+    sources = {}
+    for change, state in zip(changes, states):
+        if change['kind'] == 'file' and state == BEFORE and change['sha256'] not in sources:
+            holders = [other['path'] for other, other_state in zip(changes, states)
+                       if other['kind'] == 'file' and other_state == AFTER and other['sha256'] == change['sha256']]
+            if not holders and change.get('source') and _holds(change['source'], change['sha256'], change['size']):
+                holders = [change['source']]
+            if not holders:
+                raise ValueError(f"new content of {change['path']} is gone (no file was replaced)")
+            sources[change['sha256']] = holders[0]
+
+    rewritten = 0
+    for change, state in zip(changes, states):
+        if state == AFTER:
+            continue
+        if change['kind'] == 'records':
+            write_atomic(change['path'], _records_apply(change, _read(change['path'])))
+        else:
+            _copy_atomic(sources[change['sha256']], change['path'])
+        rewritten += 1
+    return rewritten
+
+
+# ----------------------------------------------------------------------
+# Journal
+# ----------------------------------------------------------------------
+
+class OperationJournal:
+    def __init__(self, root: str, checkpoint_backup: Optional[Callable[[], str]] = None,
+                 checkpoint_bytes: int = CHECKPOINT_BYTES):
+        """
+        root: journal directory (<backups>/journal)
+        checkpoint_backup: takes a backup snapshot of the layer files, returns its id
+        (called when the journal outgrows checkpoint_bytes)
+        """
+        self.root = root
+        self.path = os.path.join(root, 'journal.jsonl')
+        self.open_dir = os.path.join(root, 'open')
+        self.checkpoint_path = os.path.join(root, 'checkpoint.json')
+        self.checkpoint_backup = checkpoint_backup
+        self.checkpoint_bytes = checkpoint_bytes
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+
+    # ------------------------------------------------------------------
+    # Appending
+    # ------------------------------------------------------------------
+
+    def _append(self, entry: Dict) -> None:
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            with open(self.path, 'ab') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def begin(self, operation: str, changes: List[Dict]) -> str:
+        """Record an operation's changes before any of its files is replaced, returns its id"""
+        operation_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}-{os.getpid()}-{next(self._sequence)}"
+        # The marker goes first: recovery only looks for operations that have one
+        os.makedirs(self.open_dir, exist_ok=True)
+        with open(os.path.join(self.open_dir, operation_id), 'wb') as f:
+            os.fsync(f.fileno())
+        _fsync_dir(self.open_dir)
+        self._append({"id": operation_id, "event": "begin", "operation": operation,
+                      "time": datetime.now().isoformat(), "changes": changes})
+        return operation_id
+
+    def _end(self, operation_id: str, entry: Dict) -> None:
+        self._append({"id": operation_id, "time": datetime.now().isoformat(), **entry})
+        marker = os.path.join(self.open_dir, operation_id)
+        if os.path.exists(marker):
+            os.remove(marker)
+
+    def commit(self, operation_id: str, replayed: bool = False) -> None:
+        self._end(operation_id, {"event": "commit", **({"replayed": True} if replayed else {})})
+        if self.checkpoint_backup is not None and self.size() > self.checkpoint_bytes:
+            self.checkpoint(self.checkpoint_backup())
+
+    def abort(self, operation_id: str, reason: str) -> None:
+        self._end(operation_id, {"event": "abort", "reason": reason})
+
+    @contextmanager
+    def operation(self, operation: str, changes: List[Dict]) -> Iterator[str]:
+        """
+        Journal the block that replaces the changes' files
+
+        If the block raises and every file still holds its old content the operation
+        is aborted; otherwise it stays open and the next recover() finishes it.
+        """
+        if not changes:
+            yield None
+            return
+        operation_id = self.begin(operation, changes)
+        try:
+            yield operation_id
+        except BaseException as e:
+            try:
+                untouched = all(state == BEFORE for state in change_states(changes))
+            except OSError:
+                untouched = False
+            if untouched:
+                self.abort(operation_id, f"failed: {e}")
+            else:
+                logger.error(f"{operation} failed halfway, journal operation {operation_id} left open for recovery")
+            raise
+        self.commit(operation_id)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def entries(self) -> List[Dict]:
+        """Every entry since the last checkpoint (a torn last line from a crash is skipped)"""
+        entries = []
+        try:
+            with open(self.path, 'rb') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        logger.warning(f"Skipping unreadable journal line in {self.path}")
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def operations(self) -> List[Dict]:
+        """One summary per operation since the last checkpoint: id, operation, begun, status, files"""
+        summaries = {}
+        for entry in self.entries():
+            if entry['event'] == 'begin':
+                summaries[entry['id']] = {
+                    "id": entry['id'],
+                    "operation": entry['operation'],
+                    "begun": entry['time'],
+                    "status": 'open',
+                    "files": [change['path'] for change in entry['changes']],
+                    "records": sum(len(change.get('records', ())) for change in entry['changes'])
+                }
+            elif entry['id'] in summaries:
+                summary = summaries[entry['id']]
+                summary['status'] = 'replayed' if entry.get('replayed') else (
+                    'committed' if entry['event'] == 'commit' else 'aborted')
+                summary['ended'] = entry['time']
+                if entry.get('reason'):
+                    summary['reason'] = entry['reason']
+        return list(summaries.values())
+
+    def open_ids(self) -> List[str]:
+        try:
+            return sorted(os.listdir(self.open_dir))
+        except FileNotFoundError:
+            return []
+
+    def last_checkpoint(self) -> Optional[Dict]:
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    # ------------------------------------------------------------------
+    # Recovery and checkpoints
+    # ------------------------------------------------------------------
+
+    def recover(self) -> List[Dict]:
+        """
+        Finish every operation left open by a crashed process (caller holds the
+        profile lock exclusively), returns {"id", "operation", "outcome", ...} for each
+        """
+        open_ids = self.open_ids()
+        if not open_ids:
+            return []
+        begun = {entry['id']: entry for entry in self.entries() if entry['event'] == 'begin'}
+        outcomes = []
+        for operation_id in open_ids:
+            entry = begun.get(operation_id)
+            if entry is None:
+                # Crashed between the marker and the begin entry: nothing was touched
+                os.remove(os.path.join(self.open_dir, operation_id))
+                continue
+            try:
+                rewritten = replay_changes(entry['changes'])
+            except (ValueError, OSError) as e:
+                logger.error(f"Journal: not replaying {entry['operation']} {operation_id}: {e}")
+                self.abort(operation_id, f"not replayed: {e}")
+                outcomes.append({"id": operation_id, "operation": entry['operation'], "outcome": 'aborted',
+                                 "reason": str(e)})
+                continue
+            logger.warning(f"Journal: replayed {entry['operation']} {operation_id} ({rewritten} files rewritten)")
+            self.commit(operation_id, replayed=True)
+            # Staged files the crashed process never got to remove
+            for source in {change['source'] for change in entry['changes'] if change.get('source')}:
+                if os.path.exists(source):
+                    os.remove(source)
+            outcomes.append({"id": operation_id, "operation": entry['operation'], "outcome": 'replayed',
+                             "files_rewritten": rewritten})
+        return outcomes
+
+    def checkpoint(self, backup_id: str) -> bool:
+        """
+        Fold the journal into a backup snapshot just taken (backup_id) and truncate it
+
+        Skipped (False) while an operation is open: its changes are not in the snapshot
+        """
+        if self.open_ids():
+            return False
+        operations = self.operations()
+        previous = self.last_checkpoint() or {}
+        os.makedirs(self.root, exist_ok=True)
+        write_atomic(self.checkpoint_path, json.dumps({
+            "created": datetime.now().isoformat(),
+            "backup": backup_id,
+            "operations": len(operations),
+            "bytes": self.size(),
+            "previous_backup": previous.get('backup')
+        }, indent=2).encode('utf-8'))
+        if os.path.exists(self.path):
+            write_atomic(self.path, b'')
+        if operations:
+            logger.info(f"Journal checkpoint: {len(operations)} operations folded into backup {backup_id}")
+        return True
@@ -0,0 +1,309 @@
+"""
+JSON STREAM - ENTRY-BY-ENTRY ACCESS TO LARGE CAMPAIGN DATABASES
+MASTER_CAMPAIGN_DATABASE.json is one object whose 'contractors' member holds
+every campaign. Instead of json.load-ing the whole file, JsonObjectIndex scans
+it once for the byte span of each contractor entry and parses an entry again
+only when it is asked for. JsonObjectWriter writes the same layout back one
+entry at a time.
+
+Memory stays bounded by the largest single entry plus the id -> span index.
+"""
+
+import codecs
+import json
+import os
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+CHUNK_SIZE = 1024 * 1024
+COMPACT_SEPARATORS = (',', ':')
+MIN_VALUE_WINDOW = 16 * 1024
+
+# A complete string, a structural character, or a lone quote (string cut by the read buffer)
+_TOKEN = re.compile(rb'"(?:[^"\\]|\\.)*"|[{}\[\],:]|"', re.S)
+_WHITESPACE = re.compile(rb'[ \t\n\r]*')
+_DECODER = json.JSONDecoder()
+_VALUE_DELIMITERS = frozenset(' \t\n\r,}]')
+
+Span = Tuple[int, int]
+
+
+class _TokenScanner:
+    """Structural tokens and whole values of a JSON file with their absolute byte offsets, read in chunks"""
+
+    def __init__(self, f):
+        self.f = f
+        self.buffer = bytearray()
+        self.base = 0       # file offset of buffer[0]
+        self.pos = 0        # scan position inside buffer
+        self.eof = False
+        self.window = MIN_VALUE_WINDOW
+
+    def _fill(self) -> bool:
+        # Everything before pos has been tokenized and is never needed again
+        del self.buffer[:self.pos]
+        self.base += self.pos
+        self.pos = 0
+        chunk = self.f.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer += chunk
+        return True
+
+    def next(self) -> Tuple[bytes, int, int, bytes]:
+        """(kind, start, end, text) of the next token, kind is its first byte"""
+        while True:
+            match = _TOKEN.search(self.buffer, self.pos)
+            if match is not None and (match.end() - match.start() > 1 or match.group() != b'"'):
+                self.pos = match.end()
+                text = match.group()
+                return text[:1], self.base + match.start(), self.base + match.end(), text
+            if not self._fill():
+                if match is not None:
+                    raise ValueError(f"Unterminated string at byte {self.base + match.start()}")
+                raise ValueError("Unexpected end of JSON document")
+
+    def expect(self, kind: bytes) -> Tuple[bytes, int, int, bytes]:
+        token = self.next()
+        if token[0] != kind:
+            raise ValueError(f"Expected {kind.decode()!r} at byte {token[1]}, found {token[3][:20]!r}")
+        return token
+
+    def skip_value(self) -> int:
+        """
+        Consume one JSON value and return the byte offset where it ends
+
+        The value is run through the C decoder over a window of the buffer (grown
+        until the value fits), which is far faster than tokenizing it here.
+        """
+        while True:
+            start = _WHITESPACE.match(self.buffer, self.pos).end()
+            stop = start + self.window
+            if stop > len(self.buffer) and not self.eof:
+                # Filling shifts the buffer, so offsets are recomputed on the next pass
+                self._fill()
+                continue
+            complete = self.eof and stop >= len(self.buffer)
+
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            text = decoder.decode(bytes(self.buffer[start:stop]), final=complete)
+            try:
+                _, end = _DECODER.raw_decode(text)
+            except json.JSONDecodeError as e:
+                if complete:
+                    raise ValueError(f"Invalid JSON value at byte {self.base + start}: {e}") from e
+                self.window *= 2
+                continue
+            if end == len(text) or text[end] not in _VALUE_DELIMITERS:
+                # A number cut by the window edge ("2." of "2.5") still parses: only accept
+                # a value once the character after it shows it really ended
+                if not complete:
+                    self.window *= 2
+                    continue
+                if end < len(text):
+                    raise ValueError(f"Invalid JSON value at byte {self.base + start}")
+
+            self.pos = start + len(text[:end].encode('utf-8'))
+            self.window = max(MIN_VALUE_WINDOW, 2 * (self.pos - start))
+            return self.base + self.pos
+
+
+class JsonObjectIndex:
+    """
+    Byte spans of a top-level JSON object's members and of the entries of one
+    object-valued member (key, 'contractors' by default)
+
+    A missing path behaves like an empty document, the same as a layer whose
+    campaign file has not been created yet.
+    """
+
+    def __init__(self, path: Optional[str], key: str = 'contractors'):
+        self.path = path
+        self.key = key
+        self.members: Dict[str, Span] = {}
+        self.entries: Dict[str, Span] = {}
+        self.found = False
+        self._file = None
+        if path is not None and os.path.exists(path):
+            self._file = open(path, 'rb')
+            self._scan()
+
+    def _scan(self) -> None:
+        scanner = _TokenScanner(self._file)
+        scanner.expect(b'{')
+        while True:
+            kind, start, end, text = scanner.next()
+            if kind == b'}':
+                break
+            if kind != b'"':
+                raise ValueError(f"Expected a member name at byte {start} of {self.path}")
+            name = json.loads(text)
+            value_start = scanner.expect(b':')[2]
+
+            if name == self.key:
+                self.found = True
+                if scanner.next()[0] != b'{':
+                    raise ValueError(f"'{self.key}' is not an object in {self.path}")
+                self._scan_entries(scanner)
+                self.members[name] = (value_start, scanner.base + scanner.pos)
+                if self._end_of_object(scanner):
+                    break
+                continue
+
+            self.members[name] = (value_start, scanner.skip_value())
+            if self._end_of_object(scanner):
+                break
+
+    def _end_of_object(self, scanner: _TokenScanner) -> bool:
+        """After a member value: True on the object's closing brace, False on a comma"""
+        kind, start, _, _ = scanner.next()
+        if kind not in (b',', b'}'):
+            raise ValueError(f"Expected ',' or '}}' at byte {start} of {self.path}")
+        return kind == b'}'
+
+    def _scan_entries(self, scanner: _TokenScanner) -> None:
+        while True:
+            kind, start, end, text = scanner.next()
+            if kind == b'}':
+                return
+            if kind != b'"':
+                raise ValueError(f"Expected a contractor id at byte {start} of {self.path}")
+            name = json.loads(text)
+            value_start = scanner.expect(b':')[2]
+            # Duplicate ids: json.load keeps the first position and the last value
+            self.entries[name] = (value_start, scanner.skip_value())
+            if self._end_of_object(scanner):
+                return
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _read(self, span: Span) -> Any:
+        self._file.seek(span[0])
+        return json.loads(self._file.read(span[1] - span[0]).decode('utf-8'))
+
+    def raw(self, name: str) -> bytes:
+        """Undecoded bytes of an entry (equal bytes mean equal entries, without parsing)"""
+        start, end = self.entries[name]
+        self._file.seek(start)
+        return self._file.read(end - start)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.entries)
+
+    def entry(self, name: str) -> Any:
+        """Freshly parsed entry (callers may modify it)"""
+        return self._read(self.entries[name])
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        for name, span in self.entries.items():
+            yield name, self._read(span)
+
+    def surrounding_members(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Parsed top-level members before and after the indexed object, in file order"""
+        before, after = {}, {}
+        target = before
+        for name, span in self.members.items():
+            if name == self.key:
+                target = after
+                continue
+            target[name] = self._read(span)
+        return before, after
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'JsonObjectIndex':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class JsonObjectWriter:
+    """
+    Writes {**prelude, key: {entries...}, **epilogue} one entry at a time
+
+    indent=2 reproduces json.dump(doc, indent=2) byte for byte; indent=None writes
+    compact JSON. Output goes to a temp file renamed over path on success, so the
+    target may also be one of the files being read. With stream (an open text
+    file, e.g. from Publisher.open) the document is written there instead and
+    path is not used. default is passed to json.dumps (e.g. to write records).
+    """
+
+    def __init__(self, path: Optional[str], key: str = 'contractors', prelude: Optional[Dict] = None,
+                 epilogue: Optional[Dict] = None, indent: Optional[int] = 2, ensure_ascii: bool = False,
+                 default: Optional[Callable[[Any], Any]] = None, stream=None):
+        self.path = path
+        self.key = key
+        self.prelude = prelude or {}
+        self.epilogue = epilogue or {}
+        self.indent = indent
+        self.ensure_ascii = ensure_ascii
+        self.default = default
+        self.count = 0
+        self._stream = stream
+        self._tmp_path = None if stream is not None else f"{path}.tmp-{os.getpid()}"
+        self._file = None
+
+    def _dumps(self, value: Any, level: int) -> str:
+        if self.indent is None:
+            return json.dumps(value, separators=COMPACT_SEPARATORS, ensure_ascii=self.ensure_ascii,
+                              default=self.default)
+        text = json.dumps(value, indent=self.indent, ensure_ascii=self.ensure_ascii, default=self.default)
+        # JSON strings never contain raw newlines, so this only shifts the layout
+        return text.replace('\n', '\n' + ' ' * (self.indent * level))
+
+    def _member_prefix(self, level: int) -> str:
+        return '' if self.indent is None else '\n' + ' ' * (self.indent * level)
+
+    def _name(self, name: str) -> str:
+        separator = ':' if self.indent is None else ': '
+        return json.dumps(name, ensure_ascii=self.ensure_ascii) + separator
+
+    def __enter__(self) -> 'JsonObjectWriter':
+        if self._stream is not None:
+            self._file = self._stream
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._file = open(self._tmp_path, 'w', encoding='utf-8')
+        self._file.write('{')
+        for name, value in self.prelude.items():
+            self._file.write(f"{self._member_prefix(1)}{self._name(name)}{self._dumps(value, 1)},")
+        self._file.write(f"{self._member_prefix(1)}{self._name(self.key)}{{")
+        return self
+
+    def write(self, name: str, value: Any) -> None:
+        separator = ',' if self.count else ''
+        self._file.write(f"{separator}{self._member_prefix(2)}{self._name(name)}{self._dumps(value, 2)}")
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        try:
+            if exc_type is None:
+                self._file.write(f"{self._member_prefix(1)}}}" if self.count else '}')
+                for name, value in self.epilogue.items():
+                    self._file.write(f",{self._member_prefix(1)}{self._name(name)}{self._dumps(value, 1)}")
+                self._file.write(f"{self._member_prefix(0)}}}")
+            if self._stream is not None:
+                # The stream's owner closes (and publishes) it
+                return
+            self._file.close()
+            if exc_type is None:
+                if os.path.exists(self.path):
+                    os.chmod(self._tmp_path, os.stat(self.path).st_mode & 0o777)
+                os.replace(self._tmp_path, self.path)
+        finally:
+            if self._tmp_path is not None and os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
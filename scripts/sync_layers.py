@@ -0,0 +1,71 @@
+"""
+LAYER SCHEMA - L1..L5 PARTITIONS OF THE CONTRACTOR TABLE
+The contractor CSV is five intelligence layers side by side (L1_ ... L5_
+column prefixes, L1 holding the large review texts) plus unprefixed base
+columns (business_id, timestamps, nombre, focus_intel_*). Snapshots store each
+layer as its own partition and the CSV merge resolves one layer at a time, so
+a caller only pays for the layers it asks for.
+
+Column sources give the merge a uniform lazy interface over an in-memory frame
+or a snapshot: .columns (names, no data) and .load(columns) -> DataFrame.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Sequence
+
+from sync_lazy import lazy_import
+
+pd = lazy_import('pandas')
+
+
+BASE_LAYER = 'base'
+LAYERS = (BASE_LAYER, 'L1', 'L2', 'L3', 'L4', 'L5')
+
+
+def column_layer(name: str) -> str:
+    """Layer a column belongs to ('L1'..'L5' by prefix, 'base' otherwise)"""
+    prefix = name[:3]
+    if len(prefix) == 3 and prefix[0] == 'L' and prefix[2] == '_' and prefix[:2] in LAYERS:
+        return prefix[:2]
+    return BASE_LAYER
+
+
+def partition_columns(columns: Iterable[str]) -> Dict[str, List[str]]:
+    """Columns grouped by layer, layers in LAYERS order, columns in their original order"""
+    partitions = {layer: [] for layer in LAYERS}
+    for name in columns:
+        partitions[column_layer(name)].append(name)
+    return {layer: names for layer, names in partitions.items() if names}
+
+
+def layer_columns(columns: Sequence[str], layers: Iterable[str]) -> List[str]:
+    """The columns of the given layers, in table order (unknown layer names raise KeyError)"""
+    wanted = set(layers)
+    unknown = wanted.difference(LAYERS)
+    if unknown:
+        raise KeyError(f"Unknown layers: {', '.join(sorted(unknown))}")
+    return [name for name in columns if column_layer(name) in wanted]
+
+
+class FrameSource:
+    """Column source over a DataFrame that is already in memory"""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.columns = list(df.columns)
+
+    def load(self, columns: Sequence[str]) -> pd.DataFrame:
+        return self.df[list(columns)]
+
+
+class SnapshotSource:
+    """Column source over a CSV snapshot: only the requested column files are read"""
+
+    def __init__(self, snapshots, csv_path: str):
+        self.snapshots = snapshots
+        self.csv_path = csv_path
+        self.columns = snapshots.columns(csv_path)
+
+    def load(self, columns: Sequence[str]) -> pd.DataFrame:
+        return self.snapshots.load(self.csv_path, list(columns))
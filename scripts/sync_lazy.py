@@ -0,0 +1,38 @@
+"""
+LAZY IMPORTS - HEAVY DEPENDENCIES LOADED ON FIRST USE
+pandas and numpy take ~0.4 s to import, more than a whole --status,
+--sync-campaigns or --journal run needs. Modules of the sync bind them with
+
+    pd = lazy_import('pandas')
+
+(plus `from __future__ import annotations`, so DataFrame annotations are not
+evaluated): the name is a placeholder module until an attribute is first read,
+which imports the real package in place. Commands that never touch a frame
+run on the stdlib alone; bench_startup.py checks that they stay that way.
+"""
+
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """The module `name`, executed only when one of its attributes is first accessed"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def is_loaded(name: str) -> bool:
+    """Whether a module has really been imported (not just bound lazily)"""
+    module = sys.modules.get(name)
+    return module is not None and not isinstance(module, importlib.util._LazyModule)
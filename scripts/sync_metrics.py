@@ -0,0 +1,260 @@
+"""
+SYNC METRICS - PER-OPERATION INSTRUMENTATION OF THREE LAYER SYNC
+Every public ThreeLayerSync operation produces one report: wall and CPU time,
+bytes read and written, peak RSS, counters (rows, campaigns, ...) and a break
+down per stage. Reports are saved as JSON (<metrics dir>/<operation>.json) and
+the CLI prints the last one as a single machine-readable stdout line:
+
+    SYNC_METRICS {"operation": "full_sync", "wall_seconds": 4.2, "stages": {...}, ...}
+
+Byte counters are the process' read()/write() totals (/proc/self/io rchar and
+wchar, block I/O elsewhere) and peak RSS is reset at the start of each stage
+where the kernel allows it. Like CPU time they are process-wide: when stages
+overlap (full_sync --parallel) the per-stage figures overlap too, the totals
+stay exact.
+"""
+
+import cProfile
+import functools
+import json
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Prefix of the stdout line that carries the last operation report
+STDOUT_PREFIX = 'SYNC_METRICS '
+
+# Allocation sites listed in a --profiling tracemalloc dump
+TRACEMALLOC_TOP = 30
+
+
+def io_counters() -> Dict[str, int]:
+    """Bytes this process has read and written so far"""
+    try:
+        counters = {}
+        with open('/proc/self/io', 'r') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                counters[key] = int(value)
+        return {"read_bytes": counters['rchar'], "written_bytes": counters['wchar']}
+    except (OSError, KeyError, ValueError):
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        # Block counts only (512-byte units), page cache hits are not visible here
+        return {"read_bytes": usage.ru_inblock * 512, "written_bytes": usage.ru_oublock * 512}
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process (since the last reset_peak_rss)"""
+    # Linux keeps ru_maxrss across exec (a child would report the parent's peak); VmHWM does not
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def reset_peak_rss() -> bool:
+    """Restart peak RSS tracking at the current RSS (Linux 4.0+), False where unsupported"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+class _Probe:
+    """Counters at the start of a measured span, .finish() returns the deltas"""
+
+    def __init__(self, reset_peak: bool):
+        if reset_peak:
+            reset_peak_rss()
+        self.started = time.perf_counter()
+        self.cpu = _cpu_seconds()
+        self.io = io_counters()
+
+    def finish(self) -> Dict:
+        io = io_counters()
+        return {
+            "wall_seconds": round(time.perf_counter() - self.started, 3),
+            "cpu_seconds": round(_cpu_seconds() - self.cpu, 3),
+            "read_bytes": io['read_bytes'] - self.io['read_bytes'],
+            "written_bytes": io['written_bytes'] - self.io['written_bytes'],
+            "peak_rss_mb": round(peak_rss_mb(), 1)
+        }
+
+
+class SyncMetrics:
+    def __init__(self, report_dir: Optional[str] = None):
+        """
+        report_dir: where <operation>.json reports are saved (None: keep them in memory only)
+        """
+        self.report_dir = report_dir
+        self.last = None
+        self._report = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._open_stages = 0
+
+    @contextmanager
+    def operation(self, name: str) -> Iterator[None]:
+        """
+        Measure one operation; an operation started inside another one is recorded
+        as a stage of the outer one (or not at all when already inside a stage)
+        """
+        if self._report is not None:
+            with self.stage(name):
+                yield
+            return
+
+        report = {"operation": name, "started": datetime.now().isoformat(), "counters": {}, "stages": {}}
+        self._report = report
+        probe = _Probe(reset_peak=True)
+        try:
+            yield
+            report.setdefault('success', True)
+        except BaseException:
+            report['success'] = False
+            raise
+        finally:
+            report.update(probe.finish())
+            self._report = None
+            self.last = report
+            self._save(report)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Measure one stage of the running operation (no-op outside an operation or inside a stage)"""
+        report = self._report
+        if report is None or getattr(self._local, 'stage', None) is not None:
+            yield
+            return
+
+        with self._lock:
+            # Only reset the peak when no other thread is in the middle of a stage
+            reset = self._open_stages == 0
+            self._open_stages += 1
+        self._local.stage = name
+        probe = _Probe(reset_peak=reset)
+        try:
+            yield
+        finally:
+            self._local.stage = None
+            with self._lock:
+                self._open_stages -= 1
+                report['stages'][name] = probe.finish()
+
+    def stages(self) -> Dict[str, Dict]:
+        """Stages the running operation has finished so far (copy)"""
+        report = self._report
+        if report is None:
+            return {}
+        with self._lock:
+            return {name: dict(stage) for name, stage in report['stages'].items()}
+
+    def count(self, **counters: int) -> None:
+        """Add to the running operation's counters (rows=..., campaigns=...)"""
+        report = self._report
+        if report is None:
+            return
+        with self._lock:
+            for key, value in counters.items():
+                report['counters'][key] = report['counters'].get(key, 0) + value
+
+    def record(self, key: str, value) -> None:
+        """Attach a named detail (e.g. the backup cost) to the running operation"""
+        report = self._report
+        if report is not None:
+            with self._lock:
+                report[key] = value
+
+    def _save(self, report: Dict) -> None:
+        if self.report_dir is None:
+            return
+        try:
+            os.makedirs(self.report_dir, exist_ok=True)
+            path = os.path.join(self.report_dir, f"{report['operation']}.json")
+            tmp_path = f"{path}.tmp-{os.getpid()}"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # Instrumentation never fails the operation it measures
+            logger.warning(f"Could not save metrics report: {e}")
+
+    def stdout_line(self) -> Optional[str]:
+        """The last report as one SYNC_METRICS line (None before any operation ran)"""
+        if self.last is None:
+            return None
+        return STDOUT_PREFIX + json.dumps(self.last, separators=(',', ':'))
+
+
+def instrumented(name: str):
+    """Method decorator: run the method as a SyncMetrics operation of self.metrics
+
+    A method returning False (the CLI-style failure result) is reported as unsuccessful.
+    """
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.operation(name):
+                result = method(self, *args, **kwargs)
+                if result is False:
+                    self.metrics.record('success', False)
+                return result
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def profiled(directory: str, label: str) -> Iterator[Dict[str, str]]:
+    """
+    cProfile + tracemalloc the block (calling thread only for cProfile)
+
+    On exit writes <label>_<timestamp>.prof (pstats format, e.g. snakeviz or
+    python -m pstats) and .tracemalloc.txt (top allocation sites and peak), and
+    fills the yielded dict with their paths.
+    """
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, f"{label}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    paths = {}
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield paths
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if started_tracing:
+            tracemalloc.stop()
+
+        paths['cprofile'] = f"{base}.prof"
+        profiler.dump_stats(paths['cprofile'])
+        paths['tracemalloc'] = f"{base}.tracemalloc.txt"
+        with open(paths['tracemalloc'], 'w', encoding='utf-8') as f:
+            f.write(f"traced peak: {peak / (1024 * 1024):.1f} MB, still allocated: {current / (1024 * 1024):.1f} MB\n\n")
+            for stat in snapshot.statistics('lineno')[:TRACEMALLOC_TOP]:
+                f.write(f"{stat}\n")
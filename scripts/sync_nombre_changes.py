@@ -0,0 +1,84 @@
+"""
+NOMBRE CHANGES - BATCH INGESTION OF THE APP'S PENDING NOMBRE EDITS
+The update-nombre API saves edits to public/data/nombre_changes.json (next to
+the working CSV) instead of touching the CSVs:
+
+    {"changes": {"4549": "Bob", "00994": "Cy"}, "last_updated": "...", "version": "1.0"}
+
+`sync_system.py --apply-nombre-changes` applies the whole file as one batch
+(ThreeLayerSync.update_nombre_fields: one pass per CSV and one journal entry,
+id spellings resolved to canonical contractors) and then removes the entries
+it applied (and older spellings of the same ids they replaced). Entries that
+could not be applied (unknown ids) stay in the file.
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Dict
+
+from sync_csv_records import write_atomic
+
+CHANGES_FILE = 'nombre_changes.json'
+
+# Re-reads of a change file the app keeps rewriting before giving up on clearing it
+CLEAR_ATTEMPTS = 5
+
+
+def load_nombre_changes(path: str) -> Dict[str, str]:
+    """{contractor id as written: nombre} of a change file ({} if it does not exist)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+    except FileNotFoundError:
+        return {}
+    # Also accepts a bare {id: nombre} mapping (--update-nombre-batch files)
+    changes = payload.get('changes', payload) if isinstance(payload, dict) else None
+    if not isinstance(changes, dict):
+        raise ValueError(f"{path}: expected {{\"changes\": {{id: nombre}}}}")
+    return {str(contractor_id): '' if nombre is None else str(nombre) for contractor_id, nombre in changes.items()}
+
+
+def clear_applied(path: str, consumed: Dict[str, str]) -> int:
+    """
+    Remove the entries a batch consumed ({id as written: nombre}, applied or
+    superseded by another spelling of the same id), returns entries removed
+
+    The file is re-read right before it is replaced (and re-read again if it changed
+    while this ran), so entries the app saved in the meantime survive: an entry is
+    only removed while it still holds the value the batch read.
+    """
+    for _ in range(CLEAR_ATTEMPTS):
+        try:
+            stamp = _stamp(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except FileNotFoundError:
+            return 0
+        if not isinstance(payload, dict):
+            return 0
+        changes = payload['changes'] if isinstance(payload.get('changes'), dict) else payload
+
+        applied_keys = [contractor_id for contractor_id, nombre in changes.items()
+                        if contractor_id in consumed and consumed[contractor_id] == ('' if nombre is None else str(nombre))]
+        if not applied_keys:
+            return 0
+        for contractor_id in applied_keys:
+            del changes[contractor_id]
+        if changes is not payload:
+            payload['last_applied'] = datetime.now().isoformat()
+        if _stamp(path) != stamp:
+            continue
+        write_atomic(path, json.dumps(payload, indent=2, ensure_ascii=False).encode('utf-8'))
+        return len(applied_keys)
+    raise OSError(f"{path} kept changing, applied entries were not cleared")
+
+
+def _stamp(path: str):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def default_changes_path(working_csv: str) -> str:
+    """The app keeps the change file in the same public/data directory as the working CSV"""
+    return os.path.join(os.path.dirname(working_csv), CHANGES_FILE)
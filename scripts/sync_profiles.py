@@ -0,0 +1,181 @@
+"""
+SYNC PROFILES - WHICH DATA ROOT A SYNC RUNS AGAINST
+A profile names one set of master / working / temporal / backup paths, so the
+same code syncs several independent data roots (tenants, staging copies, CI
+fixtures). Profiles come from a JSON file (SYNC_PROFILES_FILE, default
+scripts/sync_profiles.json):
+
+    {
+      "profiles": {
+        "tenant-a": {
+          "root": "/srv/sync/tenant-a",
+          "temporal_dir": "/mnt/nvme/sync/tenant-a",
+          "master_paths": {"csv": "master/CONTRACTORS - Master_Sheet.csv"}
+        }
+      }
+    }
+
+or from the environment alone (SYNC_ROOT [+ SYNC_SCRATCH_DIR]). Relative paths
+resolve against root (temporal_paths against temporal_dir), paths not given
+follow ROOT_LAYOUT; ~ and $VARS are expanded. The profile without a root
+("default") keeps the built-in ThreeLayerSync paths.
+
+temporal_dir (or SYNC_SCRATCH_DIR for any profile) moves the temporal layer and
+everything derived from it (snapshots, metrics, change feed, publish state) to a
+fast scratch volume; merged files reach the working layer by copy when the
+volumes differ.
+"""
+
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_PROFILE = 'default'
+
+# Profile selection: --profile NAME, then SYNC_PROFILE, then SYNC_ROOT, then DEFAULT_PROFILE
+PROFILE_ENV = 'SYNC_PROFILE'
+PROFILES_FILE_ENV = 'SYNC_PROFILES_FILE'
+ROOT_ENV = 'SYNC_ROOT'
+SCRATCH_ENV = 'SYNC_SCRATCH_DIR'
+
+DEFAULT_PROFILES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sync_profiles.json')
+
+# Name of the profile built from SYNC_ROOT when no profile is selected
+ENV_PROFILE = 'env'
+
+# Where each file lives under a profile root (temporal files under temporal_dir)
+ROOT_LAYOUT = {
+    'master_paths': {
+        'csv': 'master/CONTRACTORS - Master_Sheet.csv',
+        'json_enhanced': 'master/CONTRACTORS_5_LAYERS_ENHANCED.json',
+        'json_campaigns': 'master/MASTER_CAMPAIGN_DATABASE.json',
+    },
+    'working_paths': {
+        'csv': 'working/contractors_original.csv',
+        'json_campaigns': 'working/MASTER_CAMPAIGN_DATABASE.json',
+        'json_app': 'working/campaigns.json',
+    },
+    'temporal_paths': {
+        'csv': 'merged_contractors.csv',
+        'json_campaigns': 'merged_campaigns.json',
+        'conflicts': 'merge_conflicts.json',
+    },
+}
+ROOT_TEMPORAL_DIR = 'temp'
+ROOT_BACKUP_DIR = 'backups'
+
+PATH_GROUPS = ('master_paths', 'working_paths', 'temporal_paths')
+
+
+class ProfileError(ValueError):
+    """Unknown profile or an invalid profile definition"""
+
+
+def _expand(path: str) -> str:
+    return os.path.expandvars(os.path.expanduser(path))
+
+
+def _resolve(path: str, base: Optional[str], what: str) -> str:
+    path = _expand(path)
+    if os.path.isabs(path):
+        return path
+    if base is None:
+        raise ProfileError(f"{what} is relative ({path}) but the profile has no root")
+    return os.path.join(base, path)
+
+
+class SyncProfile:
+    def __init__(self, name: str, definition: Optional[Dict] = None):
+        """
+        name: profile name (reports and logs)
+        definition: {"root", "temporal_dir", "backup_dir", "master_paths", ...}, see module docstring
+        """
+        self.name = name
+        self.definition = dict(definition or {})
+        unknown = set(self.definition) - {'root', 'temporal_dir', 'backup_dir', *PATH_GROUPS}
+        if unknown:
+            raise ProfileError(f"Profile {name}: unknown keys {sorted(unknown)}")
+
+    def sync_kwargs(self) -> Dict:
+        """Constructor arguments of ThreeLayerSync for this profile"""
+        definition = self.definition
+        root = _expand(definition['root']) if definition.get('root') else None
+        if root is not None and not os.path.isabs(root):
+            root = os.path.abspath(root)
+
+        temporal_dir = os.environ.get(SCRATCH_ENV) or definition.get('temporal_dir')
+        if temporal_dir:
+            temporal_dir = os.path.abspath(_expand(temporal_dir))
+        elif root is not None:
+            temporal_dir = os.path.join(root, ROOT_TEMPORAL_DIR)
+
+        kwargs = {}
+        for group in PATH_GROUPS:
+            base = temporal_dir if group == 'temporal_paths' else root
+            # Without a root only the given paths (and a scratch temporal layer) are overridden
+            paths = dict(ROOT_LAYOUT[group]) if base is not None else {}
+            paths.update(definition.get(group) or {})
+            if paths:
+                kwargs[group] = {key: _resolve(path, base, f"{self.name}.{group}.{key}")
+                                 for key, path in paths.items()}
+
+        if definition.get('backup_dir'):
+            kwargs['backup_dir'] = _resolve(definition['backup_dir'], root, f"{self.name}.backup_dir")
+        elif root is not None:
+            kwargs['backup_dir'] = os.path.join(root, ROOT_BACKUP_DIR)
+        return kwargs
+
+
+def load_profiles(path: Optional[str] = None) -> Dict[str, Dict]:
+    """Profile definitions from the profiles file ({} when there is none)"""
+    path = path or os.environ.get(PROFILES_FILE_ENV) or DEFAULT_PROFILES_FILE
+    try:
+        with open(_expand(path), 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        if path != DEFAULT_PROFILES_FILE:
+            raise ProfileError(f"Profiles file not found: {path}")
+        return {}
+    except ValueError as e:
+        raise ProfileError(f"Invalid profiles file {path}: {e}")
+
+    profiles = config.get('profiles') if isinstance(config, dict) else None
+    if not isinstance(profiles, dict):
+        raise ProfileError(f"{path}: expected {{\"profiles\": {{name: {{...}}}}}}")
+    return profiles
+
+
+def load_profile(name: Optional[str] = None, path: Optional[str] = None) -> SyncProfile:
+    """
+    The selected profile: name (--profile), else SYNC_PROFILE, else an ad-hoc
+    profile from SYNC_ROOT, else the default one
+    """
+    name = name or os.environ.get(PROFILE_ENV)
+    if not name:
+        if os.environ.get(ROOT_ENV):
+            return SyncProfile(ENV_PROFILE, {"root": os.environ[ROOT_ENV]})
+        name = DEFAULT_PROFILE
+
+    profiles = load_profiles(path)
+    if name in profiles:
+        return SyncProfile(name, profiles[name])
+    if name == DEFAULT_PROFILE:
+        return SyncProfile(DEFAULT_PROFILE)
+    raise ProfileError(f"Unknown sync profile: {name} (known: {', '.join(sorted(profiles)) or 'none'})")
+
+
+def pop_profile_arg(argv: List[str]) -> Tuple[Optional[str], List[str]]:
+    """Split "--profile NAME" (or --profile=NAME) out of argv -> (name or None, remaining argv)"""
+    remaining = []
+    name = None
+    args = iter(argv)
+    for arg in args:
+        if arg == '--profile':
+            name = next(args, None)
+            if name is None:
+                raise ProfileError("--profile needs a profile name")
+        elif arg.startswith('--profile='):
+            name = arg.split('=', 1)[1]
+        else:
+            remaining.append(arg)
+    return name, remaining
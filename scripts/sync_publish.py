@@ -0,0 +1,339 @@
+"""
+PUBLISH STAGE - WRITE ONCE, FAN OUT TO EVERY DESTINATION
+A sync artifact is serialized a single time into a staged file (its SHA-256 is
+computed while it is written) and then made visible at each destination:
+
+- destinations that already hold that content are left untouched
+- the others are replaced atomically (temp name + rename) by a hardlink to the
+  staged file, a reflink (copy-on-write clone) where hardlinks are not possible,
+  or a plain copy as a last resort
+
+Readers such as the Next.js app never see a half-written file. Hardlinked
+destinations share one inode, so every writer of these files has to replace
+them (write_atomic / Publisher), never rewrite them in place.
+
+With a journal (sync_journal), a fan-out that replaces more than one
+destination is journaled first, so a crash between two renames is finished
+by the next recovery instead of leaving the destinations disagreeing.
+"""
+
+import errno
+import hashlib
+import io
+import itertools
+import json
+import logging
+import os
+import shutil
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+# ioctl number of FICLONE on Linux (btrfs, XFS with reflink=1, ...)
+FICLONE = 0x40049409
+
+
+def _reflink(source: str, destination: str) -> None:
+    """Copy-on-write clone of source at destination, OSError where unsupported"""
+    if sys.platform == 'darwin':
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        # APFS clonefile(2)
+        if libc.clonefile(os.fsencode(source), os.fsencode(destination), 0) != 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code), destination)
+        return
+
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError(errno.ENOTSUP, "reflink not supported on this platform", destination)
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return
+        except OSError:
+            pass
+    os.remove(destination)
+    raise OSError(errno.ENOTSUP, "reflink not supported by this filesystem", destination)
+
+
+class _HashingWriter(io.RawIOBase):
+    """Binary sink that hashes everything written through it"""
+
+    def __init__(self, f):
+        self.f = f
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.digest.update(data)
+        self.f.write(data)
+        self.size += len(data)
+        return len(data)
+
+
+class Publisher:
+    def __init__(self, state_path: str, hardlink: bool = True, journal=None):
+        """
+        state_path: JSON stat cache (path -> mtime, size, sha256) of published files
+        hardlink: allow destinations to share the staged file's inode
+        journal: OperationJournal recording fan-outs to several destinations
+        """
+        self.state_path = state_path
+        self.hardlink = hardlink
+        self.journal = journal
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._pending = None
+        self._held_calls = None
+        self._local = threading.local()
+
+    # ------------------------------------------------------------------
+    # Destination hashes
+    # ------------------------------------------------------------------
+
+    def _load_state(self) -> Dict:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, state: Dict) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def hash_cache(self) -> Dict:
+        """path -> {"mtime_ns", "size", "sha256"} of every file published so far"""
+        return self._load_state()
+
+    @staticmethod
+    def _remember(state: Dict, path: str, sha256: str) -> None:
+        stat = os.stat(path)
+        state[path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": sha256}
+
+    @staticmethod
+    def _file_sha256(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _current_sha256(self, path: str, size_hint: int, state: Dict) -> Optional[str]:
+        """Hash of what path holds now (None if missing); a size mismatch skips hashing"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        entry = state.get(path)
+        if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            return entry['sha256']
+        if stat.st_size != size_hint:
+            return ''
+        sha256 = self._file_sha256(path)
+        self._remember(state, path, sha256)
+        return sha256
+
+    # ------------------------------------------------------------------
+    # Placing files
+    # ------------------------------------------------------------------
+
+    def _place(self, source: str, destination: str) -> str:
+        """Atomically replace destination with source's content, returns the method used"""
+        os.makedirs(os.path.dirname(os.path.abspath(destination)), exist_ok=True)
+        tmp_path = f"{destination}.publish-{os.getpid()}"
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+
+        method = None
+        if self.hardlink:
+            try:
+                os.link(source, tmp_path)
+                method = 'hardlink'
+            except OSError:
+                pass
+        if method is None:
+            try:
+                _reflink(source, tmp_path)
+                method = 'reflink'
+            except OSError:
+                shutil.copyfile(source, tmp_path)
+                method = 'copy'
+        if method != 'hardlink' and os.path.exists(destination):
+            os.chmod(tmp_path, os.stat(destination).st_mode & 0o777)
+
+        try:
+            os.replace(tmp_path, destination)
+        finally:
+            if os.path.lexists(tmp_path):
+                os.remove(tmp_path)
+        return method
+
+    def _fan_out(self, source: str, sha256: str, size: int, destinations: Sequence[str]) -> Dict[str, str]:
+        state = self._load_state()
+        results = {destination: 'unchanged' for destination in destinations
+                   if self._current_sha256(destination, size, state) == sha256}
+        replaced = [destination for destination in destinations if destination not in results]
+        if self.journal is not None and len(replaced) > 1:
+            changes = [{"kind": "file", "path": destination, "sha256": sha256, "size": size, "source": source}
+                       for destination in replaced]
+            with self.journal.operation('publish', changes):
+                self._place_all(source, sha256, replaced, state, results)
+        else:
+            self._place_all(source, sha256, replaced, state, results)
+        self._save_state(state)
+
+        summary = ', '.join(f"{os.path.basename(path)}: {method}" for path, method in results.items())
+        logger.info(f"Published {size} bytes ({summary})")
+        return results
+
+    def _place_all(self, source: str, sha256: str, destinations: Sequence[str], state: Dict,
+                   results: Dict[str, str]) -> None:
+        for destination in destinations:
+            results[destination] = self._place(source, destination)
+            self._remember(state, destination, sha256)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def open(self, destinations: Sequence[str], encoding: Optional[str] = 'utf-8',
+             newline: Optional[str] = None) -> Iterator[io.IOBase]:
+        """
+        Serialize once into a staged file, then publish it to every destination
+
+            with publisher.open([a, b]) as f:
+                json.dump(data, f, indent=2)
+
+        Yields a text stream (binary if encoding is None); nothing is published if
+        the block raises. The outcome per destination is in the .results attribute
+        (empty while publishing is deferred).
+        """
+        if not destinations:
+            raise ValueError("No destinations to publish to")
+        staged = f"{destinations[0]}.staged-{os.getpid()}-{next(self._sequence)}"
+        os.makedirs(os.path.dirname(os.path.abspath(staged)), exist_ok=True)
+        self.results = {}
+
+        raw = open(staged, 'wb')
+        hashing = _HashingWriter(raw)
+        buffered = io.BufferedWriter(hashing, CHUNK_SIZE)
+        stream = io.TextIOWrapper(buffered, encoding=encoding, newline=newline) if encoding else buffered
+        try:
+            try:
+                yield stream
+                stream.flush()
+                raw.flush()
+                os.fsync(raw.fileno())
+            finally:
+                raw.close()
+            with self._lock:
+                if self._pending is not None:
+                    self._pending.append((getattr(self._local, 'group', None), staged,
+                                          hashing.digest.hexdigest(), hashing.size, destinations))
+                    staged = None
+            if staged is not None:
+                self.results = self._fan_out(staged, hashing.digest.hexdigest(), hashing.size, destinations)
+        finally:
+            if staged is not None and os.path.exists(staged):
+                os.remove(staged)
+
+    @contextmanager
+    def group(self, name: str) -> Iterator[None]:
+        """Label the publishes this thread makes inside the block (see publish_held)"""
+        self._local.group = name
+        try:
+            yield
+        finally:
+            self._local.group = None
+
+    @contextmanager
+    def deferred(self) -> Iterator[None]:
+        """
+        Hold back every open()/publish_bytes() made inside the block, from any thread
+
+        Held files are published when the block exits cleanly (or earlier, per group,
+        through publish_held); if it raises, whatever is still held is discarded and
+        those destinations do not change.
+        """
+        with self._lock:
+            if self._pending is not None:
+                raise RuntimeError("Publishing is already deferred")
+            self._pending = []
+            self._held_calls = []
+        try:
+            yield
+            self.publish_held()
+        finally:
+            with self._lock:
+                pending, self._pending = self._pending, None
+                self._held_calls = None
+            for _, staged, _, _, _ in pending:
+                if os.path.exists(staged):
+                    os.remove(staged)
+
+    def publish_held(self, groups: Optional[Iterable[str]] = None) -> None:
+        """
+        Publish the held files of some groups (all if None), in the order they were
+        staged, then run their held after_publish() calls
+        """
+        selected = None if groups is None else set(groups)
+        with self._lock:
+            held = [entry for entry in self._pending if selected is None or entry[0] in selected]
+            self._pending = [entry for entry in self._pending if entry not in held]
+            calls = [fn for group, fn in self._held_calls if selected is None or group in selected]
+            self._held_calls = [entry for entry in self._held_calls if entry[1] not in calls]
+        for position, (_, staged, sha256, size, destinations) in enumerate(held):
+            try:
+                self._fan_out(staged, sha256, size, destinations)
+            except BaseException:
+                for _, leftover, _, _, _ in held[position:]:
+                    if os.path.exists(leftover):
+                        os.remove(leftover)
+                raise
+            os.remove(staged)
+        for fn in calls:
+            fn()
+
+    def after_publish(self, fn: Callable[[], None]) -> None:
+        """
+        Run fn once this thread's files are published: right away, or while publishing
+        is deferred, when its group is (it is dropped with a discarded group)
+
+        For side files written outside open() (write_atomic), so they follow the
+        outputs they describe.
+        """
+        with self._lock:
+            if self._held_calls is not None:
+                self._held_calls.append((getattr(self._local, 'group', None), fn))
+                return
+        fn()
+
+    def publish_bytes(self, data: bytes, destinations: Sequence[str]) -> Dict[str, str]:
+        with self.open(destinations, encoding=None) as f:
+            f.write(data)
+        return self.results
+
+    def publish_file(self, source: str, destinations: Sequence[str]) -> Dict[str, str]:
+        """Make every destination hold source's content (source itself is left in place)"""
+        state = self._load_state()
+        size = os.path.getsize(source)
+        sha256 = self._current_sha256(source, size, state)
+        self._save_state(state)
+        return self._fan_out(source, sha256, size, destinations)
@@ -0,0 +1,259 @@
+"""
+SYNC SCHEDULE - CAMPAIGN EMAILS BY DATE, PARTITIONED BY WEEK
+The calendar views used to walk every contractor of campaigns.json to find what
+falls in the week on screen. The sync keeps a date index of every campaign
+instead, so "what is due between D1 and D2" reads only the weeks in that range:
+
+    <root>/weeks/2025-W36.json    [[date, time, contractor_id, email_number, kind, company], ...]
+    <root>/ready/monday.json      [[null, time, contractor_id, 1, "ready", company], ...]
+    <root>/contractors.json       {contractor_id: [digest, [partition, ...]]}
+    <root>/index.json             {"version": 1, "source": ..., "updated": ..., "partitions": {name: rows}}
+
+Week partitions hold dated emails, sorted by date: "sent" / "opened" /
+"responded" on those dates, "scheduled" on a scheduled_date, and "due" for the
+next email of a sequence, on its best day (contact_timing.best_day_email_N, else
+the email's send_day) after the previous one was sent. A first email that was
+never sent has no date of its own: it is "ready" on the next occurrence of its
+best day, which the query resolves against today (as the calendar does).
+
+Partitions are rewritten only for contractors whose schedule digest changed:
+the campaign merges hand in each contractor they wrote (contractor_schedule)
+and unchanged ones cost a hash.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sync_csv_records import write_atomic
+from sync_json_stream import COMPACT_SEPARATORS
+
+SCHEDULE_VERSION = 1
+
+FIELDS = ('date', 'time', 'contractor_id', 'email_number', 'kind', 'company')
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+# Dated email fields -> kind of their schedule row
+DATED_FIELDS = (('sent_date', 'sent'), ('opened_date', 'opened'), ('responded_date', 'responded'),
+                ('scheduled_date', 'scheduled'))
+
+
+def week_partition(day: date) -> str:
+    year, week, _ = day.isocalendar()
+    return f"weeks/{year}-W{week:02d}"
+
+
+def _date(value) -> Optional[date]:
+    """The day of a stored date or timestamp ("2025-09-01", "2025-09-01T10:00:00"), None if unreadable"""
+    if not isinstance(value, str) or len(value) < 10:
+        return None
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        return None
+
+
+def _weekday(name) -> Optional[int]:
+    if not isinstance(name, str):
+        return None
+    name = name.strip().lower()
+    return WEEKDAYS.index(name) if name in WEEKDAYS else None
+
+
+def contractor_schedule(contractor_id: str, entry) -> Dict[str, List[list]]:
+    """
+    Schedule rows of one campaign entry (dict or campaign record) by partition
+
+    Emails of a sequence are taken in email_number order; a later email only gets
+    a "due" row once the one before it has a sent date.
+    """
+    campaign_data = entry.get('campaign_data')
+    if not campaign_data:
+        return {}
+    timing = campaign_data.get('contact_timing') or {}
+    company = entry.get('company_name') or campaign_data.get('company_name') or ''
+    numbered = []
+    for position, sequence in enumerate(campaign_data.get('email_sequences') or ()):
+        number = sequence.get('email_number')
+        numbered.append((number if isinstance(number, int) else position + 1, sequence))
+    numbered.sort(key=lambda item: item[0])
+
+    partitions = {}
+    previous_sent = None
+    for position, (number, sequence) in enumerate(numbered):
+        time = sequence.get('send_time') or timing.get('window_a_time') or ''
+        row = [None, time, contractor_id, number]
+        for field, kind in DATED_FIELDS:
+            day = _date(sequence.get(field))
+            if day is not None:
+                partitions.setdefault(week_partition(day), []).append([day.isoformat(), *row[1:], kind, company])
+        sent = _date(sequence.get('sent_date'))
+        if sent is None and sequence.get('status') != 'sent':
+            weekday = _weekday(timing.get(f"best_day_email_{number}") or sequence.get('send_day'))
+            if weekday is not None and position == 0:
+                partitions.setdefault(f"ready/{WEEKDAYS[weekday]}", []).append([*row, 'ready', company])
+            elif weekday is not None and previous_sent is not None:
+                due = previous_sent + timedelta(days=(weekday - previous_sent.weekday() - 1) % 7 + 1)
+                partitions.setdefault(week_partition(due), []).append([due.isoformat(), *row[1:], 'due', company])
+            # Nothing after an email that is still pending
+            break
+        previous_sent = sent
+    return partitions
+
+
+def _digest(partitions: Dict[str, List[list]]) -> str:
+    payload = json.dumps(partitions, sort_keys=True, separators=COMPACT_SEPARATORS, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def _row_key(row: list) -> Tuple:
+    return row[0] or '', row[2], row[3], row[4]
+
+
+class ScheduleIndex:
+    def __init__(self, root: str, source: str):
+        """root: the index directory; source: the campaigns JSON it describes"""
+        self.root = root
+        self.source = source
+
+    def _path(self, partition: str) -> str:
+        return os.path.join(self.root, f"{partition}.json")
+
+    def _read(self, name: str, default):
+        try:
+            with open(self._path(name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return default
+
+    def _write(self, name: str, payload) -> None:
+        path = self._path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_atomic(path, json.dumps(payload, separators=COMPACT_SEPARATORS, ensure_ascii=False).encode('utf-8'))
+
+    def exists(self) -> bool:
+        header = self._read('index', None)
+        return header is not None and header.get('version') == SCHEDULE_VERSION
+
+    def invalidate(self) -> None:
+        """Drop the index (the next query rebuilds it from the source)"""
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def update(self, schedules: Iterable[Tuple[str, Dict[str, List[list]]]], complete: bool = False,
+               removed: Iterable[str] = ()) -> Dict:
+        """
+        Replace the rows of contractors whose schedule changed
+
+        schedules: (contractor_id, contractor_schedule(...)) pairs; complete: they are
+        every contractor of the source (the others are dropped); removed: contractors
+        that are gone. Only partitions holding changed rows are rewritten.
+        Returns {"contractors": changed, "partitions": rewritten}.
+        """
+        exists = self.exists()
+        known = self._read('contractors', {}) if exists else {}
+        # partition -> contractors whose rows there are replaced / new rows
+        replaced: Dict[str, set] = {}
+        added: Dict[str, List[list]] = {}
+        changed = set()
+        seen = set()
+        for contractor_id, partitions in schedules:
+            seen.add(contractor_id)
+            digest = _digest(partitions)
+            previous = known.get(contractor_id)
+            if previous is not None and previous[0] == digest:
+                continue
+            for partition in (previous[1] if previous is not None else ()):
+                replaced.setdefault(partition, set()).add(contractor_id)
+            for partition, rows in partitions.items():
+                replaced.setdefault(partition, set()).add(contractor_id)
+                added.setdefault(partition, []).extend(rows)
+            known[contractor_id] = [digest, sorted(partitions)]
+            changed.add(contractor_id)
+
+        gone = set(removed) | (set(known) - seen if complete else set())
+        for contractor_id in gone - seen:
+            previous = known.pop(contractor_id, None)
+            if previous is not None:
+                for partition in previous[1]:
+                    replaced.setdefault(partition, set()).add(contractor_id)
+                changed.add(contractor_id)
+
+        header = self._read('index', None) if exists else None
+        counts = dict(header['partitions']) if header else {}
+        for partition, contractors in sorted(replaced.items()):
+            rows = [row for row in self._read(partition, []) if row[2] not in contractors]
+            rows.extend(added.get(partition, ()))
+            if rows:
+                rows.sort(key=_row_key)
+                self._write(partition, rows)
+                counts[partition] = len(rows)
+            else:
+                counts.pop(partition, None)
+                if os.path.exists(self._path(partition)):
+                    os.remove(self._path(partition))
+
+        if changed or header is None:
+            self._write('contractors', known)
+            self._write('index', {"version": SCHEDULE_VERSION, "source": self.source,
+                                  "updated": datetime.now().isoformat(), "contractors": len(known),
+                                  "partitions": dict(sorted(counts.items()))})
+        return {"contractors": len(changed), "partitions": len(replaced)}
+
+    def rebuild(self, contractors: Dict) -> Dict:
+        """
+        The whole index from a campaigns mapping (contractor id -> entry)
+
+        Built next to the index and swapped in with renames, so a concurrent reader
+        never sees it half written; if another rebuild got there first, it wins.
+        """
+        staging = ScheduleIndex(f"{self.root}.staged-{os.getpid()}", self.source)
+        staging.invalidate()
+        result = staging.update(((contractor_id, contractor_schedule(contractor_id, entry))
+                                 for contractor_id, entry in contractors.items()), complete=True)
+        retired = f"{self.root}.retired-{os.getpid()}"
+        try:
+            if os.path.exists(self.root):
+                os.rename(self.root, retired)
+            os.rename(staging.root, self.root)
+        except OSError:
+            staging.invalidate()
+        shutil.rmtree(retired, ignore_errors=True)
+        return result
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def due(self, start: date, end: date, today: Optional[date] = None) -> List[Dict]:
+        """
+        Schedule rows dated start..end (inclusive), by date
+
+        Reads the week partitions overlapping the range, plus the ready partition
+        of each weekday whose next occurrence from today (default: the current
+        date) falls in it.
+        """
+        today = today or date.today()
+        rows = []
+        week = start - timedelta(days=start.weekday())
+        first, last = start.isoformat(), end.isoformat()
+        while week <= end:
+            partition = self._read(week_partition(week), [])
+            dates = [row[0] for row in partition]
+            rows.extend(partition[bisect_left(dates, first):bisect_right(dates, last)])
+            week += timedelta(days=7)
+
+        for weekday, name in enumerate(WEEKDAYS):
+            day = today + timedelta(days=(weekday - today.weekday()) % 7)
+            if start <= day <= end:
+                rows.extend([day.isoformat(), *row[1:]] for row in self._read(f"ready/{name}", []))
+        rows.sort(key=_row_key)
+        return [dict(zip(FIELDS, row)) for row in rows]
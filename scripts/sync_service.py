@@ -0,0 +1,171 @@
+"""
+SYNC SERVICE - LONG-LIVED 3-LAYER SYNC PROCESS
+Keeps one ThreeLayerSync instance (and its parsed datasets) warm in memory and
+answers the same commands as the sync_system.py CLI over local HTTP
+
+    python3 scripts/sync_service.py [--host 127.0.0.1] [--port 8765] [--profile NAME]
+
+One service serves one sync profile (see sync_profiles); run one per profile,
+each on its own port. Commands take the profile's cross-process lock, so CLI
+runs on the same profile are still serialized with the service.
+
+Protocol:
+    GET  /health                                  -> {"status": "ok", ...}
+    POST /run  {"args": ["--status"]}             -> {"exit_code": 0, "output": "...", ...}
+"""
+
+import io
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Dict, List
+
+from sync_profiles import ProfileError, load_profile
+from sync_system import ThreeLayerSync, run_command
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = os.environ.get('SYNC_SERVICE_HOST', '127.0.0.1')
+DEFAULT_PORT = int(os.environ.get('SYNC_SERVICE_PORT', '8765'))
+
+# Largest request body we accept (commands are a handful of short strings)
+MAX_BODY_BYTES = 64 * 1024
+
+
+class SyncService:
+    """Serializes CLI commands against a single warm ThreeLayerSync instance"""
+
+    def __init__(self, sync: ThreeLayerSync = None):
+        self.sync = sync or ThreeLayerSync()
+        self.started_at = time.time()
+        self.commands_served = 0
+        # Commands share files and the process-wide stdout redirect: one at a time
+        self._lock = threading.Lock()
+
+    def warm(self) -> int:
+        """Pre-load master and working datasets so the first request is already fast"""
+        started = time.perf_counter()
+        loaded = self.sync.warm_cache()
+        logger.info(f"Warmed {loaded} datasets in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return loaded
+
+    def run(self, argv: List[str]) -> Dict:
+        """Run one CLI command and capture what it would have printed"""
+        buffer = io.StringIO()
+        started = time.perf_counter()
+
+        with self._lock:
+            try:
+                with redirect_stdout(buffer):
+                    exit_code = run_command(self.sync, argv)
+            except Exception as e:
+                logger.error(f"Error running {argv}: {e}")
+                buffer.write(f"❌ {e}\n")
+                exit_code = 1
+            self.commands_served += 1
+
+        return {
+            "args": argv,
+            "exit_code": exit_code,
+            "success": exit_code == 0,
+            "output": buffer.getvalue(),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3)
+        }
+
+    def health(self) -> Dict:
+        return {
+            "status": "ok",
+            "pid": os.getpid(),
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "commands_served": self.commands_served,
+            "cached_datasets": len(self.sync._dataset_cache)
+        }
+
+
+def _make_handler(service: SyncService):
+    class SyncRequestHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status: int, payload: Dict) -> None:
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send_json(200, service.health())
+            else:
+                self._send_json(404, {"error": f"Unknown path: {self.path}"})
+
+        def do_POST(self):
+            if self.path != '/run':
+                self._send_json(404, {"error": f"Unknown path: {self.path}"})
+                return
+
+            length = int(self.headers.get('Content-Length') or 0)
+            if length > MAX_BODY_BYTES:
+                self._send_json(413, {"error": "Request body too large"})
+                return
+
+            try:
+                request = json.loads(self.rfile.read(length) or b'{}')
+                argv = request.get('args', [])
+                if not isinstance(argv, list) or not all(isinstance(a, str) for a in argv):
+                    raise ValueError("'args' must be a list of strings")
+            except ValueError as e:
+                self._send_json(400, {"error": f"Invalid request: {e}"})
+                return
+
+            self._send_json(200, service.run(argv))
+
+        def log_message(self, format, *args):
+            logger.info(f"{self.address_string()} {format % args}")
+
+    return SyncRequestHandler
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, warm: bool = True,
+          sync: ThreeLayerSync = None) -> None:
+    """Run the sync service until interrupted"""
+    service = SyncService(sync)
+    if warm:
+        service.warm()
+
+    server = HTTPServer((host, port), _make_handler(service))
+    logger.info(f"Sync service listening on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        logger.info("Sync service stopped")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Long-lived 3-layer sync service")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--no-warm', action='store_true', help="Skip pre-loading datasets at startup")
+    parser.add_argument('--profile', help="Sync profile to serve (default: SYNC_PROFILE / SYNC_ROOT / built-in paths)")
+    args = parser.parse_args()
+
+    # Logs go to stderr; command output is returned in the HTTP response
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    try:
+        profile = load_profile(args.profile)
+    except ProfileError as e:
+        parser.error(str(e))
+    logger.info(f"Sync profile: {profile.name}")
+
+    serve(args.host, args.port, warm=not args.no_warm, sync=ThreeLayerSync(**profile.sync_kwargs()))
+    sys.exit(0)
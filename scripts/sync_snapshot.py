@@ -0,0 +1,224 @@
+"""
+CSV SNAPSHOT CACHE - COLUMNAR BINARY COPIES OF THE CONTRACTOR CSVs
+Parsing the 207-column CSV (type inference + long review text) is the most
+expensive step of every sync operation. The first read of a CSV stores each
+column as its own pickled file next to an explicit dtype schema; later reads
+load only the columns they need. Low-cardinality L1_/L2_ text columns are
+stored as categoricals. Columns are grouped into one partition directory per
+layer (sync_layers), so reading the base columns never opens an L1 file.
+
+A snapshot is rebuilt only when the source CSV's content changes: a changed
+mtime/size triggers a hash check, and an unchanged hash just refreshes the stamp.
+
+Layout:
+    <root>/<source key>/current            name of the live version directory
+    <root>/<source key>/<sha256[:16]>/     schema.json + <layer>/c0000.pkl, <layer>/c0001.pkl, ...
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+from typing import Dict, List, Optional, Sequence
+
+from sync_layers import LAYERS, column_layer
+from sync_lazy import lazy_import
+
+pd = lazy_import('pandas')
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 2
+
+# Text columns with these prefixes become categoricals when they repeat enough
+CATEGORICAL_PREFIXES = ('L1_', 'L2_')
+CATEGORICAL_MAX_UNIQUE_RATIO = 0.5
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def _source_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _is_text(series: pd.Series) -> bool:
+    return pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype)
+
+
+class CsvSnapshotCache:
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _source_dir(self, csv_path: str) -> str:
+        absolute = os.path.abspath(csv_path)
+        key = hashlib.sha1(absolute.encode('utf-8')).hexdigest()[:12]
+        return os.path.join(self.root, f"{os.path.basename(absolute)}-{key}")
+
+    # ------------------------------------------------------------------
+    # Freshness
+    # ------------------------------------------------------------------
+
+    def _current_version_dir(self, source_dir: str) -> Optional[str]:
+        try:
+            with open(os.path.join(source_dir, 'current'), 'r', encoding='utf-8') as f:
+                version_dir = os.path.join(source_dir, f.read().strip())
+        except OSError:
+            return None
+        return version_dir if os.path.isdir(version_dir) else None
+
+    @staticmethod
+    def _read_schema(version_dir: str) -> Optional[Dict]:
+        try:
+            with open(os.path.join(version_dir, 'schema.json'), 'r', encoding='utf-8') as f:
+                schema = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if schema.get('schema_version') != SCHEMA_VERSION or schema.get('pandas_version') != pd.__version__:
+            return None
+        return schema
+
+    @staticmethod
+    def _write_json(path: str, payload) -> None:
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def _fresh_snapshot(self, csv_path: str) -> Optional[Dict]:
+        """Schema of an up-to-date snapshot of csv_path (None if it must be rebuilt)"""
+        source_dir = self._source_dir(csv_path)
+        version_dir = self._current_version_dir(source_dir)
+        if version_dir is None:
+            return None
+        schema = self._read_schema(version_dir)
+        if schema is None:
+            return None
+
+        stat = os.stat(csv_path)
+        if schema['source_mtime_ns'] == stat.st_mtime_ns and schema['source_size'] == stat.st_size:
+            schema['dir'] = version_dir
+            return schema
+
+        # Touched but maybe not changed: compare content before paying for a rebuild
+        if schema['source_size'] == stat.st_size and _source_sha256(csv_path) == schema['source_sha256']:
+            schema['source_mtime_ns'] = stat.st_mtime_ns
+            self._write_json(os.path.join(version_dir, 'schema.json'), schema)
+            schema['dir'] = version_dir
+            return schema
+        return None
+
+    # ------------------------------------------------------------------
+    # Build / load
+    # ------------------------------------------------------------------
+
+    def build(self, csv_path: str) -> Dict:
+        """Parse the CSV once and store it column by column, returns the schema"""
+        stat = os.stat(csv_path)
+        sha256 = _source_sha256(csv_path)
+        df = pd.read_csv(csv_path)
+
+        source_dir = self._source_dir(csv_path)
+        version_name = sha256[:16]
+        version_dir = os.path.join(source_dir, version_name)
+        tmp_dir = f"{version_dir}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for layer in LAYERS:
+            os.makedirs(os.path.join(tmp_dir, layer))
+
+        columns = []
+        for position, name in enumerate(df.columns):
+            series = df.iloc[:, position]
+            source_dtype = str(series.dtype)
+            categorical = False
+            if name.startswith(CATEGORICAL_PREFIXES) and _is_text(series):
+                non_null = series.count()
+                if non_null and series.nunique(dropna=True) <= CATEGORICAL_MAX_UNIQUE_RATIO * non_null:
+                    series = series.astype('category')
+                    categorical = True
+
+            layer = column_layer(name)
+            file_name = f"{layer}/c{position:04d}.pkl"
+            with open(os.path.join(tmp_dir, file_name), 'wb') as f:
+                pickle.dump(series.array, f, protocol=pickle.HIGHEST_PROTOCOL)
+            columns.append({
+                "name": name,
+                "dtype": source_dtype,
+                "categorical": categorical,
+                "layer": layer,
+                "file": file_name
+            })
+
+        schema = {
+            "schema_version": SCHEMA_VERSION,
+            "pandas_version": pd.__version__,
+            "source_path": os.path.abspath(csv_path),
+            "source_mtime_ns": stat.st_mtime_ns,
+            "source_size": stat.st_size,
+            "source_sha256": sha256,
+            "rows": len(df),
+            "columns": columns
+        }
+        self._write_json(os.path.join(tmp_dir, 'schema.json'), schema)
+
+        # Publish: version directories are immutable, 'current' is swapped atomically
+        shutil.rmtree(version_dir, ignore_errors=True)
+        os.replace(tmp_dir, version_dir)
+        tmp_pointer = os.path.join(source_dir, f"current.tmp-{os.getpid()}")
+        with open(tmp_pointer, 'w', encoding='utf-8') as f:
+            f.write(version_name)
+        os.replace(tmp_pointer, os.path.join(source_dir, 'current'))
+
+        # Older versions of this source are no longer referenced
+        for name in os.listdir(source_dir):
+            if name not in (version_name, 'current') and '.tmp-' not in name:
+                shutil.rmtree(os.path.join(source_dir, name), ignore_errors=True)
+
+        logger.info(f"Built snapshot of {csv_path}: {len(df)} rows x {len(columns)} columns "
+                    f"({sum(c['categorical'] for c in columns)} categorical)")
+        schema['dir'] = version_dir
+        return schema
+
+    def load(self, csv_path: str, columns: Optional[Sequence[str]] = None,
+             categorical: bool = False) -> pd.DataFrame:
+        """
+        Read csv_path through its snapshot (building it first if stale)
+
+        columns: only load these columns (KeyError if one is missing)
+        categorical: keep categorical columns as categoricals instead of the
+        dtype pd.read_csv would have produced
+        """
+        schema = self._fresh_snapshot(csv_path) or self.build(csv_path)
+        by_name = {column['name']: column for column in schema['columns']}
+
+        if columns is None:
+            selected = schema['columns']
+        else:
+            missing = [name for name in columns if name not in by_name]
+            if missing:
+                raise KeyError(f"Columns not in {csv_path}: {', '.join(missing)}")
+            selected = [by_name[name] for name in columns]
+
+        data = {}
+        for column in selected:
+            with open(os.path.join(schema['dir'], column['file']), 'rb') as f:
+                values = pickle.load(f)
+            if column['categorical'] and not categorical:
+                # Expand codes against the categories (a take, no per-value re-validation)
+                values = values.categories.array.take(values.codes, allow_fill=True)
+            data[column['name']] = values
+
+        return pd.DataFrame(data, index=pd.RangeIndex(schema['rows']))
+
+    def columns(self, csv_path: str) -> List[str]:
+        schema = self._fresh_snapshot(csv_path) or self.build(csv_path)
+        return [column['name'] for column in schema['columns']]
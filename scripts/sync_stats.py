@@ -0,0 +1,269 @@
+"""
+SYNC STATS - PRECOMPUTED DASHBOARD AGGREGATES
+/api/contractor-stats used to parse the whole working CSV and the app campaigns
+JSON (past its 5 minute cache) to count a few dozen numbers. The sync now keeps
+them in contractor_stats.json next to the working CSV, and the route serves that
+file while it is current:
+
+    {"version": 2, "updated": "...",
+     "contractors": {"stamp": "<mtime_ns>-<size>", "total": 5500,
+                     "completion": {"high": ..., "medium": ..., "low": ..., "veryLow": ...},
+                     "states": {...}, "categories": {...}, "speed": {...}, "rating": {...},
+                     "email": {...}, "reviews": {...}, "builders": {...}, "domain": {...},
+                     "nombres": {"total": 42, "coverage": 0.0076}},
+     "campaigns": {"stamp": "...", "total": 278, "processing_status": {"completed": 278},
+                   "cost": 1.581, "tokens": 11146688, "emails": 834,
+                   "email_status": {"sent": 12, "not_set": 822}},
+     "campaign_setup": {"stamps": {"contractors": "...", "campaigns": "..."},
+                        "ready": 270, "processing": 0, "notSetup": 5230, "failed": 0}}
+
+contractors uses the route's buckets and category rules, campaigns is computed
+from public/data/campaigns.json and campaign_setup counts the CSV rows whose
+canonical id has an entry with campaign_data (the route's fallback matches them
+the same way, with src/lib/utils/canonical-id.ts). Every section names the version (stamp) of the file(s) it was computed
+from; stamps are strings because mtime_ns does not fit a JavaScript number. A
+section whose file changed since is stale, and the route falls back to parsing.
+
+Sections are computed in one vectorized pass over a frame a sync already holds,
+or accumulated while sync_campaigns writes the merged campaigns; nombre edits
+only patch the nombre coverage. The canonical ids behind campaign_setup are kept
+in temp/stats_ids.json, so either side can be redone without the other file.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sync_contractor_index import canonical_id, canonical_id_series
+from sync_csv_records import write_atomic
+from sync_lazy import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+STATS_VERSION = 2
+
+# Columns the contractor aggregates read from the working CSV
+STATS_COLUMNS = ['business_id', 'data_completion_score', 'L1_state_code', 'L1_category', 'L1_google_rating',
+                 'L1_google_reviews_count', 'L1_psi_avg_performance', 'L2_email_quality', 'L1_builder_platform',
+                 'L1_review_frequency', 'L1_whois_domain_age_years', 'L1_whois_expiring_soon', 'nombre']
+
+STATES = {'alabama': 'AL', 'arkansas': 'AR', 'idaho': 'ID', 'kansas': 'KS', 'kentucky': 'KY',
+          'mississippi': 'MS', 'montana': 'MT', 'newMexico': 'NM', 'oklahoma': 'OK', 'southDakota': 'SD',
+          'utah': 'UT', 'westVirginia': 'WV'}
+
+# L1_category substrings of each mega category, in the order the route tries them (else 'other')
+MEGA_CATEGORIES = (
+    ('roofing', ('roofing', 'roof')),
+    ('hvac', ('hvac', 'heating', 'cooling', 'air conditioning')),
+    ('plumbing', ('plumber', 'plumbing')),
+    ('electrical', ('electrician', 'electric')),
+    ('remodeling', ('remodeling', 'drywall', 'carpet', 'floor', 'tile', 'counter')),
+    ('exterior', ('landscap', 'lawn', 'siding')),
+    ('heavyCivil', ('concrete',)),
+    ('homeBuilding', ('home builder', 'custom home')),
+    ('specialty', ('handyman',)),
+    ('suppliers', ('supplier',)),
+    ('ancillary', ('interior designer', 'waterproofing')),
+    ('construction', ('general contractor', 'construction company')),
+    ('windowDoor', ('window', 'door', 'glass')),
+)
+
+# L1_builder_platform values counted as custom sites (besides empty)
+CUSTOM_BUILDERS = ('WordPress', 'Apache', 'Nginx', 'Unknown', 'ERROR')
+
+# Email sequences without a status
+NO_STATUS = 'not_set'
+
+
+def stamp_key(stamp: Optional[Tuple[int, int]]) -> Optional[str]:
+    """The (mtime_ns, size) stamp of a file as stored in the stats"""
+    return None if stamp is None else f"{stamp[0]}-{stamp[1]}"
+
+
+def _numbers(df: pd.DataFrame, column: str) -> np.ndarray:
+    """A column as the route reads it: Number(value) || 0"""
+    if column not in df.columns:
+        return np.zeros(len(df))
+    return pd.to_numeric(df[column], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+
+
+def _texts(df: pd.DataFrame, column: str) -> pd.Series:
+    """A column as the route reads it: value || ''"""
+    if column not in df.columns:
+        return pd.Series('', index=df.index, dtype=object)
+    return df[column].fillna('').astype(str)
+
+
+def _count(mask: np.ndarray) -> int:
+    return int(np.count_nonzero(mask))
+
+
+def _mega_categories(categories: pd.Series) -> Dict[str, int]:
+    lowered = categories.str.lower()
+    codes = np.full(len(lowered), len(MEGA_CATEGORIES))
+    # Earlier rules win: apply them last
+    for code in range(len(MEGA_CATEGORIES) - 1, -1, -1):
+        pattern = '|'.join(re.escape(part) for part in MEGA_CATEGORIES[code][1])
+        codes[lowered.str.contains(pattern, regex=True).to_numpy(dtype=bool)] = code
+    counts = np.bincount(codes, minlength=len(MEGA_CATEGORIES) + 1)
+    names = [name for name, _ in MEGA_CATEGORIES] + ['other']
+    return {name: int(count) for name, count in zip(names, counts)}
+
+
+def contractor_stats(df: pd.DataFrame, stamp: Tuple[int, int]) -> Dict:
+    """The contractors section of one version of the working CSV (as loaded)"""
+    score = _numbers(df, 'data_completion_score')
+    rating = _numbers(df, 'L1_google_rating')
+    reviews = _numbers(df, 'L1_google_reviews_count')
+    speed = _numbers(df, 'L1_psi_avg_performance')
+    domain_age = _numbers(df, 'L1_whois_domain_age_years')
+    states = _texts(df, 'L1_state_code').value_counts()
+    email_quality = _texts(df, 'L2_email_quality').replace('', 'UNKNOWN').to_numpy()
+    builder = _texts(df, 'L1_builder_platform').to_numpy()
+    frequency = _texts(df, 'L1_review_frequency').to_numpy()
+    return {
+        "stamp": stamp_key(stamp),
+        "total": len(df),
+        "completion": {"high": _count(score >= 80), "medium": _count((score >= 60) & (score < 80)),
+                       "low": _count((score >= 35) & (score < 60)), "veryLow": _count(score < 35)},
+        "states": {name: int(states.get(code, 0)) for name, code in STATES.items()},
+        "categories": _mega_categories(_texts(df, 'L1_category')),
+        "speed": {"high": _count(speed >= 85), "medium": _count((speed >= 60) & (speed < 85)),
+                  "low": _count(speed < 60)},
+        "rating": {"high": _count(rating >= 4.5), "good": _count((rating >= 4.0) & (rating < 4.5)),
+                   "average": _count((rating >= 3.5) & (rating < 4.0)), "low": _count((rating > 0) & (rating < 3.5)),
+                   "noRating": _count(rating == 0)},
+        "email": {"professional": _count(email_quality == 'PROFESSIONAL_DOMAIN'),
+                  "personal": _count(email_quality == 'PERSONAL_DOMAIN'),
+                  "unknown": _count(email_quality == 'UNKNOWN')},
+        "reviews": {"highRating": _count(rating >= 4.5), "lowRating": _count((rating > 0) & (rating < 4.0)),
+                    "manyReviews": _count(reviews >= 50), "fewReviews": _count((reviews > 0) & (reviews < 20)),
+                    "activeReviews": _count(frequency == 'ACTIVE'), "inactiveReviews": _count(frequency == 'INACTIVE'),
+                    "noReviews": _count(reviews == 0)},
+        "builders": {"wix": _count(builder == 'Wix'), "godaddy": _count(builder == 'GoDaddy'),
+                     "squarespace": _count(builder == 'Squarespace'),
+                     "custom": _count(np.isin(builder, ('',) + CUSTOM_BUILDERS))},
+        "domain": {"established": _count(domain_age >= 5), "new": _count((domain_age > 0) & (domain_age < 2)),
+                   "expiringSoon": _count(_numbers(df, 'L1_whois_expiring_soon') == 1)},
+        "nombres": nombre_coverage(_count(_texts(df, 'nombre').to_numpy() != ''), len(df))
+    }
+
+
+def nombre_coverage(with_nombre: Optional[int], total: int) -> Optional[Dict]:
+    if with_nombre is None:
+        return None
+    return {"total": with_nombre, "coverage": round(with_nombre / total, 4) if total else 0.0}
+
+
+def contractor_ids(df: pd.DataFrame) -> Dict[str, int]:
+    """Canonical business_id -> number of rows of the working CSV"""
+    if 'business_id' not in df.columns:
+        return {}
+    counts = canonical_id_series(df['business_id']).value_counts()
+    return {key: int(count) for key, count in counts.items() if key}
+
+
+class CampaignTotals:
+    """The campaigns section, accumulated one merged contractor entry at a time"""
+
+    def __init__(self):
+        self.total = 0
+        self.processing_status: Dict[str, int] = {}
+        self.cost = 0.0
+        self.tokens = 0
+        self.emails = 0
+        self.email_status: Dict[str, int] = {}
+        self.ids: List[str] = []
+
+    @classmethod
+    def of(cls, contractors: Dict) -> 'CampaignTotals':
+        totals = cls()
+        for contractor_id, entry in contractors.items():
+            totals.add(contractor_id, entry)
+        return totals
+
+    def add(self, contractor_id: str, entry) -> None:
+        """entry: a campaign entry (dict or campaign record)"""
+        self.total += 1
+        status = entry.get('processing_status') or 'unknown'
+        self.processing_status[status] = self.processing_status.get(status, 0) + 1
+        cost, tokens = entry.get('cost'), entry.get('tokens')
+        if isinstance(cost, (int, float)) and not isinstance(cost, bool):
+            self.cost += cost
+        if isinstance(tokens, (int, float)) and not isinstance(tokens, bool):
+            self.tokens += tokens
+        campaign_data = entry.get('campaign_data')
+        if campaign_data is not None and campaign_data not in (False, 0, ''):
+            # The route's campaign filter only counts entries with campaign_data (truthy in JS, so {} counts)
+            self.ids.append(canonical_id(contractor_id))
+        for sequence in (campaign_data.get('email_sequences') if campaign_data else None) or ():
+            self.emails += 1
+            email_status = sequence.get('status') or NO_STATUS
+            self.email_status[email_status] = self.email_status.get(email_status, 0) + 1
+
+    def section(self, stamp: Tuple[int, int]) -> Dict:
+        return {"stamp": stamp_key(stamp), "total": self.total, "processing_status": self.processing_status,
+                "cost": round(self.cost, 6), "tokens": self.tokens, "emails": self.emails,
+                "email_status": self.email_status}
+
+
+def campaign_setup(contractors: Dict[str, int], total: int, campaigns: Iterable[str],
+                   stamps: Dict[str, str]) -> Dict:
+    """
+    The route's campaign filter counts: CSV rows with a campaign are ready
+
+    contractors: canonical id -> rows (contractor_ids); total: rows of the CSV
+    """
+    campaign_ids = set(campaigns)
+    ready = sum(rows for key, rows in contractors.items() if key in campaign_ids)
+    return {"stamps": stamps, "ready": ready, "processing": 0, "notSetup": total - ready, "failed": 0}
+
+
+class StatsArtifact:
+    def __init__(self, path: str, ids_path: str):
+        """path: contractor_stats.json (read by the app); ids_path: the ids behind campaign_setup"""
+        self.path = path
+        self.ids_path = ids_path
+        # Campaign totals of the merged file the running operation wrote (see note_campaigns)
+        self._campaigns = None
+
+    def load(self) -> Optional[Dict]:
+        """The stats (None if missing, unreadable or of another version)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                stats = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return stats if stats.get('version') == STATS_VERSION else None
+
+    def save(self, stats: Dict) -> None:
+        write_atomic(self.path, json.dumps(stats, indent=2, ensure_ascii=False).encode('utf-8'))
+
+    def invalidate(self) -> None:
+        for path in (self.path, self.ids_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def load_ids(self) -> Dict:
+        """{"contractors": {"stamp", "total", "ids"}, "campaigns": {"stamp", "ids"}} (sides may be missing)"""
+        try:
+            with open(self.ids_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_ids(self, ids: Dict) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.ids_path)), exist_ok=True)
+        write_atomic(self.ids_path, json.dumps(ids, separators=(',', ':')).encode('utf-8'))
+
+    def note_campaigns(self, totals: CampaignTotals, stamp: Tuple[int, int]) -> None:
+        """The app campaigns file as just written"""
+        self._campaigns = (stamp_key(stamp), totals)
+
+    def take_notes(self) -> Optional[Tuple[str, CampaignTotals]]:
+        campaigns, self._campaigns = self._campaigns, None
+        return campaigns
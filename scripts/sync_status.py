@@ -0,0 +1,234 @@
+"""
+SYNC STATUS - SIDECAR BEHIND --status
+--status used to stat every file, list the backup store and parse the whole
+working CSV on each call, and the app's sync panel asks for it on every load.
+Now every sync and update operation leaves temp/status.json behind and --status
+reads only that file (plus one stat() per listed file, to flag edits made
+outside the sync since it was written):
+
+    {"version": 1, "updated": "...",
+     "last_operation": {"name": "full_sync", "finished": "...", "success": true},
+     "operations": {"full_sync": "<finished>", "update_nombre_fields": "<finished>", ...},
+     "files": {"master": {"csv": {"path": ..., "exists": true, "size": ..., "mtime_ns": ..., "sha256": ...}},
+               "working": {...}, "temporal": {...}},
+     "change_feed": {"revision": 12, "oldest": 3},
+     "backups": [{"id": ..., "created": ..., "reason": ...}],
+     "contractor_ids": {"master": {"contractors": ..., "duplicates": ..., "aliases": ..., "missing_ids": ...}, ...},
+     "nombres": {"total": 42, "sample": [{"business_id": "4549", "company": "...", "nombre": "..."}]}}
+
+An operation only fills in what it already knows: hashes come from the
+publisher / backup stat caches and the previous sidecar, contractor id counts
+from indexes and frames the operation built, and the nombre list
+(status_nombres.json, every working CSV row with a nombre) is patched by nombre
+edits and rebuilt from the frames syncs write. Anything else is null until the
+next operation that knows it or `--status --refresh`, which computes it all.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sync_backup_store import file_sha256
+from sync_csv_records import write_atomic
+from sync_lazy import lazy_import
+
+pd = lazy_import('pandas')
+
+STATUS_VERSION = 1
+
+# Nombres and backups listed by --status
+NOMBRE_SAMPLE = 10
+RECENT_BACKUPS = 5
+
+NOMBRE_COLUMNS = ['business_id', 'L1_company_name', 'nombre']
+
+
+def file_entry(path: str, known_hashes: Sequence[Dict[str, Dict]], hash_missing: bool = False) -> Dict:
+    """
+    Size, stamp and SHA-256 of one file
+
+    known_hashes: stat caches (path -> {"mtime_ns", "size", "sha256"}); a hash is
+    reused while the stamp matches, otherwise computed only with hash_missing
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return {"path": path, "exists": False}
+    sha256 = None
+    for cache in known_hashes:
+        known = cache.get(path)
+        if known and known.get('sha256') and (known.get('mtime_ns'), known.get('size')) == (stat.st_mtime_ns,
+                                                                                              stat.st_size):
+            sha256 = known['sha256']
+            break
+    if sha256 is None and hash_missing:
+        sha256 = file_sha256(path)
+    return {"path": path, "exists": True, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}
+
+
+def changed_files(status: Dict) -> List[str]:
+    """"layer.file_type" of every file whose size/mtime differ from the sidecar (one stat each)"""
+    changed = []
+    for layer, files in status.get('files', {}).items():
+        for file_type, entry in files.items():
+            try:
+                stat = os.stat(entry['path'])
+                current = (True, stat.st_size, stat.st_mtime_ns)
+            except FileNotFoundError:
+                current = (False, None, None)
+            if current != (entry['exists'], entry.get('size'), entry.get('mtime_ns')):
+                changed.append(f"{layer}.{file_type}")
+    return changed
+
+
+class NombreList:
+    """Working CSV rows with a nombre: record number (1-based) -> [business_id, company, nombre]"""
+
+    def __init__(self, stamp: Optional[Tuple[int, int]], rows: Dict[int, List[str]]):
+        self.stamp = tuple(stamp) if stamp else None
+        self.rows = rows
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, stamp: Tuple[int, int]) -> 'NombreList':
+        """From the working CSV as loaded (frame position p is record p + 1)"""
+        if 'nombre' not in df.columns:
+            return cls(stamp, {})
+        nombres = df['nombre']
+        positions = (nombres.notna() & (nombres.astype(str) != '')).to_numpy().nonzero()[0]
+        companies = df['L1_company_name'] if 'L1_company_name' in df.columns else pd.Series('', index=df.index)
+        ids = df['business_id'] if 'business_id' in df.columns else pd.Series('', index=df.index)
+        rows = {}
+        for position, contractor_id, company, nombre in zip(positions.tolist(), ids.iloc[positions].tolist(),
+                                                              companies.iloc[positions].tolist(),
+                                                              nombres.iloc[positions].tolist()):
+            rows[position + 1] = [_text(contractor_id), _text(company), _text(nombre)]
+        return cls(stamp, rows)
+
+    def apply(self, edits: Dict[int, List[str]], stamp: Tuple[int, int]) -> None:
+        """Nombre edits of single records ({record: [business_id, company, nombre]}, '' clears it)"""
+        for row, entry in edits.items():
+            if entry[2]:
+                self.rows[row] = entry
+            else:
+                self.rows.pop(row, None)
+        self.stamp = tuple(stamp)
+
+    def summary(self) -> Dict:
+        sample = [{"business_id": contractor_id, "company": company, "nombre": nombre}
+                  for contractor_id, company, nombre in (self.rows[row] for row in sorted(self.rows)[:NOMBRE_SAMPLE])]
+        return {"total": len(self.rows), "sample": sample}
+
+
+def _text(value) -> str:
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class StatusSidecar:
+    def __init__(self, path: str):
+        """path: the sidecar (temp/status.json); the nombre list lives next to it"""
+        self.path = path
+        self.nombres_path = os.path.join(os.path.dirname(path), 'status_nombres.json')
+        self._lock = threading.Lock()
+        self._depth = 0
+        # What the running operation learned about the working CSV (see note_*)
+        self._frame = None
+        self._nombre_edits = None
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+
+    def load(self) -> Optional[Dict]:
+        """The sidecar (None if missing, unreadable or of another version)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                status = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return status if status.get('version') == STATUS_VERSION else None
+
+    def save(self, status: Dict) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        write_atomic(self.path, json.dumps(status, indent=2, ensure_ascii=False).encode('utf-8'))
+
+    def invalidate(self) -> None:
+        """Drop the sidecar (the next --status rebuilds it)"""
+        for path in (self.path, self.nombres_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def load_nombres(self) -> Optional[NombreList]:
+        try:
+            with open(self.nombres_path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+            return NombreList(payload['stamp'], {int(row): entry for row, entry in payload['rows'].items()})
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save_nombres(self, nombres: NombreList) -> None:
+        payload = {"stamp": nombres.stamp, "rows": {str(row): entry for row, entry in sorted(nombres.rows.items())}}
+        write_atomic(self.nombres_path, json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
+
+    # ------------------------------------------------------------------
+    # What the running operation knows about the working CSV
+    # ------------------------------------------------------------------
+
+    def note_contractors(self, df: pd.DataFrame, stamp: Tuple[int, int]) -> None:
+        """The working CSV as just written"""
+        self._frame = (tuple(stamp), df)
+
+    def note_nombre_edits(self, edits: Dict[int, List[str]], stamps: Dict[str, Tuple[Tuple, Tuple]]) -> None:
+        """
+        Nombre edits of the working CSV records (as in NombreList.apply)
+
+        stamps: path -> (stamp before, stamp after) of every CSV the edit rewrote;
+        nothing but nombre changed in them
+        """
+        self._nombre_edits = (edits, {path: (tuple(before), tuple(after)) for path, (before, after) in stamps.items()})
+
+    def take_notes(self) -> Tuple[Optional[Tuple], Optional[Tuple]]:
+        frame, edits = self._frame, self._nombre_edits
+        self._frame = self._nombre_edits = None
+        return frame, edits
+
+    # ------------------------------------------------------------------
+    # Operation nesting
+    # ------------------------------------------------------------------
+
+    def enter(self) -> bool:
+        """Start of a status-refreshing operation, True for the outermost one"""
+        with self._lock:
+            self._depth += 1
+            return self._depth == 1
+
+    def leave(self) -> None:
+        with self._lock:
+            self._depth -= 1
+
+
+def refreshes_status(method):
+    """
+    Method decorator (inside @instrumented): refresh the status sidecar once the
+    outermost decorated operation returns, whether it succeeded or not
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        outermost = self.status.enter()
+        success = False
+        try:
+            result = method(self, *args, **kwargs)
+            success = result is not False and not (isinstance(result, dict) and result.get('success') is False)
+            return result
+        finally:
+            self.status.leave()
+            if outermost:
+                self.refresh_status(method.__name__, success=success)
+    return wrapper
@@ -3,68 +3,469 @@ SYNC SYSTEM - 3 LAYER BIDIRECTIONAL DATA MANAGEMENT
 Handles intelligent merging between Master, Working, and Temporal layers
 """
 
+from __future__ import annotations
+
+import hashlib
 import json
-import pandas as pd
 import os
 import shutil
-from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from pathlib import Path
 import logging
 
+from sync_backup_store import BackupStore
+from sync_campaign_records import campaign_model, plain_database, to_json
+from sync_change_feed import ChangeFeed
+from sync_conflicts import CampaignConflicts, CsvConflicts
+from sync_contractor_index import ContractorIndex, canonical_id, canonical_id_series
+from sync_coalesce import RequestCoalescer
+from sync_csv_records import CsvRecordFile, write_atomic
+from sync_journal import OperationJournal, records_change
+from sync_json_stream import COMPACT_SEPARATORS, JsonObjectIndex, JsonObjectWriter
+from sync_layers import FrameSource, SnapshotSource, layer_columns, partition_columns
+from sync_lazy import lazy_import
+from sync_lock import FileLock, LockTimeout
+from sync_metrics import SyncMetrics, instrumented, profiled
+from sync_nombre_changes import clear_applied, default_changes_path, load_nombre_changes
+from sync_publish import Publisher
+from sync_schedule import ScheduleIndex, contractor_schedule
+from sync_snapshot import CsvSnapshotCache
+from sync_stats import (STATS_COLUMNS, STATS_VERSION, CampaignTotals, StatsArtifact, campaign_setup, contractor_ids,
+                        contractor_stats, nombre_coverage, stamp_key)
+from sync_status import (NOMBRE_COLUMNS, RECENT_BACKUPS, STATUS_VERSION, NombreList, StatusSidecar,
+                         changed_files, file_entry, refreshes_status)
+
+# Imported on first use: JSON-only and metadata commands never load them (see sync_lazy)
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
 logger = logging.getLogger(__name__)
 
+# Bump when the manifest layout or record hashing changes (forces one full sync)
+SYNC_MANIFEST_VERSION = 1
+
+# Above this share of changed contractors an incremental sync just re-merges everything
+INCREMENTAL_MAX_CHANGED_FRACTION = 0.5
+
+# CLI commands that only read: they share the profile lock instead of taking it exclusively
+READ_ONLY_COMMANDS = ('--list-backups', '--changes-since', '--journal', '--schedule')
+
+# Commands that take no lock at all: --status reads the sidecar every writer replaces atomically
+LOCK_FREE_COMMANDS = ('--status',)
+
+# CLI commands whose concurrent identical requests share one run (see sync_coalesce)
+COALESCED_COMMANDS = ('--full-sync', '--sync-campaigns', '--sync-master-to-working')
+
+# CLI commands that queue their edits and take the lock themselves (batched nombre updates)
+QUEUED_COMMANDS = ('--update-nombre', '--update-nombre-batch', '--apply-nombre-changes')
+
+# CLI commands that run on the stdlib alone: pandas / numpy are never imported (see sync_lazy,
+# bench_startup.py); the others load them on first use
+STDLIB_COMMANDS = ('--status', '--list-backups', '--journal', '--changes-since', '--backup', '--restore',
+                   '--prune-backups', '--sync-campaigns', '--schedule', *QUEUED_COMMANDS)
+
+# Column resolution policies for the master/working CSV merge
+MASTER_WINS = 'master_wins'
+WORKING_WINS = 'working_wins'
+NEWEST_WINS = 'newest_wins'
+
+CSV_COLUMN_POLICIES = {
+    # Working wins for tracking fields
+    'focus_intel_status': WORKING_WINS,
+    'focus_intel_date': WORKING_WINS,
+    'focus_intel_cost': WORKING_WINS,
+    'focus_intel_insights': WORKING_WINS,
+    # Master wins for business data (including 'nombre' - user editable data)
+    'completion_score': MASTER_WINS,
+    'owner_names': MASTER_WINS,
+    'company_name': MASTER_WINS,
+    'nombre': MASTER_WINS,
+}
+
+# General case: most recent non-null value. A row's master value is the newer one only
+# when its RECENCY_COLUMN is strictly later than working's; otherwise working is newer.
+DEFAULT_COLUMN_POLICY = NEWEST_WINS
+RECENCY_COLUMN = 'processing_timestamp'
+
+
+def _align_rows(master_keys: pd.Series, working_keys: pd.Series) -> Tuple[pd.Series, np.ndarray, np.ndarray]:
+    """Outer-join the key columns only: joined keys + master/working row positions (-1 = absent)"""
+    positions = pd.DataFrame({'key': master_keys.to_numpy(), 'master_pos': np.arange(len(master_keys))}).merge(
+        pd.DataFrame({'key': working_keys.to_numpy(), 'working_pos': np.arange(len(working_keys))}),
+        on='key',
+        how='outer'
+    )
+    return (
+        positions['key'],
+        positions['master_pos'].fillna(-1).to_numpy(dtype=np.int64),
+        positions['working_pos'].fillna(-1).to_numpy(dtype=np.int64)
+    )
+
+
+def _take_rows(df: pd.DataFrame, positions: np.ndarray) -> pd.DataFrame:
+    """Rows by position, all-missing rows where position is -1 (same upcasting as a merge)"""
+    return df.reset_index(drop=True).reindex(positions).reset_index(drop=True)
+
+
+def _newer_master_rows(master: pd.DataFrame, working: pd.DataFrame) -> np.ndarray:
+    """Rows where master's RECENCY_COLUMN is strictly later than working's"""
+    if RECENCY_COLUMN not in master.columns or RECENCY_COLUMN not in working.columns:
+        return np.zeros(len(master), dtype=bool)
+    master_time = pd.to_datetime(master[RECENCY_COLUMN], errors='coerce', utc=True)
+    working_time = pd.to_datetime(working[RECENCY_COLUMN], errors='coerce', utc=True)
+    return (master_time > working_time).fillna(False).to_numpy(dtype=bool)
+
+
+def _common_dtype(left, right):
+    """dtype able to hold both sides, as concatenating them would produce"""
+    if left == right:
+        return left
+    if pd.api.types.is_numeric_dtype(left) and pd.api.types.is_numeric_dtype(right):
+        return np.result_type(left, right)
+    return np.dtype(object)
+
+
+def _resolve_columns(master: pd.DataFrame, working: pd.DataFrame, columns: List[str],
+                     prefer_master: np.ndarray) -> Dict[str, pd.Series]:
+    """
+    Preferred side's value per cell (master where prefer_master, else working),
+    the other side's where it is missing
+    
+    Whole-column fillna keeps pandas' native string/numeric fast paths and the
+    exact dtypes the old merge produced; under a mixed policy only the rows where
+    master is preferred are re-resolved and written over the working-first result.
+    """
+    if prefer_master.all():
+        return {col: master[col].fillna(working[col]) for col in columns}
+    
+    resolved = {col: working[col].fillna(master[col]) for col in columns}
+    rows = np.flatnonzero(prefer_master)
+    if not len(rows):
+        return resolved
+    
+    master_rows = master[columns].take(rows)
+    working_rows = working[columns].take(rows)
+    for col in columns:
+        patch = master_rows[col].fillna(working_rows[col])
+        dtype = _common_dtype(resolved[col].dtype, patch.dtype)
+        values = resolved[col].astype(dtype).array.copy()
+        values[rows] = patch.astype(dtype).array
+        resolved[col] = pd.Series(values, index=master.index, name=col, dtype=dtype)
+    return resolved
+
+
+def merge_contractor_frames(master_df: pd.DataFrame, working_df: pd.DataFrame,
+                            policies: Optional[Dict[str, str]] = None,
+                            default_policy: str = DEFAULT_COLUMN_POLICY,
+                            conflicts: Optional[CsvConflicts] = None) -> pd.DataFrame:
+    """
+    Outer-merge master and working contractors on normalized business_id
+    
+    Every column present in both frames is resolved by its policy (CSV_COLUMN_POLICIES,
+    else default_policy): the preferred side's value, falling back to the other side
+    where it is missing. The frame is assembled once from the resolved columns.
+    Cells where both sides have different values are recorded in conflicts.
+    """
+    return merge_contractor_sources(FrameSource(master_df), FrameSource(working_df), policies, default_policy,
+                                    conflicts=conflicts)
+
+
+def merge_contractor_sources(master, working, policies: Optional[Dict[str, str]] = None,
+                             default_policy: str = DEFAULT_COLUMN_POLICY,
+                             master_index: Optional[ContractorIndex] = None,
+                             working_index: Optional[ContractorIndex] = None,
+                             conflicts: Optional[CsvConflicts] = None) -> pd.DataFrame:
+    """
+    merge_contractor_frames over lazy column sources (sync_layers), one layer at a time
+    
+    Rows are aligned once from the business_id and RECENCY_COLUMN columns; each
+    L1..L5 partition is then loaded, resolved and released before the next one, so
+    only one layer's master/working inputs are in memory at any time. Contractor
+    indexes of the sources already built (ThreeLayerSync.contractor_index) are reused.
+    
+    With conflicts, every resolved column pair is also compared as a whole array
+    while its partition is loaded (no second pass over the rows).
+    """
+    policies = CSV_COLUMN_POLICIES if policies is None else policies
+    
+    master_ids = master.load(['business_id'])['business_id']
+    working_ids = working.load(['business_id'])['business_id']
+    master_keys = master_index.keys if master_index is not None else canonical_id_series(master_ids)
+    working_keys = working_index.keys if working_index is not None else canonical_id_series(working_ids)
+    keys, master_pos, working_pos = _align_rows(master_keys, working_keys)
+    if conflicts is not None:
+        conflicts.compared += int(((master_pos >= 0) & (working_pos >= 0)).sum())
+    working_columns = set(working.columns)
+    shared = [col for col in master.columns if col in working_columns and col != 'business_id']
+    
+    newest_master = np.zeros(len(keys), dtype=bool)
+    if RECENCY_COLUMN in shared:
+        newest_master = _newer_master_rows(_take_rows(master.load([RECENCY_COLUMN]), master_pos),
+                                           _take_rows(working.load([RECENCY_COLUMN]), working_pos))
+    prefer_master_rows = {
+        MASTER_WINS: np.ones(len(keys), dtype=bool),
+        WORKING_WINS: np.zeros(len(keys), dtype=bool),
+        NEWEST_WINS: newest_master
+    }
+    
+    resolved = {}
+    for columns in partition_columns(shared).values():
+        master_part = _take_rows(master.load(columns), master_pos)
+        working_part = _take_rows(working.load(columns), working_pos)
+        by_policy = {}
+        for col in columns:
+            by_policy.setdefault(policies.get(col, default_policy), []).append(col)
+        for policy, policy_columns in by_policy.items():
+            resolved.update(_resolve_columns(master_part, working_part, policy_columns, prefer_master_rows[policy]))
+            if conflicts is not None:
+                conflicts.compare(master_part, working_part, policy_columns, policy, prefer_master_rows[policy])
+        del master_part, working_part
+    if conflicts is not None:
+        conflicts.assign_rows(keys)
+    
+    # business_id keeps the master format where both layers have the contractor
+    business_id = _take_rows(master_ids.to_frame(), master_pos)['business_id']
+    business_id = business_id.fillna(_take_rows(working_ids.to_frame(), working_pos)['business_id'])
+    
+    # The resolved columns are fresh objects, so the frame can adopt them without another copy
+    return pd.DataFrame({'business_id': business_id, **{col: resolved[col] for col in shared}}, copy=False)
+
+
 class ThreeLayerSync:
-    def __init__(self):
-        """Initialize 3-layer sync system with proper paths"""
+    def __init__(self, master_paths: Optional[Dict[str, str]] = None,
+                 working_paths: Optional[Dict[str, str]] = None,
+                 temporal_paths: Optional[Dict[str, str]] = None,
+                 backup_dir: Optional[str] = None, campaign_records: Optional[bool] = None):
+        """
+        Initialize 3-layer sync system with proper paths
+        
+        The arguments override individual default paths (e.g. {'csv': ...}) so the
+        same code can run against other directories (benchmarks, scratch copies).
+        campaign_records: hold campaigns as sync_campaign_records records instead of
+        dicts (None: SYNC_CAMPAIGN_RECORDS)
+        """
         
         # LAYER 1: MASTER FILES (Your manual edits)
         self.master_paths = {
             'csv': '/Users/manuayala/Documents/LAGOS/01_BUSINESS_ACTIVE/outreach_app/NORMALIZER/01_PROCESSED/CONTRACTORS - Master_Sheet.csv',
             'json_enhanced': '/Users/manuayala/Documents/LAGOS/01_BUSINESS_ACTIVE/outreach_app/NORMALIZER/01_PROCESSED/CONTRACTORS_5_LAYERS_ENHANCED.json',
-            'json_campaigns': '/Users/manuayala/Documents/LAGOS/02_CAMPAIGN_GENERATOR/data/MASTER_CAMPAIGN_DATABASE.json'
+            'json_campaigns': '/Users/manuayala/Documents/LAGOS/02_CAMPAIGN_GENERATOR/data/MASTER_CAMPAIGN_DATABASE.json',
+            **(master_paths or {})
         }
         
         # LAYER 2: WORKING FILES (System operational)
         self.working_paths = {
             'csv': '/Users/manuayala/Documents/LAGOS/03_CONTRACTOR_INTELLIGENCE_HUB/contractor-intelligence-hub-v4/public/data/contractors_original.csv',
             'json_campaigns': '/Users/manuayala/Documents/LAGOS/02_CAMPAIGN_GENERATOR/scripts/MASTER_CAMPAIGN_DATABASE.json',
-            'json_app': '/Users/manuayala/Documents/LAGOS/03_CONTRACTOR_INTELLIGENCE_HUB/contractor-intelligence-hub-v4/public/data/campaigns.json'
+            'json_app': '/Users/manuayala/Documents/LAGOS/03_CONTRACTOR_INTELLIGENCE_HUB/contractor-intelligence-hub-v4/public/data/campaigns.json',
+            **(working_paths or {})
         }
         
         # LAYER 3: TEMPORAL MERGE (Intelligence consolidated)
         self.temporal_paths = {
             'csv': '/Users/manuayala/Documents/LAGOS/02_CAMPAIGN_GENERATOR/scripts/temp/merged_contractors.csv',
             'json_campaigns': '/Users/manuayala/Documents/LAGOS/02_CAMPAIGN_GENERATOR/scripts/temp/merged_campaigns.json',
-            'conflicts': '/Users/manuayala/Documents/LAGOS/02_CAMPAIGN_GENERATOR/scripts/temp/merge_conflicts.json'
+            'conflicts': '/Users/manuayala/Documents/LAGOS/02_CAMPAIGN_GENERATOR/scripts/temp/merge_conflicts.json',
+            **(temporal_paths or {})
         }
         
         # Backup directory
-        self.backup_dir = '/Users/manuayala/Documents/LAGOS/02_CAMPAIGN_GENERATOR/scripts/backups'
+        self.backup_dir = backup_dir or '/Users/manuayala/Documents/LAGOS/02_CAMPAIGN_GENERATOR/scripts/backups'
         
         # Create temp and backup directories
         os.makedirs(os.path.dirname(self.temporal_paths['csv']), exist_ok=True)
         os.makedirs(self.backup_dir, exist_ok=True)
+        
+        # Deduplicated file versions + one manifest per backup
+        self.backup_store = BackupStore(os.path.join(self.backup_dir, 'store'))
+        
+        # Columnar binary copies of the CSVs (rebuilt when the source content changes)
+        self.snapshots = CsvSnapshotCache(os.path.join(os.path.dirname(self.temporal_paths['csv']), 'snapshots'))
+        
+        # Write-ahead journal of operations that replace several files (replayed after a crash)
+        self.journal = OperationJournal(os.path.join(self.backup_dir, 'journal'),
+                                        checkpoint_backup=self._checkpoint_snapshot)
+        
+        # Serialize each output once, hardlink it to every destination, skip unchanged ones
+        self.publisher = Publisher(os.path.join(os.path.dirname(self.temporal_paths['csv']), 'publish_state.json'),
+                                   journal=self.journal)
+        
+        # Revisioned deltas of the working CSV and app campaigns ("changes since rev N")
+        self.change_feed = ChangeFeed(os.path.join(os.path.dirname(self.temporal_paths['csv']), 'feed'),
+                                      canonical_id_series)
+        
+        # Per-operation timings, bytes, rows and peak memory (temp/metrics/<operation>.json)
+        self.metrics = SyncMetrics(os.path.join(os.path.dirname(self.temporal_paths['csv']), 'metrics'))
+        
+        # Cross-process lock of this set of paths (held by run_command for each command);
+        # taking it exclusively first finishes whatever a crashed process left in the journal
+        self.lock = FileLock(os.path.join(self.backup_dir, 'sync.lock'), on_exclusive=self.recover_journal)
+        
+        # Shares one run among waiting identical requests, batches queued nombre edits
+        self.requests = RequestCoalescer(os.path.join(self.backup_dir, 'requests'), self.lock)
+        
+        # What --status shows, rewritten after every operation (temp/status.json)
+        self.status = StatusSidecar(os.path.join(os.path.dirname(self.temporal_paths['csv']), 'status.json'))
+        
+        # Dashboard aggregates served by /api/contractor-stats, kept next to the working CSV
+        self.stats = StatsArtifact(os.path.join(os.path.dirname(self.working_paths['csv']), 'contractor_stats.json'),
+                                   os.path.join(os.path.dirname(self.temporal_paths['csv']), 'stats_ids.json'))
+        
+        # Campaign emails by date, partitioned by week: what the calendar reads (app) and the merge output
+        schedule_dir = os.path.join(os.path.dirname(self.temporal_paths['csv']), 'schedule')
+        self.schedules = {
+            'app': ScheduleIndex(os.path.join(schedule_dir, 'app'), self.working_paths['json_app']),
+            'merged': ScheduleIndex(os.path.join(schedule_dir, 'merged'), self.temporal_paths['json_campaigns'])
+        }
+        
+        # Campaign entries as json.load dicts, or records when opted in (see sync_campaign_records)
+        self.campaign_model = campaign_model(campaign_records)
+        
+        # Parsed datasets keyed by path -> ((mtime_ns, size), data)
+        # Lets a long-lived process (sync_service.py) skip re-parsing unchanged files
+        self._dataset_cache = {}
+        self._record_file_cache = {}
+        # Canonical business_id index per CSV path -> ((mtime_ns, size), ContractorIndex)
+        self._index_cache = {}
+        # The CSV and campaign merges (concurrent under full_sync --parallel) share merge_conflicts.json
+        self._conflicts_lock = threading.Lock()
+    
+    def _file_stamp(self, path: str) -> Tuple[int, int]:
+        """Cheap change detector for cached datasets"""
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
     
-    def backup_all_files(self) -> str:
-        """Create timestamped backup of all files before sync"""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        backup_session_dir = os.path.join(self.backup_dir, f"sync_{timestamp}")
-        os.makedirs(backup_session_dir, exist_ok=True)
+    def _read_csv(self, path: str, columns: Optional[List[str]] = None,
+                  layers: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Read a CSV, re-parsing only when the file changed since the last read
         
-        # Backup all existing files
-        all_paths = {**self.master_paths, **self.working_paths}
+        Goes through the columnar snapshot cache; with columns only those columns are
+        loaded (KeyError if one is missing), with layers ('base', 'L1'..'L5') only
+        business_id and the columns of those layers
+        """
+        stamp = self._file_stamp(path)
+        cached = self._dataset_cache.get(path)
+        if layers is not None:
+            all_columns = list(cached[1].columns) if cached is not None and cached[0] == stamp \
+                else self.snapshots.columns(path)
+            columns = [*(['business_id'] if 'business_id' in all_columns else []),
+                       *(col for col in layer_columns(all_columns, layers) if col != 'business_id')]
+        if cached is not None and cached[0] == stamp:
+            df = cached[1] if columns is None else cached[1][list(columns)]
+            # Callers add/overwrite columns, so hand out a copy
+            return df.copy()
+        
+        if columns is not None:
+            # Partial reads come straight from the snapshot and don't fill the full-frame cache
+            return self.snapshots.load(path, columns)
+        
+        cached = (stamp, self.snapshots.load(path))
+        self._dataset_cache[path] = cached
+        return cached[1].copy()
+    
+    def _csv_source(self, path: str):
+        """Lazy column source for a CSV: the cached frame if it is fresh, else its snapshot"""
+        cached = self._dataset_cache.get(path)
+        if cached is not None and cached[0] == self._file_stamp(path):
+            return FrameSource(cached[1])
+        return SnapshotSource(self.snapshots, path)
+    
+    def _load_json(self, path: str) -> Dict:
+        """Load a JSON file, re-parsing only when the file changed since the last read
         
-        for file_type, file_path in all_paths.items():
-            if os.path.exists(file_path):
-                backup_name = f"{file_type}_{os.path.basename(file_path)}"
-                backup_path = os.path.join(backup_session_dir, backup_name)
-                shutil.copy2(file_path, backup_path)
-                logger.info(f"Backed up {file_type}: {backup_path}")
+        The returned object is shared with the cache: treat it as read-only
+        """
+        stamp = self._file_stamp(path)
+        cached = self._dataset_cache.get(path)
+        if cached is None or cached[0] != stamp:
+            with open(path, 'r', encoding='utf-8') as f:
+                cached = (stamp, json.load(f))
+            self._dataset_cache[path] = cached
+        return cached[1]
+    
+    def _remember_json(self, path: str, data: Dict) -> None:
+        """Prime the cache with data we just wrote so the next read skips parsing"""
+        self._dataset_cache[path] = (self._file_stamp(path), data)
+    
+    def _load_campaigns(self, path: str) -> Dict:
+        """Load a campaign database with its entries in the campaign model (cached like _load_json)
         
-        return backup_session_dir
+        With records only the records stay cached, never the dicts they were parsed from
+        """
+        key = ('campaigns', path)
+        stamp = self._file_stamp(path)
+        cached = self._dataset_cache.get(key)
+        if cached is None or cached[0] != stamp:
+            with open(path, 'r', encoding='utf-8') as f:
+                cached = (stamp, self.campaign_model.load(f))
+            self._dataset_cache[key] = cached
+        return cached[1]
+    
+    def _remember_campaigns(self, path: str, data: Dict) -> None:
+        """_remember_json for a campaign database as _load_campaigns returns it"""
+        self._dataset_cache[('campaigns', path)] = (self._file_stamp(path), data)
     
-    def merge_json_campaigns(self) -> Dict:
+    def warm_cache(self) -> int:
+        """Parse every existing master/working dataset into memory, returns files loaded"""
+        loaded = 0
+        for file_type, path in {**self.master_paths, **self.working_paths}.items():
+            if not os.path.exists(path):
+                continue
+            if path.endswith('.csv'):
+                self._read_csv(path)
+            else:
+                self._load_campaigns(path)
+            loaded += 1
+            logger.info(f"Warmed {file_type}: {path}")
+        return loaded
+    
+    @instrumented('backup')
+    @refreshes_status
+    def backup_all_files(self, reason: str = '') -> str:
+        """
+        Back up all master and working files into the content-addressed store
+        
+        Files whose content is already stored are only hash-checked, not copied.
+        The backup is also a journal checkpoint. Returns the backup manifest path.
+        """
+        manifest_id = self._snapshot_layers(reason)
+        self.metrics.record('backup', self.backup_store.last_snapshot)
+        self.journal.checkpoint(manifest_id)
+        return self.backup_store.manifest_path(manifest_id)
+    
+    def _snapshot_layers(self, reason: str) -> str:
+        files = {f"master_{file_type}": path for file_type, path in self.master_paths.items()}
+        files.update({f"working_{file_type}": path for file_type, path in self.working_paths.items()})
+        manifest_id = self.backup_store.snapshot(files, reason=reason)
+        self.backup_store.prune()
+        return manifest_id
+    
+    def _checkpoint_snapshot(self) -> str:
+        """Backup the journal folds its operations into once it grew too large"""
+        return self._snapshot_layers('journal_checkpoint')
+    
+    def recover_journal(self) -> List[Dict]:
+        """
+        Finish the operations a crashed process left half-done (see sync_journal)
+        
+        Runs every time the profile lock is taken exclusively; costs one listdir
+        when nothing is open. Returns what was replayed or aborted.
+        """
+        outcomes = self.journal.recover()
+        if outcomes:
+            # Replayed files changed behind the change feed and the status sidecar
+            self.change_feed.invalidate('journal_recovery')
+            self.status.invalidate()
+        return outcomes
+    
+    @instrumented('merge_json_campaigns')
+    @refreshes_status
+    def merge_json_campaigns(self, streaming: bool = False, compact: bool = False) -> Dict:
         """
         Intelligent merge of campaign JSON files
         
@@ -72,87 +473,113 @@ class ThreeLayerSync:
         - Master JSON: Base campaigns (your approved campaigns)
         - Working JSON: Generated campaigns + app states  
         - Merge: All campaigns with latest states preserved
+        
+        streaming: merge one contractor at a time (memory bounded by the largest
+        campaign); the returned doc then carries database_info only
+        compact: write the merged file without indentation
         """
+        if streaming:
+            return self._merge_json_campaigns_streaming(compact)
+        
+        with self.metrics.stage('load'):
+            master_campaigns, working_campaigns = self._load_campaign_layers()
+        
+        # Merge logic
+        merged_campaigns = {}
+        conflicts = CampaignConflicts()
+        
+        with self.metrics.stage('merge'):
+            # Start with all master campaigns (the merges never modify an entry, so they are shared)
+            merged_campaigns.update(master_campaigns)
+            
+            # Add/update with working campaigns (recording where they disagree with master)
+            for contractor_id, working_campaign in working_campaigns.items():
+                conflicts.compare(contractor_id, master_campaigns.get(contractor_id), working_campaign)
+                merged_campaigns[contractor_id] = self.campaign_model.overlay(
+                    merged_campaigns.get(contractor_id), working_campaign
+                )
+            
+            merged_data = self._build_merged_campaigns_doc(merged_campaigns)
+        
+        # Save merged campaigns
+        with self.metrics.stage('write'), self.publisher.open([self.temporal_paths['json_campaigns']]) as f:
+            json.dump(plain_database(merged_data), f, indent=None if compact else 2, ensure_ascii=False,
+                      separators=COMPACT_SEPARATORS if compact else None)
+        
+        self._save_conflicts('campaigns', conflicts.section())
+        self._update_schedule('merged', self._campaign_schedules(merged_campaigns), complete=True)
+        self.metrics.count(campaigns=len(merged_campaigns))
+        logger.info(f"Merged {len(merged_campaigns)} campaigns successfully")
+        return merged_data
+    
+    def _merge_json_campaigns_streaming(self, compact: bool) -> Dict:
+        """merge_json_campaigns reading and writing one contractor entry at a time"""
+        with JsonObjectIndex(self.master_paths['json_campaigns']) as master, \
+                JsonObjectIndex(self.working_paths['json_campaigns']) as working:
+            # Same order as the in-memory merge: master ids, then ids only working has
+            contractor_ids = master.names + [contractor_id for contractor_id in working.names
+                                             if contractor_id not in master]
+            database_info = self._merged_campaigns_info(len(contractor_ids))
+            conflicts = CampaignConflicts()
+            schedules = []
+            model = self.campaign_model
+            
+            with self.publisher.open([self.temporal_paths['json_campaigns']]) as f, \
+                    JsonObjectWriter(None, prelude={"database_info": database_info},
+                                     indent=None if compact else 2, default=to_json, stream=f) as writer:
+                for contractor_id in contractor_ids:
+                    master_campaign = model.entry(master.entry(contractor_id)) if contractor_id in master else None
+                    if contractor_id in working:
+                        working_campaign = model.entry(working.entry(contractor_id))
+                        conflicts.compare(contractor_id, master_campaign, working_campaign)
+                        merged = model.overlay(master_campaign, working_campaign)
+                    else:
+                        merged = master_campaign
+                    writer.write(contractor_id, merged)
+                    schedules.append((contractor_id, contractor_schedule(contractor_id, merged)))
+        
+        self._save_conflicts('campaigns', conflicts.section())
+        self._update_schedule('merged', schedules, complete=True)
+        self.metrics.count(campaigns=len(contractor_ids))
+        logger.info(f"Merged {len(contractor_ids)} campaigns successfully (streaming)")
+        return {"database_info": database_info}
+    
+    def _load_campaign_layers(self) -> Tuple[Dict, Dict]:
+        """Load the 'contractors' maps of the master and working campaign JSONs (in the campaign model)"""
         master_campaigns = {}
         working_campaigns = {}
         
         # Load master campaigns
         if os.path.exists(self.master_paths['json_campaigns']):
-            with open(self.master_paths['json_campaigns'], 'r', encoding='utf-8') as f:
-                master_data = json.load(f)
-                master_campaigns = master_data.get('contractors', {})
+            master_data = self._load_campaigns(self.master_paths['json_campaigns'])
+            master_campaigns = master_data.get('contractors', {})
         
         # Load working campaigns (from scripts/)
         if os.path.exists(self.working_paths['json_campaigns']):
-            with open(self.working_paths['json_campaigns'], 'r', encoding='utf-8') as f:
-                working_data = json.load(f)
-                working_campaigns = working_data.get('contractors', {})
-        
-        # Merge logic
-        merged_campaigns = {}
-        conflicts = []
+            working_data = self._load_campaigns(self.working_paths['json_campaigns'])
+            working_campaigns = working_data.get('contractors', {})
         
-        # Start with all master campaigns
-        for contractor_id, master_campaign in master_campaigns.items():
-            merged_campaigns[contractor_id] = master_campaign.copy()
-        
-        # Add/update with working campaigns
-        for contractor_id, working_campaign in working_campaigns.items():
-            if contractor_id in merged_campaigns:
-                # MERGE STRATEGY: Preserve campaign content, update states
-                merged = merged_campaigns[contractor_id].copy()
-                
-                # Update processing status from working
-                if 'processing_status' in working_campaign:
-                    merged['processing_status'] = working_campaign['processing_status']
-                
-                # Update timestamps if newer
-                if 'timestamp' in working_campaign:
-                    merged['timestamp'] = working_campaign['timestamp']
-                
-                # Add any new campaign_data from working
-                if 'campaign_data' in working_campaign:
-                    if 'campaign_data' not in merged:
-                        merged['campaign_data'] = working_campaign['campaign_data']
-                    else:
-                        # Merge campaign_data intelligently
-                        merged_campaign_data = merged['campaign_data'].copy()
-                        
-                        # Add new email sequences if any
-                        if 'email_sequences' in working_campaign['campaign_data']:
-                            merged_campaign_data['email_sequences'] = working_campaign['campaign_data']['email_sequences']
-                        
-                        # Update contact timing if specified
-                        if 'contact_timing' in working_campaign['campaign_data']:
-                            merged_campaign_data['contact_timing'] = working_campaign['campaign_data']['contact_timing']
-                        
-                        merged['campaign_data'] = merged_campaign_data
-                
-                merged_campaigns[contractor_id] = merged
-                
-            else:
-                # New campaign from working - add directly
-                merged_campaigns[contractor_id] = working_campaign.copy()
-        
-        # Create final merged structure
-        merged_data = {
-            "database_info": {
-                "generated_date": datetime.now().isoformat(),
-                "total_contractors": len(merged_campaigns),
-                "system_version": "FOCUS-INTEL V2.0 - 3LAYER SYNC",
-                "last_updated": datetime.now().isoformat(),
-                "merge_source": "intelligent_3layer_merge"
-            },
+        return master_campaigns, working_campaigns
+    
+    def _build_merged_campaigns_doc(self, merged_campaigns: Dict) -> Dict:
+        """Create final merged structure"""
+        return {
+            "database_info": self._merged_campaigns_info(len(merged_campaigns)),
             "contractors": merged_campaigns
         }
-        
-        # Save merged campaigns
-        with open(self.temporal_paths['json_campaigns'], 'w', encoding='utf-8') as f:
-            json.dump(merged_data, f, indent=2, ensure_ascii=False)
-        
-        logger.info(f"Merged {len(merged_campaigns)} campaigns successfully")
-        return merged_data
     
+    @staticmethod
+    def _merged_campaigns_info(total_contractors: int) -> Dict:
+        return {
+            "generated_date": datetime.now().isoformat(),
+            "total_contractors": total_contractors,
+            "system_version": "FOCUS-INTEL V2.0 - 3LAYER SYNC",
+            "last_updated": datetime.now().isoformat(),
+            "merge_source": "intelligent_3layer_merge"
+        }
+    
+    @instrumented('merge_csv_contractors')
+    @refreshes_status
     def merge_csv_contractors(self) -> pd.DataFrame:
         """
         Intelligent merge of contractor CSV files
@@ -161,157 +588,438 @@ class ThreeLayerSync:
         - Master CSV: Your manual edits (completion_score, owner_names, etc.)
         - Working CSV: System tracking (focus_intel_status, dates, costs)
         - Merge: All data combined with intelligent conflict resolution
+        
+        Both CSVs are read lazily, one layer partition at a time (merge_contractor_sources)
         """
+        master_path, working_path = self.master_paths['csv'], self.working_paths['csv']
+        if not (os.path.exists(master_path) and os.path.exists(working_path)):
+            master_df, working_df = self._load_csv_layers()
+            if master_df is None and working_df is None:
+                logger.error("No CSV files found to merge")
+                return pd.DataFrame()
+            return working_df if master_df is None else master_df
+        
+        conflicts = CsvConflicts()
+        with self.metrics.stage('merge'):
+            result_df = merge_contractor_sources(self._csv_source(master_path), self._csv_source(working_path),
+                                                 master_index=self.contractor_index(master_path),
+                                                 working_index=self.contractor_index(working_path),
+                                                 conflicts=conflicts)
+        
+        # Save merged CSV
+        with self.metrics.stage('write'), self.publisher.open([self.temporal_paths['csv']], newline='') as f:
+            result_df.to_csv(f, index=False)
+        
+        self._save_conflicts('csv', conflicts.section())
+        self.metrics.count(rows=len(result_df))
+        logger.info(f"Merged CSV saved: {len(result_df)} rows with {len(result_df.columns)} columns")
+        return result_df
+    
+    def _load_csv_layers(self) -> Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame]]:
+        """Load master and working CSVs (None for a missing file)"""
         master_df = None
         working_df = None
         
         # Load master CSV
         if os.path.exists(self.master_paths['csv']):
-            master_df = pd.read_csv(self.master_paths['csv'])
+            master_df = self._read_csv(self.master_paths['csv'])
             logger.info(f"Loaded master CSV: {len(master_df)} rows")
         
         # Load working CSV (if exists)
         working_csv_path = self.working_paths['csv']
         if os.path.exists(working_csv_path):
-            working_df = pd.read_csv(working_csv_path)
+            working_df = self._read_csv(working_csv_path)
             logger.info(f"Loaded working CSV: {len(working_df)} rows")
         
-        if master_df is None and working_df is None:
-            logger.error("No CSV files found to merge")
-            return pd.DataFrame()
-        
-        if master_df is None:
-            return working_df
-        if working_df is None:
-            return master_df
-        
-        # Merge strategy
-        # Key column: business_id (handle float/string conversion)
-        
-        # Normalize business_id in both dataframes
-        master_df['business_id_norm'] = master_df['business_id'].apply(self._normalize_id)
-        working_df['business_id_norm'] = working_df['business_id'].apply(self._normalize_id)
-        
-        # Merge on normalized ID
-        merged_df = master_df.merge(
-            working_df, 
-            on='business_id_norm', 
-            how='outer',
-            suffixes=('_master', '_working')
-        )
-        
-        # Intelligent column resolution
-        final_columns = {}
-        
-        for col in merged_df.columns:
-            if col.endswith('_master') or col.endswith('_working'):
-                base_col = col.replace('_master', '').replace('_working', '')
-                master_col = f"{base_col}_master"
-                working_col = f"{base_col}_working"
-                
-                # Resolution strategy by column type
-                if base_col in ['focus_intel_status', 'focus_intel_date', 'focus_intel_cost', 'focus_intel_insights']:
-                    # Working wins for tracking fields
-                    final_columns[base_col] = merged_df[working_col].fillna(merged_df[master_col])
-                elif base_col in ['completion_score', 'owner_names', 'company_name', 'nombre']:
-                    # Master wins for business data (including 'nombre' - user editable data)
-                    final_columns[base_col] = merged_df[master_col].fillna(merged_df[working_col])
-                else:
-                    # General case: most recent non-null value
-                    final_columns[base_col] = merged_df[working_col].fillna(merged_df[master_col])
-        
-        # Create final merged dataframe
-        result_df = pd.DataFrame()
-        
-        # Add business_id (use master format preference)
-        if 'business_id_master' in merged_df.columns:
-            result_df['business_id'] = merged_df['business_id_master'].fillna(merged_df['business_id_working'])
-        
-        # Add all merged columns
-        for col_name, col_data in final_columns.items():
-            if col_name != 'business_id':  # Already added
-                result_df[col_name] = col_data
-        
-        # Drop temporary normalization column
-        if 'business_id_norm' in result_df.columns:
-            result_df.drop('business_id_norm', axis=1, inplace=True)
-        
-        # Save merged CSV
-        result_df.to_csv(self.temporal_paths['csv'], index=False)
-        
-        logger.info(f"Merged CSV saved: {len(result_df)} rows with {len(result_df.columns)} columns")
-        return result_df
+        return master_df, working_df
+    
+    def _merge_csv_frames(self, master_df: pd.DataFrame, working_df: pd.DataFrame,
+                          conflicts: Optional[CsvConflicts] = None) -> pd.DataFrame:
+        """Outer-merge master and working rows on normalized business_id and resolve column pairs"""
+        return merge_contractor_frames(master_df, working_df, conflicts=conflicts)
     
     def _normalize_id(self, id_value) -> str:
         """Normalize business_id to consistent string format"""
-        if pd.isna(id_value):
-            return ""
+        return canonical_id(id_value)
+    
+    def _load_conflicts(self) -> Dict:
+        """Last merge_conflicts.json ({} if missing or unreadable)"""
+        try:
+            with open(self.temporal_paths['conflicts'], 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_conflicts(self, section: str, report: Dict) -> None:
+        """
+        Replace one section ('csv' or 'campaigns') of merge_conflicts.json
+        
+        Written once the merge's outputs are published (see Publisher.after_publish),
+        so a parallel stage that is discarded leaves the report alone.
+        """
+        count = report.get('conflicting_cells', report.get('conflicting_fields', 0))
+        self.metrics.count(**{f"{section}_conflicts": count})
+        
+        def save():
+            with self._conflicts_lock:
+                conflicts = self._load_conflicts()
+                conflicts[section] = report
+                write_atomic(self.temporal_paths['conflicts'],
+                             json.dumps(conflicts, separators=COMPACT_SEPARATORS, ensure_ascii=False).encode('utf-8'))
+            logger.info(f"Merge conflicts ({section}): {count} across {report['contractors_with_conflicts']} "
+                        f"contractors -> {self.temporal_paths['conflicts']}")
+        
+        self.publisher.after_publish(save)
+    
+    def contractor_index(self, path: str) -> ContractorIndex:
+        """
+        Canonical business_id index of a CSV, built once per file version
         
+        Every id spelling ("4549", "04549", "4549.0") resolves to one key and row
+        position; duplicated contractors and alias spellings are logged when the
+        index is (re)built.
+        """
+        stamp = self._file_stamp(path)
+        cached = self._index_cache.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        
+        index = ContractorIndex(self._read_csv(path, columns=['business_id'])['business_id'])
+        if index.duplicates:
+            logger.warning(f"{len(index.duplicates)} contractors appear more than once in {path} "
+                           f"(e.g. {', '.join(list(index.duplicates)[:5])})")
+        if index.aliases:
+            logger.warning(f"{len(index.aliases)} contractor ids are spelled differently across rows of {path} "
+                           f"(e.g. {list(index.aliases.values())[0]})")
+        self._index_cache[path] = (stamp, index)
+        return index
+    
+    # ------------------------------------------------------------------
+    # Incremental sync: per-record content hashes in a sync manifest
+    # ------------------------------------------------------------------
+    
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(os.path.dirname(self.temporal_paths['csv']), 'sync_manifest.json')
+    
+    def _load_sync_manifest(self) -> Optional[Dict]:
+        """Manifest written by the last full/incremental sync (None if missing or unreadable)"""
+        if not os.path.exists(self.manifest_path):
+            return None
         try:
-            # Convert float to int to string (removes .0)
-            if isinstance(id_value, float):
-                return str(int(id_value))
-            return str(id_value).strip()
-        except:
-            return str(id_value).strip()
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable sync manifest: {e}")
+            return None
+        if manifest.get('version') != SYNC_MANIFEST_VERSION:
+            logger.info("Sync manifest version changed, falling back to full sync")
+            return None
+        return manifest
+    
+    def _save_sync_manifest(self, csv_hashes: Dict, campaign_hashes: Dict) -> None:
+        manifest = {
+            "version": SYNC_MANIFEST_VERSION,
+            "updated": datetime.now().isoformat(),
+            "csv": csv_hashes,
+            "campaigns": campaign_hashes
+        }
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+    
+    def _csv_record_hashes(self, df: Optional[pd.DataFrame], path: Optional[str] = None) -> Dict[str, str]:
+        """Content hash of every CSV row, keyed by canonical business_id (df as read from path)"""
+        if df is None or df.empty:
+            return {}
+        keys = self.contractor_index(path).keys if path else canonical_id_series(df['business_id'])
+        row_hashes = pd.util.hash_pandas_object(df, index=False)
+        return dict(zip(keys, (format(h, '016x') for h in row_hashes)))
     
-    def full_sync(self) -> Dict:
+    def _campaign_record_hashes(self, campaigns) -> Dict[str, str]:
+        """Content hash of every campaign entry, keyed by contractor id (dict or JsonObjectIndex)"""
+        return {
+            contractor_id: hashlib.sha1(
+                json.dumps(campaign, sort_keys=True, ensure_ascii=False, default=to_json).encode('utf-8')
+            ).hexdigest()
+            for contractor_id, campaign in campaigns.items()
+        }
+    
+    @staticmethod
+    def _changed_keys(previous: Dict[str, Dict[str, str]], current: Dict[str, Dict[str, str]]) -> set:
+        """Keys whose master or working hash was added, removed or modified"""
+        changed = set()
+        for side in ('master', 'working'):
+            old = previous.get(side, {})
+            new = current.get(side, {})
+            changed.update(k for k in old.keys() | new.keys() if old.get(k) != new.get(k))
+        return changed
+    
+    def _incremental_merge_csv(self, master_df: pd.DataFrame, working_df: pd.DataFrame,
+                               changed_ids: set) -> pd.DataFrame:
+        """Re-merge only changed contractors and patch them into the previous temporal CSV"""
+        previous_df = self._read_csv(self.temporal_paths['csv'])
+        previous_keys = self.contractor_index(self.temporal_paths['csv']).keys
+        
+        master_keys = self.contractor_index(self.master_paths['csv']).keys
+        working_keys = self.contractor_index(self.working_paths['csv']).keys
+        conflicts = CsvConflicts()
+        changed_df = self._merge_csv_frames(
+            master_df[master_keys.isin(changed_ids).to_numpy()],
+            working_df[working_keys.isin(changed_ids).to_numpy()],
+            conflicts
+        )
+        # Unchanged contractors keep their entries from the last report
+        conflicts.compared = int(master_keys.isin(set(working_keys)).sum())
+        self._save_conflicts('csv', conflicts.section(self._load_conflicts().get('csv'), replaced=changed_ids))
+        
+        # Keep the column layout (and dtypes) of the existing merged file
+        changed_df = changed_df.reindex(columns=previous_df.columns)
+        for col in previous_df.columns:
+            if changed_df[col].dtype != previous_df[col].dtype:
+                try:
+                    changed_df[col] = changed_df[col].astype(previous_df[col].dtype)
+                except (TypeError, ValueError):
+                    pass
+        
+        # Changed rows that disappeared from both layers are simply not re-added
+        result_df = pd.concat([previous_df[~previous_keys.isin(changed_ids).to_numpy()], changed_df], ignore_index=True)
+        
+        # Same row order as a full outer merge (sorted by normalized id)
+        order = canonical_id_series(result_df['business_id']).sort_values(kind='stable').index
+        return result_df.loc[order].reset_index(drop=True)
+    
+    def _can_sync_incrementally(self, manifest: Optional[Dict]) -> bool:
+        return (
+            manifest is not None
+            and os.path.exists(self.temporal_paths['csv'])
+            and os.path.exists(self.temporal_paths['json_campaigns'])
+        )
+    
+    @instrumented('full_sync')
+    @refreshes_status
+    def full_sync(self, incremental: bool = False, streaming: bool = False, compact: bool = False,
+                  parallel: bool = False) -> Dict:
         """
         Perform complete 3-layer sync
         
-        Returns status report
+        incremental: diff master/working records against the last sync manifest and
+        only re-merge contractors that changed (falls back to a full merge when there
+        is no usable manifest or most records changed)
+        streaming: full campaign merges read and write one contractor at a time
+        compact: write the merged campaigns JSON without indentation
+        parallel: run the backup and the campaign and CSV pipelines (which share no
+        data) concurrently; see _run_stages_parallel for the failure semantics
+        
+        Returns status report (with per-stage timings in seconds and the stage
+        metrics, see sync_metrics)
         """
         logger.info("=== STARTING 3-LAYER FULL SYNC ===")
+        started = time.perf_counter()
         
-        # 1. Create backup
-        backup_dir = self.backup_all_files()
-        
-        # 2. Merge JSON campaigns
-        merged_campaigns = self.merge_json_campaigns()
+        manifest = self._load_sync_manifest() if incremental else None
+        incremental = incremental and self._can_sync_incrementally(manifest)
         
-        # 3. Merge CSV contractors  
-        merged_csv = self.merge_csv_contractors()
+        if incremental:
+            backup_dir = self.backup_all_files(reason='full_sync')
+            with self.metrics.stage('incremental_merge'):
+                merged_campaigns, merged_csv, changes = self._incremental_sync(manifest, compact=compact)
+        else:
+            # 1. Create backup, 2. merge JSON campaigns, 3. merge CSV contractors
+            stages = [
+                ('backup', self.backup_all_files, {'reason': 'full_sync'}),
+                ('campaigns', self._campaigns_pipeline, {'streaming': streaming, 'compact': compact}),
+                ('csv', self._csv_pipeline, {})
+            ]
+            if parallel:
+                results = self._run_stages_parallel(stages)
+            else:
+                results = []
+                for name, fn, kwargs in stages:
+                    with self.metrics.stage(name):
+                        results.append(fn(**kwargs))
+            backup_dir, (merged_campaigns, campaign_hashes), (merged_csv, csv_hashes) = results
+            changes = {"contractors_changed": len(merged_csv),
+                       "campaigns_changed": merged_campaigns['database_info']['total_contractors']}
+            
+            # Record the manifest for the next incremental sync
+            self._save_sync_manifest(csv_hashes, campaign_hashes)
+        stages = self.metrics.stages()
+        timings = {name: stage['wall_seconds'] for name, stage in stages.items()}
+        timings['total'] = round(time.perf_counter() - started, 3)
         
         # 4. Generate sync report
         sync_report = {
             "sync_timestamp": datetime.now().isoformat(),
             "backup_location": backup_dir,
-            "campaigns_merged": len(merged_campaigns.get('contractors', {})),
+            "mode": "incremental" if incremental else "full",
+            "parallel": parallel and not incremental,
+            "campaigns_merged": merged_campaigns['database_info']['total_contractors'],
             "csv_rows_merged": len(merged_csv),
+            **changes,
+            "timings": timings,
+            "stages": stages,
+            "conflicts": {
+                section: report.get('conflicting_cells', report.get('conflicting_fields'))
+                for section, report in self._load_conflicts().items()
+            },
             "temporal_files": {
                 "campaigns": self.temporal_paths['json_campaigns'],
-                "csv": self.temporal_paths['csv']
+                "csv": self.temporal_paths['csv'],
+                "conflicts": self.temporal_paths['conflicts']
             },
-            "status": "completed"
+            "status": "completed",
+            "success": True
         }
         
         # Save sync report
         report_path = os.path.join(os.path.dirname(self.temporal_paths['csv']), 'sync_report.json')
-        with open(report_path, 'w', encoding='utf-8') as f:
-            json.dump(sync_report, f, indent=2)
+        write_atomic(report_path, json.dumps(sync_report, indent=2).encode('utf-8'))
         
         logger.info("=== 3-LAYER SYNC COMPLETED ===")
         return sync_report
     
+    def _campaigns_pipeline(self, streaming: bool, compact: bool) -> Tuple[Dict, Dict]:
+        """Merge the campaign JSONs, returns (merged doc, record hashes for the manifest)"""
+        merged_campaigns = self.merge_json_campaigns(streaming=streaming, compact=compact)
+        if streaming:
+            with JsonObjectIndex(self.master_paths['json_campaigns']) as master_campaigns, \
+                    JsonObjectIndex(self.working_paths['json_campaigns']) as working_campaigns:
+                return merged_campaigns, {"master": self._campaign_record_hashes(master_campaigns),
+                                          "working": self._campaign_record_hashes(working_campaigns)}
+        master_campaigns, working_campaigns = self._load_campaign_layers()
+        return merged_campaigns, {"master": self._campaign_record_hashes(master_campaigns),
+                                  "working": self._campaign_record_hashes(working_campaigns)}
+    
+    def _csv_pipeline(self) -> Tuple[pd.DataFrame, Dict]:
+        """Merge the contractor CSVs, returns (merged frame, record hashes for the manifest)"""
+        merged_csv = self.merge_csv_contractors()
+        master_df, working_df = self._load_csv_layers()
+        return merged_csv, {"master": self._csv_record_hashes(master_df, self.master_paths['csv']),
+                            "working": self._csv_record_hashes(working_df, self.working_paths['csv'])}
+    
+    def _run_stages_parallel(self, stages: List[Tuple]) -> List:
+        """
+        Run (name, fn, kwargs) stages on a thread pool, returns their results in order
+        
+        Failure semantics match running them one after another: outputs are held
+        back until every stage finished, then a stage's outputs (and its
+        after_publish writes: conflict report, schedule index) are published only if
+        it and every stage before it succeeded, and the first failure in stage order
+        is raised.
+        """
+        def run(name, fn, kwargs):
+            with self.publisher.group(name), self.metrics.stage(name):
+                return fn(**kwargs)
+        
+        with ThreadPoolExecutor(max_workers=len(stages), thread_name_prefix='full_sync') as pool, \
+                self.publisher.deferred():
+            futures = [pool.submit(run, name, fn, kwargs) for name, fn, kwargs in stages]
+            wait(futures)
+            
+            succeeded = []
+            for (name, _, _), future in zip(stages, futures):
+                if future.exception() is not None:
+                    break
+                succeeded.append(name)
+            
+            with self.metrics.stage('publish'):
+                self.publisher.publish_held(succeeded)
+            # Raises the first failure; whatever a later stage staged is discarded
+            return [future.result() for future in futures]
+    
+    def _incremental_sync(self, manifest: Dict, compact: bool = False) -> Tuple[Dict, pd.DataFrame, Dict]:
+        """Merge only records whose master or working content hash changed since the manifest"""
+        # Campaigns
+        master_campaigns, working_campaigns = self._load_campaign_layers()
+        campaign_hashes = {
+            "master": self._campaign_record_hashes(master_campaigns),
+            "working": self._campaign_record_hashes(working_campaigns)
+        }
+        changed_campaigns = self._changed_keys(manifest.get('campaigns', {}), campaign_hashes)
+        
+        if changed_campaigns:
+            merged_data = self._load_json(self.temporal_paths['json_campaigns'])
+            merged_campaigns = dict(merged_data.get('contractors', {}))
+            conflicts = CampaignConflicts()
+            for contractor_id in changed_campaigns:
+                if contractor_id in working_campaigns:
+                    conflicts.compare(contractor_id, master_campaigns.get(contractor_id), working_campaigns[contractor_id])
+                    merged_campaigns[contractor_id] = self.campaign_model.overlay(
+                        master_campaigns.get(contractor_id), working_campaigns[contractor_id]
+                    )
+                elif contractor_id in master_campaigns:
+                    merged_campaigns[contractor_id] = master_campaigns[contractor_id]
+                else:
+                    merged_campaigns.pop(contractor_id, None)
+            merged_data = self._build_merged_campaigns_doc(merged_campaigns)
+            with self.publisher.open([self.temporal_paths['json_campaigns']]) as f:
+                json.dump(plain_database(merged_data), f, indent=None if compact else 2, ensure_ascii=False,
+                          separators=COMPACT_SEPARATORS if compact else None)
+            self._remember_json(self.temporal_paths['json_campaigns'], merged_data)
+            self._update_schedule('merged', self._campaign_schedules(merged_campaigns, changed_campaigns),
+                                  removed=changed_campaigns - merged_campaigns.keys())
+            conflicts.compared = len(master_campaigns.keys() & working_campaigns.keys())
+            self._save_conflicts('campaigns', conflicts.section(self._load_conflicts().get('campaigns'),
+                                                                replaced=changed_campaigns))
+        else:
+            merged_data = self._load_json(self.temporal_paths['json_campaigns'])
+        logger.info(f"Incremental campaigns merge: {len(changed_campaigns)} changed")
+        
+        # Contractors
+        master_df, working_df = self._load_csv_layers()
+        csv_hashes = {
+            "master": self._csv_record_hashes(master_df, self.master_paths['csv']),
+            "working": self._csv_record_hashes(working_df, self.working_paths['csv'])
+        }
+        changed_ids = self._changed_keys(manifest.get('csv', {}), csv_hashes)
+        
+        if not changed_ids:
+            merged_csv = self._read_csv(self.temporal_paths['csv'])
+        elif (master_df is None or working_df is None
+              or len(changed_ids) > INCREMENTAL_MAX_CHANGED_FRACTION * max(len(csv_hashes['master']), 1)):
+            merged_csv = self.merge_csv_contractors()
+        else:
+            merged_csv = self._incremental_merge_csv(master_df, working_df, changed_ids)
+            with self.publisher.open([self.temporal_paths['csv']], newline='') as f:
+                merged_csv.to_csv(f, index=False)
+        logger.info(f"Incremental CSV merge: {len(changed_ids)} changed contractors")
+        
+        self._save_sync_manifest(csv_hashes, campaign_hashes)
+        self.metrics.count(campaigns_changed=len(changed_campaigns), contractors_changed=len(changed_ids))
+        return merged_data, merged_csv, {
+            "contractors_changed": len(changed_ids),
+            "campaigns_changed": len(changed_campaigns)
+        }
+    
+    @instrumented('update_working_from_temporal')
+    @refreshes_status
     def update_working_from_temporal(self):
-        """Copy merged temporal files back to working locations"""
+        """Publish merged temporal files to working locations (hardlinked, unchanged ones skipped)"""
         
         # Update working campaign JSON
         if os.path.exists(self.temporal_paths['json_campaigns']):
-            shutil.copy2(
-                self.temporal_paths['json_campaigns'], 
-                self.working_paths['json_campaigns']
-            )
+            with self.metrics.stage('publish_campaigns'):
+                self.publisher.publish_file(
+                    self.temporal_paths['json_campaigns'],
+                    [self.working_paths['json_campaigns']]
+                )
             logger.info("Updated working campaigns from temporal")
         
         # Update working CSV
         if os.path.exists(self.temporal_paths['csv']):
-            shutil.copy2(
-                self.temporal_paths['csv'],
-                self.working_paths['csv']
-            )
+            with self.metrics.stage('publish_csv'):
+                self.publisher.publish_file(
+                    self.temporal_paths['csv'],
+                    [self.working_paths['csv']]
+                )
             logger.info("Updated working CSV from temporal")
+            self._record_changes('update_working_from_temporal',
+                                 contractors=self._read_csv(self.working_paths['csv']))
     
+    @instrumented('promote_temporal_to_master')
+    @refreshes_status
     def promote_temporal_to_master(self, file_type: str):
         """
         Promote temporal merged file to master
@@ -332,10 +1040,8 @@ class ThreeLayerSync:
         
         # Create backup of current master
         if os.path.exists(master_file):
-            backup_name = f"{os.path.basename(master_file)}.pre_promote.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            backup_path = os.path.join(self.backup_dir, backup_name)
-            shutil.copy2(master_file, backup_path)
-            logger.info(f"Backed up current master: {backup_path}")
+            manifest_id = self.backup_store.snapshot({f"master_{file_type}": master_file}, reason='pre_promote')
+            logger.info(f"Backed up current master: {manifest_id}")
         
         # Promote temporal to master
         shutil.copy2(temporal_file, master_file)
@@ -344,71 +1050,157 @@ class ThreeLayerSync:
     
     def update_nombre_field(self, contractor_id: str, nombre_value: str) -> bool:
         """Update the nombre field for a specific contractor in both master and working CSVs"""
+        results = self.update_nombre_fields({contractor_id: nombre_value})
+        return results.get(contractor_id) == 'updated'
+    
+    @instrumented('update_nombre')
+    @refreshes_status
+    def update_nombre_fields(self, changes: Dict[str, str]) -> Dict[str, str]:
+        """
+        Apply several nombre edits to master and working CSVs in one pass
+        
+        Point-update fast path: rows are found through a business_id index and only
+        the touched fields are rewritten; the rest of each file is copied byte for
+        byte. Instead of a full backup, the old and new record text is appended to
+        the journal before both files are replaced together (if the second write
+        fails the first one is rolled back; if the process dies in between, the
+        journal replays the edit on the next run).
+        
+        Spellings of one contractor ("04549", "4549", "4549.0") are one edit: the
+        last one in changes wins and an earlier one with another value is reported
+        as 'superseded'.
+        
+        Returns {contractor_id: 'updated' | 'not_found' | 'superseded' | 'error'}
+        """
+        csv_paths = [self.master_paths['csv'], self.working_paths['csv']]
+        self.metrics.count(contractors=len(changes))
+        
         try:
-            # Create backup first
-            backup_timestamp = self.backup_all_files()
-            logger.info(f"Created backup: {backup_timestamp}")
-            
-            # Update master CSV
-            success_master = self._update_nombre_in_csv(self.master_paths['csv'], contractor_id, nombre_value)
-            if not success_master:
-                logger.error("Failed to update master CSV")
-                return False
-                
-            # Update working CSV
-            success_working = self._update_nombre_in_csv(self.working_paths['csv'], contractor_id, nombre_value)
-            if not success_working:
-                logger.error("Failed to update working CSV")
-                return False
-            
-            logger.info(f"Successfully updated nombre field for contractor {contractor_id} to '{nombre_value}'")
-            return True
-            
-        except Exception as e:
+            with self.metrics.stage('load'):
+                record_files = [self._record_file(path) for path in csv_paths]
+        except (OSError, KeyError, ValueError) as e:
+            logger.error(f"Error loading CSV for nombre update: {e}")
+            return {contractor_id: 'error' for contractor_id in changes}
+        
+        # Resolve every requested id in both files first: an id is applied everywhere or nowhere
+        latest = {canonical_id(contractor_id): contractor_id for contractor_id in changes}
+        results = {}
+        updates = [{} for _ in record_files]
+        for contractor_id, nombre_value in changes.items():
+            if latest[canonical_id(contractor_id)] != contractor_id:
+                continue
+            if not canonical_id(contractor_id):
+                logger.error(f"Empty contractor ID in nombre update")
+                results[contractor_id] = 'not_found'
+                continue
+            rows = [record_file.find(contractor_id) for record_file in record_files]
+            missing = [rf.path for rf, found in zip(record_files, rows) if not found]
+            if missing:
+                for path in missing:
+                    logger.error(f"Contractor ID {contractor_id} not found in {path}")
+                results[contractor_id] = 'not_found'
+                continue
+            for file_updates, found in zip(updates, rows):
+                for row in found:
+                    file_updates.setdefault(row, {})['nombre'] = nombre_value
+            results[contractor_id] = 'updated'
+        for contractor_id, nombre_value in changes.items():
+            if contractor_id not in results:
+                winner = latest[canonical_id(contractor_id)]
+                results[contractor_id] = results[winner] if changes[winner] == nombre_value else 'superseded'
+        
+        if not any(updates):
+            return results
+        
+        try:
+            patched = [record_file.patch(file_updates) for record_file, file_updates in zip(record_files, updates)]
+        except KeyError as e:
             logger.error(f"Error updating nombre field: {e}")
-            return False
+            return {contractor_id: 'error' if status == 'updated' else status
+                    for contractor_id, status in results.items()}
+        
+        journal_changes = [
+            records_change(record_file.path, record_file.data, new_data,
+                           [(record_file.spans[row][0], old_bytes, new_bytes)
+                            for row, (old_bytes, new_bytes) in sorted(changed.items())])
+            for record_file, (new_data, changed) in zip(record_files, patched) if changed
+        ]
+        
+        try:
+            with self.metrics.stage('write'), self.journal.operation('update_nombre', journal_changes):
+                self._replace_files_together(
+                    [(record_file.path, record_file.data, new_data)
+                     for record_file, (new_data, _) in zip(record_files, patched)]
+                )
+        except OSError as e:
+            logger.error(f"Error writing nombre update (no file changed): {e}")
+            return {contractor_id: 'error' if status == 'updated' else status
+                    for contractor_id, status in results.items()}
+        
+        stamps = {}
+        for record_file, (new_data, changed) in zip(record_files, patched):
+            stamps[record_file.path] = (self._record_file_cache[record_file.path][0], self._file_stamp(record_file.path))
+            self._remember_record_file(CsvRecordFile(record_file.path, new_data, 'business_id'))
+            self.metrics.count(rows=len(changed))
+            logger.info(f"Rewrote {len(changed)} record(s) in {record_file.path}")
+        
+        # Keeps the status nombre list current without re-reading the working CSV
+        nombre_edits = {}
+        for row, columns in updates[1].items():
+            record = record_files[1].fields(row, ['business_id', 'L1_company_name'])
+            nombre_edits[row] = [record.get('business_id', ''), record.get('L1_company_name', ''),
+                                 '' if columns['nombre'] is None else str(columns['nombre'])]
+        self.status.note_nombre_edits(nombre_edits, stamps)
+        
+        applied = [contractor_id for contractor_id in latest.values() if results[contractor_id] == 'updated']
+        for contractor_id in applied:
+            logger.info(f"Successfully updated nombre field for contractor {contractor_id} to '{changes[contractor_id]}'")
+        self._record_changes('update_nombre', contractor_fields={
+            contractor_id: {'nombre': changes[contractor_id]} for contractor_id in applied
+        })
+        return results
+    
+    def _record_file(self, path: str) -> CsvRecordFile:
+        """Byte-level record index of a CSV, rebuilt only when the file changed"""
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"CSV file not found: {path}")
+        stamp = self._file_stamp(path)
+        cached = self._record_file_cache.get(path)
+        if cached is None or cached[0] != stamp:
+            cached = (stamp, CsvRecordFile.load(path, 'business_id'))
+            self._record_file_cache[path] = cached
+        return cached[1]
     
-    def _update_nombre_in_csv(self, csv_path: str, contractor_id: str, nombre_value: str) -> bool:
-        """Helper function to update nombre field in a specific CSV file"""
+    def _remember_record_file(self, record_file: CsvRecordFile) -> None:
+        self._record_file_cache[record_file.path] = (self._file_stamp(record_file.path), record_file)
+    
+    def _replace_files_together(self, writes: List[Tuple[str, bytes, bytes]]) -> None:
+        """
+        Replace several files as one unit: [(path, old bytes, new bytes), ...]
+        
+        Each file is swapped in with an atomic rename; if a later one fails, the
+        ones already replaced are restored to their old bytes before re-raising
+        """
+        replaced = []
         try:
-            if not os.path.exists(csv_path):
-                logger.error(f"CSV file not found: {csv_path}")
-                return False
-                
-            # Read CSV
-            df = pd.read_csv(csv_path)
-            logger.info(f"Loaded CSV with {len(df)} rows from {csv_path}")
-            
-            # Find contractor by ID (handle both string and numeric IDs)
-            contractor_mask = (df['business_id'].astype(str) == str(contractor_id)) | (df['business_id'] == int(contractor_id) if contractor_id.isdigit() else False)
-            
-            if not contractor_mask.any():
-                logger.error(f"Contractor ID {contractor_id} not found in {csv_path}")
-                return False
-            
-            # Update nombre field
-            if 'nombre' not in df.columns:
-                logger.error(f"nombre column not found in {csv_path}")
-                return False
-                
-            df.loc[contractor_mask, 'nombre'] = nombre_value
-            logger.info(f"Updated nombre field for contractor {contractor_id}")
-            
-            # Save CSV
-            df.to_csv(csv_path, index=False)
-            logger.info(f"Saved updated CSV to {csv_path}")
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error updating CSV {csv_path}: {e}")
-            return False
+            for path, old_data, new_data in writes:
+                if new_data == old_data:
+                    continue
+                write_atomic(path, new_data)
+                replaced.append((path, old_data))
+        except OSError:
+            for path, old_data in reversed(replaced):
+                write_atomic(path, old_data)
+                logger.warning(f"Rolled back {path}")
+            raise
     
+    @instrumented('sync_master_to_working')
+    @refreshes_status
     def sync_master_to_working(self) -> bool:
         """Sync changes from Master CSV to Working CSV (for manual CSV edits)"""
         try:
             # Create backup first
-            backup_timestamp = self.backup_all_files()
+            backup_timestamp = self.backup_all_files(reason='sync_master_to_working')
             logger.info(f"Created backup: {backup_timestamp}")
             
             # Read Master CSV (source of truth)
@@ -416,12 +1208,16 @@ class ThreeLayerSync:
                 logger.error(f"Master CSV not found: {self.master_paths['csv']}")
                 return False
                 
-            master_df = pd.read_csv(self.master_paths['csv'])
+            with self.metrics.stage('load'):
+                master_df = self._read_csv(self.master_paths['csv'])
             logger.info(f"Loaded Master CSV with {len(master_df)} rows")
+            self.metrics.count(rows=len(master_df))
             
             # Copy Master to Working location
-            master_df.to_csv(self.working_paths['csv'], index=False)
+            with self.metrics.stage('write'), self.publisher.open([self.working_paths['csv']], newline='') as f:
+                master_df.to_csv(f, index=False)
             logger.info(f"Synced Master to Working CSV: {self.working_paths['csv']}")
+            self._record_changes('sync_master_to_working', contractors=master_df)
             
             return True
             
@@ -429,11 +1225,18 @@ class ThreeLayerSync:
             logger.error(f"Error syncing Master to Working: {e}")
             return False
     
-    def sync_campaigns(self) -> bool:
-        """Sync campaign JSON files with smart merge strategy"""
+    @instrumented('sync_campaigns')
+    @refreshes_status
+    def sync_campaigns(self, streaming: bool = False, compact: bool = False) -> bool:
+        """
+        Sync campaign JSON files with smart merge strategy
+        
+        streaming: merge one contractor at a time instead of loading both databases
+        compact: write the working campaign files without indentation
+        """
         try:
             # Create backup first
-            backup_timestamp = self.backup_all_files()
+            backup_timestamp = self.backup_all_files(reason='sync_campaigns')
             logger.info(f"Created backup: {backup_timestamp}")
             
             # Read Master campaigns JSON
@@ -441,26 +1244,38 @@ class ThreeLayerSync:
                 logger.warning(f"Master campaigns JSON not found: {self.master_paths['json_campaigns']}")
                 return True  # Not an error if file doesn't exist yet
             
-            with open(self.master_paths['json_campaigns'], 'r') as f:
-                master_campaigns = json.load(f)
+            if streaming:
+                with self.metrics.stage('merge'):
+                    changes = self._sync_campaigns_streaming(compact)
+                self._save_campaign_changes(changes)
+                self._record_changes('sync_campaigns', campaigns=True)
+                logger.info(f"Synced campaigns to working locations (streaming)")
+                return True
+            
+            with self.metrics.stage('load'):
+                master_campaigns = self._load_campaigns(self.master_paths['json_campaigns'])
+                working_campaigns = self._load_campaigns(self.working_paths['json_campaigns']) \
+                    if os.path.exists(self.working_paths['json_campaigns']) else {}
             logger.info(f"Loaded Master campaigns JSON")
             
             # Smart merge with existing working campaigns (preserve email sequences, sent dates, etc.)
-            if os.path.exists(self.working_paths['json_campaigns']):
-                with open(self.working_paths['json_campaigns'], 'r') as f:
-                    working_campaigns = json.load(f)
-                
-                # Merge strategy: Master wins for campaign_data, Working wins for execution status
-                merged = self._merge_campaign_data(master_campaigns, working_campaigns)
-            else:
-                merged = master_campaigns
+            # Merge strategy: Master wins for campaign_data, Working wins for execution status
+            with self.metrics.stage('merge'):
+                merged, changes = self._merge_campaign_data(master_campaigns, working_campaigns)
+            self.metrics.count(campaigns=len(merged.get('contractors', {})))
             
-            # Write to working locations
-            with open(self.working_paths['json_campaigns'], 'w') as f:
-                json.dump(merged, f, indent=2)
-            
-            with open(self.working_paths['json_app'], 'w') as f:
-                json.dump(merged, f, indent=2)
+            # Serialize once, publish to both working locations
+            layout = {"indent": None, "separators": COMPACT_SEPARATORS} if compact else {"indent": 2}
+            destinations = [self.working_paths['json_campaigns'], self.working_paths['json_app']]
+            with self.metrics.stage('write'), self.publisher.open(destinations) as f:
+                json.dump(plain_database(merged), f, **layout)
+            for path in destinations:
+                self._remember_campaigns(path, merged)
+            self.stats.note_campaigns(CampaignTotals.of(merged.get('contractors', {})),
+                                      self._file_stamp(self.working_paths['json_app']))
+            self._update_schedule('app', self._campaign_schedules(merged.get('contractors', {})), complete=True)
+            self._save_campaign_changes(changes)
+            self._record_changes('sync_campaigns', campaigns=True)
             
             logger.info(f"Synced campaigns to working locations")
             return True
@@ -469,62 +1284,326 @@ class ThreeLayerSync:
             logger.error(f"Error syncing campaigns: {e}")
             return False
     
-    def _merge_campaign_data(self, master: dict, working: dict) -> dict:
-        """Smart merge strategy for campaign data"""
-        merged = master.copy()
-        
-        # Preserve execution status from working copy
-        if 'contractors' in working:
-            for contractor_id, working_data in working['contractors'].items():
-                if contractor_id in merged.get('contractors', {}):
-                    # Preserve sent dates, email status, etc.
-                    master_data = merged['contractors'][contractor_id]
-                    if 'campaign_data' in working_data and 'email_sequences' in working_data['campaign_data']:
-                        # Preserve email sequence status from working copy
-                        if 'campaign_data' not in master_data:
-                            master_data['campaign_data'] = {}
-                        if 'email_sequences' not in master_data['campaign_data']:
-                            master_data['campaign_data']['email_sequences'] = working_data['campaign_data']['email_sequences']
-                        else:
-                            # Merge email sequences: master content + working status
-                            master_sequences = master_data['campaign_data']['email_sequences']
-                            working_sequences = working_data['campaign_data']['email_sequences']
-                            
-                            for i, master_seq in enumerate(master_sequences):
-                                if i < len(working_sequences):
-                                    working_seq = working_sequences[i]
-                                    # Preserve status fields from working
-                                    for field in ['status', 'sent_date', 'opened_date', 'responded_date']:
-                                        if field in working_seq:
-                                            master_seq[field] = working_seq[field]
-        
-        return merged
-    
-    def show_status(self) -> None:
-        """Show current system status"""
+    def _sync_campaigns_streaming(self, compact: bool) -> Dict:
+        """sync_campaigns reading and writing one contractor entry at a time, returns the changes"""
+        working_path = self.working_paths['json_campaigns']
+        
+        with JsonObjectIndex(self.master_paths['json_campaigns']) as master, \
+                JsonObjectIndex(working_path) as working:
+            prelude, epilogue = master.surrounding_members()
+            model = self.campaign_model
+            # Both working locations get the same content; the publisher renames over
+            # working_path only once every entry has been read
+            with self.publisher.open([working_path, self.working_paths['json_app']]) as f, \
+                    JsonObjectWriter(None, prelude=prelude, epilogue=epilogue,
+                                     indent=None if compact else 2, ensure_ascii=True, default=to_json,
+                                     stream=f) as writer:
+                changes = {}
+                totals = CampaignTotals()
+                schedules = []
+                for contractor_id, master_data in master.items():
+                    working_data = model.entry(working.entry(contractor_id)) if contractor_id in working else None
+                    merged, sequence_changes = model.status(model.entry(master_data), working_data)
+                    if sequence_changes:
+                        changes[contractor_id] = sequence_changes
+                    writer.write(contractor_id, merged)
+                    totals.add(contractor_id, merged)
+                    schedules.append((contractor_id, contractor_schedule(contractor_id, merged)))
+                for contractor_id in working.names:
+                    if contractor_id not in master:
+                        changes[contractor_id] = None
+        self.stats.note_campaigns(totals, self._file_stamp(self.working_paths['json_app']))
+        self._update_schedule('app', schedules, complete=True)
+        self.metrics.count(campaigns=totals.total)
+        return changes
+    
+    def _merge_campaign_data(self, master: dict, working: dict) -> Tuple[dict, dict]:
+        """
+        Smart merge strategy for campaign data: master content, working execution status
+        
+        Returns (merged, changes). merged shares unchanged parts with master (which may
+        be a cached dataset): treat it as read-only. changes maps contractor id ->
+        sequence changes (see merge_sequences), None for contractors that are gone.
+        master and working are campaign databases as _load_campaigns returns them.
+        """
+        if 'contractors' not in master:
+            return master, {}
+        working_contractors = working.get('contractors', {})
+        
+        contractors = {}
+        changes = {}
+        for contractor_id, master_data in master['contractors'].items():
+            contractors[contractor_id], sequence_changes = self.campaign_model.status(
+                master_data, working_contractors.get(contractor_id)
+            )
+            if sequence_changes:
+                changes[contractor_id] = sequence_changes
+        for contractor_id in working_contractors:
+            if contractor_id not in contractors:
+                changes[contractor_id] = None
+        
+        return {**master, 'contractors': contractors}, changes
+    
+    def _record_changes(self, operation: str, contractors: Optional[pd.DataFrame] = None,
+                        campaigns: bool = False, contractor_fields: Optional[Dict] = None) -> None:
+        """
+        Add what an operation changed in the app-facing files to the change feed
+        
+        contractors: the working CSV as just written; campaigns: json_app was rewritten;
+        contractor_fields: known {id: {column: value}} edits (no re-read). A failed
+        recording never fails the operation: the feed is reset so consumers reload.
+        """
+        if contractors is not None:
+            self.status.note_contractors(contractors, self._file_stamp(self.working_paths['csv']))
+        try:
+            with self.metrics.stage('change_feed'):
+                if contractor_fields is not None:
+                    self.change_feed.record_contractor_fields(operation, contractor_fields)
+                else:
+                    self.change_feed.record(
+                        operation, contractors=contractors,
+                        campaigns_path=self.working_paths['json_app'] if campaigns else None,
+                        publisher=self.publisher
+                    )
+        except Exception as e:
+            logger.warning(f"Change feed recording failed for {operation}: {e} - resetting feed")
+            self.change_feed.invalidate(operation)
+    
+    @property
+    def campaign_changes_path(self) -> str:
+        return os.path.join(os.path.dirname(self.temporal_paths['csv']), 'campaign_changes.json')
+    
+    def _save_campaign_changes(self, changes: Dict) -> None:
+        """Per-contractor email status deltas of the last sync_campaigns (for the app's calendar)"""
+        with self.publisher.open([self.campaign_changes_path]) as f:
+            json.dump({"generated_date": datetime.now().isoformat(), "contractors": changes},
+                      f, separators=COMPACT_SEPARATORS, ensure_ascii=False)
+        logger.info(f"Campaign changes: {len(changes)} contractors -> {self.campaign_changes_path}")
+    
+    # ------------------------------------------------------------------
+    # Campaign schedule index (calendar queries by date, see sync_schedule)
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def _campaign_schedules(campaigns: Dict, contractor_ids: Optional[Iterable[str]] = None) -> Iterator[Tuple]:
+        """(contractor_id, contractor_schedule) of every campaign of a contractors map (or of contractor_ids in it)"""
+        for contractor_id in campaigns if contractor_ids is None else contractor_ids:
+            if contractor_id in campaigns:
+                yield contractor_id, contractor_schedule(contractor_id, campaigns[contractor_id])
+    
+    def _update_schedule(self, name: str, schedules: Iterable[Tuple], complete: bool = False,
+                         removed: Iterable[str] = ()) -> None:
+        """
+        Bring one schedule index up to date with the contractors an operation just wrote
+        
+        See ScheduleIndex.update. Runs once those contractors are published (see
+        Publisher.after_publish); a failure drops the index (the next query rebuilds
+        it from its source) and never fails the operation.
+        """
+        index = self.schedules[name]
+        
+        def update():
+            try:
+                with self.metrics.stage('schedule'):
+                    result = index.update(schedules, complete=complete, removed=removed)
+                logger.info(f"Schedule index {name}: {result['contractors']} contractors changed, "
+                            f"{result['partitions']} partitions rewritten")
+            except Exception as e:
+                logger.warning(f"Schedule index {name} update failed: {e} - dropping {index.root}")
+                index.invalidate()
+        
+        self.publisher.after_publish(update)
+    
+    def schedule_due(self, start: date, end: date, name: str = 'app', rebuild: bool = False) -> List[Dict]:
+        """
+        Campaign emails dated start..end from a schedule index ('app': the campaigns
+        the app shows, 'merged': the temporal merge), see ScheduleIndex.due
+        
+        A missing index (or rebuild) is rebuilt from its source first.
+        """
+        index = self.schedules[name]
+        if rebuild or not index.exists():
+            campaigns = {}
+            if os.path.exists(index.source):
+                campaigns = self._load_campaigns(index.source).get('contractors', {})
+            result = index.rebuild(campaigns)
+            logger.info(f"Rebuilt schedule index {name}: {len(campaigns)} contractors, "
+                        f"{result['partitions']} partitions")
+        return index.due(start, end)
+    
+    # ------------------------------------------------------------------
+    # Status sidecar (what --status shows, see sync_status)
+    # ------------------------------------------------------------------
+    
+    def refresh_status(self, operation: Optional[str] = None, success: bool = True,
+                       full: bool = False) -> Optional[Dict]:
+        """
+        Rewrite temp/status.json and return it (None if that failed)
+        
+        Runs after every operation (refreshes_status) with what the operation already
+        knows; full also hashes unhashed files and re-reads the contractor ids and
+        nombres it could not reuse. A failure drops the sidecar instead of leaving a
+        stale one and never fails the operation.
+        """
+        frame, nombre_edits = self.status.take_notes()
+        campaign_totals = self.stats.take_notes()
+        try:
+            with self.metrics.stage('status'):
+                status = self._build_status(self.status.load() or {}, frame, nombre_edits, full)
+                if operation is not None:
+                    finished = datetime.now().isoformat()
+                    status['last_operation'] = {"name": operation, "finished": finished, "success": success}
+                    status['operations'][operation] = finished
+                self.status.save(status)
+        except Exception as e:
+            logger.warning(f"Status refresh failed after {operation or 'rebuild'}: {e} - dropping {self.status.path}")
+            try:
+                self.status.invalidate()
+            except OSError:
+                pass
+            return None
+        self.refresh_stats(status, frame, nombre_edits, campaign_totals, full)
+        return status
+    
+    def _build_status(self, previous: Dict, frame: Optional[Tuple], nombre_edits: Optional[Tuple],
+                      full: bool) -> Dict:
+        known_hashes = [self.publisher.hash_cache(), self.backup_store.hash_cache(),
+                        {entry['path']: entry for files in previous.get('files', {}).values()
+                         for entry in files.values()}]
+        files = {
+            layer: {file_type: file_entry(path, known_hashes, hash_missing=full) for file_type, path in paths.items()}
+            for layer, paths in (("master", self.master_paths), ("working", self.working_paths),
+                                 ("temporal", self.temporal_paths))
+        }
+        
+        edited_stamps = nombre_edits[1] if nombre_edits else {}
+        contractor_ids = {}
+        for label, path in (("master", self.master_paths['csv']), ("working", self.working_paths['csv'])):
+            entry = files[label]['csv']
+            if entry['exists']:
+                contractor_ids[label] = self._status_contractor_ids(
+                    path, (entry['mtime_ns'], entry['size']), previous.get('contractor_ids', {}).get(label),
+                    frame if label == 'working' else None, edited_stamps.get(path), full)
+        
+        working = files['working']['csv']
+        nombres = None
+        if working['exists']:
+            nombre_list = self._status_nombres((working['mtime_ns'], working['size']), frame, nombre_edits, full)
+            nombres = nombre_list.summary() if nombre_list is not None else None
+        
+        return {
+            "version": STATUS_VERSION,
+            "updated": datetime.now().isoformat(),
+            "last_operation": previous.get('last_operation'),
+            "operations": dict(previous.get('operations', {})),
+            "files": files,
+            "change_feed": self.change_feed.head(),
+            "backups": [{"id": backup['id'], "created": backup['created'], "reason": backup.get('reason') or 'manual'}
+                        for backup in self.backup_store.list_manifests(limit=RECENT_BACKUPS)],
+            "contractor_ids": contractor_ids,
+            "nombres": nombres
+        }
+    
+    def _status_contractor_ids(self, path: str, stamp: Tuple[int, int], previous: Optional[Dict],
+                               frame: Optional[Tuple], edited: Optional[Tuple], full: bool) -> Optional[Dict]:
+        """Id counts of one CSV from the cheapest source that is current (None when unknown)"""
+        if previous is not None:
+            previous_stamp = tuple(previous['stamp'])
+            # Unchanged, or only nombre cells were rewritten since
+            if previous_stamp == stamp or edited == (previous_stamp, stamp):
+                return {**previous, "stamp": list(stamp)}
+        cached = self._index_cache.get(path)
+        if cached is not None and cached[0] == stamp:
+            index = cached[1]
+        elif frame is not None and frame[0] == stamp:
+            index = ContractorIndex(frame[1]['business_id'])
+        elif full:
+            index = self.contractor_index(path)
+        else:
+            return None
+        return {"stamp": list(stamp), "contractors": len(index), "duplicates": len(index.duplicates),
+                "aliases": len(index.aliases), "missing_ids": index.missing_ids}
+    
+    def _status_nombres(self, stamp: Tuple[int, int], frame: Optional[Tuple], nombre_edits: Optional[Tuple],
+                        full: bool) -> Optional[NombreList]:
+        """The nombre list of the working CSV version with this stamp (None when unknown)"""
+        path = self.working_paths['csv']
+        nombre_list = self.status.load_nombres()
+        if nombre_list is not None and nombre_list.stamp == stamp:
+            return nombre_list
+        
+        edits, stamps = nombre_edits or ({}, {})
+        if nombre_list is not None and stamps.get(path) == (nombre_list.stamp, stamp):
+            nombre_list.apply(edits, stamp)
+        elif frame is not None and frame[0] == stamp:
+            nombre_list = NombreList.from_frame(frame[1], stamp)
+        elif path in self._dataset_cache and self._dataset_cache[path][0] == stamp:
+            nombre_list = NombreList.from_frame(self._dataset_cache[path][1], stamp)
+        elif full:
+            columns = [col for col in NOMBRE_COLUMNS if col in self.snapshots.columns(path)]
+            nombre_list = NombreList.from_frame(self._read_csv(path, columns=columns), stamp)
+        else:
+            return None
+        self.status.save_nombres(nombre_list)
+        return nombre_list
+    
+    def show_status(self, as_json: bool = False, refresh: bool = False) -> bool:
+        """
+        Show current system status from the status sidecar (one small file read)
+        
+        A missing sidecar (or refresh) is rebuilt first under the shared lock. Files
+        that changed since the sidecar was written (edited outside the sync) are
+        flagged, one stat() each. as_json prints the sidecar itself plus
+        "changed_since_update" instead of the text report.
+        """
+        status = None if refresh else self.status.load()
+        if status is None:
+            with self.lock.hold(exclusive=False):
+                status = self.refresh_status(full=True)
+        if status is None:
+            if as_json:
+                print(json.dumps({"error": "status unavailable"}))
+            else:
+                print("❌ Status unavailable (see log)")
+            return False
+        status['changed_since_update'] = changed_files(status)
+        
+        if as_json:
+            print(json.dumps(status, ensure_ascii=False))
+            return True
+        
+        last = status.get('last_operation')
         print("=" * 60)
         print("🗂️  FILE STATUS:")
+        print(f"  🕒 as of {status['updated'][:19].replace('T', ' ')}"
+              + (f" | last operation: {last['name']} {'✅' if last['success'] else '❌'} "
+                 f"{last['finished'][:19].replace('T', ' ')}" if last else ""))
         print("=" * 60)
         
-        for layer_name, paths in [
-            ("MASTER FILES", self.master_paths),
-            ("WORKING FILES", self.working_paths), 
-            ("TEMPORAL FILES", self.temporal_paths)
+        for layer_name, files in [
+            ("MASTER FILES", status['files']['master']),
+            ("WORKING FILES", status['files']['working']),
+            ("TEMPORAL FILES", status['files']['temporal'])
         ]:
+            layer = layer_name.split()[0].lower()
             print(f"\n📁 {layer_name}:")
-            for file_type, path in paths.items():
-                exists = "✅" if os.path.exists(path) else "❌"
+            for file_type, entry in files.items():
+                exists = "✅" if entry['exists'] else "❌"
                 size = ""
-                if os.path.exists(path):
-                    size_bytes = os.path.getsize(path)
+                if entry['exists']:
+                    size_bytes = entry['size']
                     if size_bytes > 1024*1024:
                         size = f"({size_bytes/(1024*1024):.1f} MB)"
                     elif size_bytes > 1024:
                         size = f"({size_bytes/1024:.1f} KB)"
                     else:
                         size = f"({size_bytes} bytes)"
+                    if entry.get('sha256'):
+                        size += f" sha256:{entry['sha256'][:12]}"
+                changed = " ⚠️  changed since" if f"{layer}.{file_type}" in status['changed_since_update'] else ""
                 
-                print(f"  {exists} {file_type}: {size}")
+                print(f"  {exists} {file_type}: {size}{changed}")
+                path = entry['path']
                 if len(path) > 80:
                     print(f"      ...{path[-70:]}")
                 else:
@@ -532,108 +1611,372 @@ class ThreeLayerSync:
         
         # Show recent backups
         print(f"\n📦 RECENT BACKUPS:")
-        backup_dirs = []
-        if os.path.exists(self.backup_dir):
-            backup_dirs = sorted([d for d in os.listdir(self.backup_dir) if d.startswith('sync_')], reverse=True)[:5]
-        
-        if backup_dirs:
-            for backup in backup_dirs:
-                backup_path = os.path.join(self.backup_dir, backup)
-                backup_time = backup.replace('sync_', '').replace('_', ' ')
-                print(f"  📦 {backup_time}")
+        if status['backups']:
+            for backup in status['backups']:
+                backup_time = backup['created'][:19].replace('T', ' ')
+                print(f"  📦 {backup_time} | {backup['id']} ({backup['reason']})")
         else:
             print("  📦 No backups found")
         
+        # Change feed position
+        feed_head = status['change_feed']
+        print(f"\n🔢 CHANGE FEED: revision {feed_head['revision']} (deltas from {feed_head['oldest']})")
+        
+        # Canonical id index of each contractor CSV (duplicates / alias spellings found while building it)
+        print(f"\n🔑 CONTRACTOR IDS:")
+        for label, ids in status['contractor_ids'].items():
+            if ids is None:
+                print(f"  🔑 {label}: unknown since its last change (--status --refresh)")
+                continue
+            print(f"  🔑 {label}: {ids['contractors']} contractors | {ids['duplicates']} duplicated | "
+                  f"{ids['aliases']} with alias spellings | {ids['missing_ids']} rows without id")
+        
         # Show contractors with nombres
         print(f"\n👥 CONTRACTORS WITH NOMBRES:")
+        nombres = status['nombres']
+        if not status['files']['working']['csv']['exists']:
+            print("  ❌ Working CSV not found")
+        elif nombres is None:
+            print("  ❓ Unknown since the working CSV last changed (--status --refresh)")
+        else:
+            print(f"  📊 Total: {nombres['total']} contractors")
+            for entry in nombres['sample']:
+                print(f"  👤 ID:{entry['business_id']:>4} | {entry['company']:<30} | \"{entry['nombre']}\"")
+            if nombres['total'] > len(nombres['sample']):
+                print(f"  ... and {nombres['total'] - len(nombres['sample'])} more")
+        
+        print("=" * 60)
+        return True
+    
+    # ------------------------------------------------------------------
+    # Dashboard stats (contractor_stats.json, see sync_stats)
+    # ------------------------------------------------------------------
+    
+    def refresh_stats(self, status: Dict, frame: Optional[Tuple], nombre_edits: Optional[Tuple],
+                      campaign_totals: Optional[Tuple], full: bool = False) -> Optional[Dict]:
+        """
+        Bring contractor_stats.json up to the file versions in status, returns it (None if that failed)
+        
+        Part of refresh_status: a section is kept while its file is unchanged,
+        patched after nombre edits and recomputed from what the operation noted
+        (the working CSV frame, the campaign totals); full recomputes every section
+        from the files. A section that cannot be brought current is dropped (the app
+        falls back to parsing); a failure drops the whole file and never fails the
+        operation.
+        """
         try:
-            if os.path.exists(self.working_paths['csv']):
-                df = pd.read_csv(self.working_paths['csv'])
-                contractors_with_nombres = df[df['nombre'].notna() & (df['nombre'] != '')]
-                print(f"  📊 Total: {len(contractors_with_nombres)} contractors")
+            with self.metrics.stage('stats'):
+                previous = {} if full else self.stats.load() or {}
+                ids = None
                 
-                if len(contractors_with_nombres) > 0:
-                    for idx, row in contractors_with_nombres.head(10).iterrows():
-                        print(f"  👤 ID:{row['business_id']:>4} | {row['L1_company_name']:<30} | \"{row['nombre']}\"")
-                    
-                    if len(contractors_with_nombres) > 10:
-                        print(f"  ... and {len(contractors_with_nombres) - 10} more")
-            else:
-                print("  ❌ Working CSV not found")
+                working = status['files']['working']['csv']
+                stamp = (working['mtime_ns'], working['size']) if working['exists'] else None
+                contractors = previous.get('contractors')
+                if stamp is None:
+                    contractors = None
+                elif contractors is None or contractors['stamp'] != stamp_key(stamp):
+                    contractors, ids = self._stats_contractors(contractors, stamp, status, frame, nombre_edits, full)
+                
+                app = status['files']['working']['json_app']
+                app_stamp = (app['mtime_ns'], app['size']) if app['exists'] else None
+                campaigns = previous.get('campaigns')
+                if app_stamp is None:
+                    campaigns = None
+                elif campaigns is None or campaigns['stamp'] != stamp_key(app_stamp):
+                    campaigns = None
+                    if campaign_totals is None and full:
+                        campaign_totals = (stamp_key(app_stamp), CampaignTotals.of(
+                            self._load_campaigns(self.working_paths['json_app']).get('contractors', {})))
+                    if campaign_totals is not None and campaign_totals[0] == stamp_key(app_stamp):
+                        campaigns = campaign_totals[1].section(app_stamp)
+                        ids = {**(ids or self.stats.load_ids()),
+                               "campaigns": {"stamp": campaigns['stamp'], "ids": campaign_totals[1].ids}}
+                
+                setup = previous.get('campaign_setup')
+                stamps = {"contractors": contractors and contractors['stamp'],
+                          "campaigns": campaigns and campaigns['stamp']}
+                if contractors is None or campaigns is None:
+                    setup = None
+                elif setup is None or setup['stamps'] != stamps:
+                    ids = ids or self.stats.load_ids()
+                    setup = None
+                    if all(ids.get(side, {}).get('stamp') == stamps[side] for side in stamps):
+                        setup = campaign_setup(ids['contractors']['ids'], ids['contractors']['total'],
+                                               ids['campaigns']['ids'], stamps)
+                
+                if ids is not None:
+                    self.stats.save_ids(ids)
+                stats = {"version": STATS_VERSION, "updated": datetime.now().isoformat(),
+                         "contractors": contractors, "campaigns": campaigns, "campaign_setup": setup}
+                self.stats.save(stats)
+            return stats
         except Exception as e:
-            print(f"  ❌ Error reading contractors: {e}")
-        
-        print("=" * 60)
+            logger.warning(f"Stats refresh failed: {e} - dropping {self.stats.path}")
+            try:
+                self.stats.invalidate()
+            except OSError:
+                pass
+            return None
+    
+    def _stats_contractors(self, previous: Optional[Dict], stamp: Tuple[int, int], status: Dict,
+                           frame: Optional[Tuple], nombre_edits: Optional[Tuple],
+                           full: bool) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """Contractors section of the working CSV version with this stamp, plus the updated ids (if they changed)"""
+        path = self.working_paths['csv']
+        edited = (nombre_edits[1] if nombre_edits else {}).get(path)
+        if previous is not None and edited is not None and stamp_key(edited[0]) == previous['stamp']:
+            # Only nombre cells changed: the nombre list of the status already counts them
+            ids = self.stats.load_ids()
+            if ids.get('contractors', {}).get('stamp') == previous['stamp']:
+                ids['contractors']['stamp'] = stamp_key(stamp)
+            nombres = status['nombres'] and nombre_coverage(status['nombres']['total'], previous['total'])
+            return {**previous, "stamp": stamp_key(stamp), "nombres": nombres}, ids
+        
+        if frame is not None and frame[0] == stamp:
+            df = frame[1]
+        elif path in self._dataset_cache and self._dataset_cache[path][0] == stamp:
+            df = self._dataset_cache[path][1]
+        elif full:
+            df = self._read_csv(path, columns=[col for col in STATS_COLUMNS if col in self.snapshots.columns(path)])
+        else:
+            return None, None
+        ids = {**self.stats.load_ids(),
+               "contractors": {"stamp": stamp_key(stamp), "total": len(df), "ids": contractor_ids(df)}}
+        return contractor_stats(df, stamp), ids
 
 
-if __name__ == "__main__":
-    import sys
+def run_command(sync: ThreeLayerSync, argv: List[str]) -> int:
+    """
+    Dispatch one CLI command against an existing ThreeLayerSync instance
     
-    # Configure logging
-    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    Shared by the one-shot CLI below and the long-lived sync_service.py, so both
+    print the same output. Returns the process exit code.
+    
+    A command that ran a sync operation ends its output with one SYNC_METRICS
+    JSON line (see sync_metrics). --profiling (anywhere in argv) also dumps a
+    cProfile and a tracemalloc report of the command to temp/metrics/profiles/.
     
-    sync = ThreeLayerSync()
+    The command holds sync.lock (shared for READ_ONLY_COMMANDS, not at all for
+    LOCK_FREE_COMMANDS): another process running on the same paths waits for it,
+    up to SYNC_LOCK_TIMEOUT seconds. A
+    COALESCED_COMMANDS request that waited while the same command started replays
+    that run's output; nombre edits are queued and applied in batches.
+    """
+    command = [arg for arg in argv if arg != "--profiling"]
+    try:
+        if command and command[0] in COALESCED_COMMANDS:
+            return sync.requests.run(' '.join(command), lambda: _run(sync, argv))
+        if command and command[0] in QUEUED_COMMANDS:
+            # The lock is taken inside RequestCoalescer.submit_nombre
+            return _run(sync, argv)
+        if command and command[0] in LOCK_FREE_COMMANDS:
+            return _run(sync, argv)
+        with sync.lock.hold(exclusive=not (command and command[0] in READ_ONLY_COMMANDS)):
+            return _run(sync, argv)
+    except LockTimeout as e:
+        print(f"❌ Another sync is running on these files: {e}")
+        return 1
+
+
+def _run(sync: ThreeLayerSync, argv: List[str]) -> int:
+    profiling = "--profiling" in argv
+    argv = [arg for arg in argv if arg != "--profiling"]
+    previous = sync.metrics.last
     
+    if profiling:
+        label = (argv[0].lstrip('-') if argv else 'default').replace('-', '_')
+        with profiled(os.path.join(sync.metrics.report_dir, 'profiles'), label) as profile_paths:
+            exit_code = _dispatch(sync, argv)
+        for kind, path in profile_paths.items():
+            print(f"📈 {kind}: {path}")
+    else:
+        exit_code = _dispatch(sync, argv)
+    
+    if sync.metrics.last is not previous:
+        print(sync.metrics.stdout_line())
+    return exit_code
+
+
+def _print_nombre_results(results: Dict[str, str]) -> None:
+    for contractor_id, status in results.items():
+        icon = {"updated": "✅", "superseded": "↪️ "}.get(status, "❌")
+        print(f"  {icon} {contractor_id}: {status}")
+
+
+def _dispatch(sync: ThreeLayerSync, argv: List[str]) -> int:
     # Check for command-line arguments
-    if len(sys.argv) >= 4 and sys.argv[1] == "--update-nombre":
+    if len(argv) >= 3 and argv[0] == "--update-nombre":
         # Handle update-nombre command
-        contractor_id = sys.argv[2]
-        nombre_value = sys.argv[3]
+        contractor_id = argv[1]
+        nombre_value = argv[2]
         
         print(f"🔄 Updating nombre field for contractor {contractor_id} to '{nombre_value}'")
-        success = sync.update_nombre_field(contractor_id, nombre_value)
+        # Queued: concurrent edits from other processes are written in the same batch
+        results = sync.requests.submit_nombre({contractor_id: nombre_value}, sync.update_nombre_fields)
         
-        if success:
+        if results.get(contractor_id) == 'updated':
             print("✅ Successfully updated nombre field in both master and working CSVs")
-            sys.exit(0)
+            return 0
         else:
             print("❌ Failed to update nombre field")
-            sys.exit(1)
+            return 1
     
-    elif len(sys.argv) >= 2 and sys.argv[1] == "--sync-master-to-working":
+    elif len(argv) >= 1 and argv[0] == "--sync-master-to-working":
         # Handle master → working sync
         print("🔄 Syncing changes from Master CSV to Working CSV...")
         success = sync.sync_master_to_working()
         
         if success:
             print("✅ Successfully synced Master to Working CSV")
-            sys.exit(0)
+            return 0
         else:
             print("❌ Failed to sync Master to Working")
-            sys.exit(1)
+            return 1
     
-    elif len(sys.argv) >= 2 and sys.argv[1] == "--sync-campaigns":
-        # Handle campaigns JSON sync
+    elif len(argv) >= 1 and argv[0] == "--sync-campaigns":
+        # Handle campaigns JSON sync (--stream: one contractor at a time, --compact: no indentation)
         print("🔄 Syncing campaigns JSON files...")
-        success = sync.sync_campaigns()
+        success = sync.sync_campaigns(streaming="--stream" in argv[1:], compact="--compact" in argv[1:])
         
         if success:
             print("✅ Successfully synced campaign JSON files")
-            sys.exit(0)
+            return 0
         else:
             print("❌ Failed to sync campaign JSON files")
-            sys.exit(1)
+            return 1
     
-    elif len(sys.argv) >= 2 and sys.argv[1] == "--full-sync":
-        # Handle full system sync
-        print("🔄 Performing full system sync (CSV + JSON)...")
-        report = sync.full_sync()
+    elif len(argv) >= 1 and argv[0] == "--full-sync":
+        # Handle full system sync (--incremental: only re-merge changed contractors,
+        # --stream: merge campaigns one contractor at a time, --compact: no indentation,
+        # --parallel: backup and both merge pipelines concurrently)
+        incremental = "--incremental" in argv[1:]
+        print(f"🔄 Performing {'incremental' if incremental else 'full'} system sync (CSV + JSON)...")
+        report = sync.full_sync(incremental=incremental, streaming="--stream" in argv[1:],
+                                compact="--compact" in argv[1:], parallel="--parallel" in argv[1:])
         
         print("📊 Full Sync Report:")
         print(json.dumps(report, indent=2))
         
         if report.get('success', False):
             print("✅ Full sync completed successfully")
-            sys.exit(0)
+            return 0
         else:
             print("❌ Full sync failed")
-            sys.exit(1)
+            return 1
+    
+    elif len(argv) >= 1 and argv[0] == "--status":
+        # Show system status from the sidecar (--json: the sidecar as JSON, --refresh: rebuild it first)
+        as_json = "--json" in argv[1:]
+        if not as_json:
+            print("📊 System Status:")
+        return 0 if sync.show_status(as_json=as_json, refresh="--refresh" in argv[1:]) else 1
+    elif len(argv) >= 2 and argv[0] == "--update-nombre-batch":
+        # Apply several nombre edits ({"changes": {id: nombre}} or {id: nombre}) in one pass
+        try:
+            changes = load_nombre_changes(argv[1])
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not read nombre changes: {e}")
+            return 1
+        
+        print(f"🔄 Updating nombre field for {len(changes)} contractors")
+        results = sync.requests.submit_nombre(changes, sync.update_nombre_fields)
+        _print_nombre_results(results)
+        return 0 if all(status == 'updated' for status in results.values()) else 1
+    
+    elif len(argv) >= 1 and argv[0] == "--apply-nombre-changes":
+        # Apply the app's pending nombre edits (default: nombre_changes.json next to the working CSV)
+        # as one batch, then remove the applied entries from the file
+        changes_path = argv[1] if len(argv) >= 2 else default_changes_path(sync.working_paths['csv'])
+        try:
+            changes = load_nombre_changes(changes_path)
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not read nombre changes: {e}")
+            return 1
+        if not changes:
+            print(f"✅ No pending nombre changes in {changes_path}")
+            return 0
+        
+        print(f"🔄 Applying {len(changes)} pending nombre changes from {changes_path}")
+        results = sync.requests.submit_nombre(changes, sync.update_nombre_fields)
+        _print_nombre_results(results)
+        consumed = {contractor_id: nombre for contractor_id, nombre in changes.items()
+                    if results.get(contractor_id) in ('updated', 'superseded')}
+        try:
+            cleared = clear_applied(changes_path, consumed)
+        except OSError as e:
+            print(f"❌ Applied, but could not clear {changes_path}: {e}")
+            return 1
+        print(f"🧹 Cleared {cleared} applied entries, {len(changes) - cleared} left in {changes_path}")
+        return 0 if all(status in ('updated', 'superseded') for status in results.values()) else 1
+    elif len(argv) >= 1 and argv[0] == "--backup":
+        manifest_path = sync.backup_all_files(reason='manual')
+        print(f"📦 Backup manifest: {manifest_path}")
+        return 0
+    
+    elif len(argv) >= 1 and argv[0] == "--list-backups":
+        for backup in sync.backup_store.list_manifests():
+            total_size = sum(entry['size'] for entry in backup['files'].values())
+            print(f"📦 {backup['id']} | {backup.get('reason') or 'manual':<22} | "
+                  f"{len(backup['files'])} files | {total_size / (1024 * 1024):.1f} MB")
+        return 0
+    
+    elif len(argv) >= 1 and argv[0] == "--journal":
+        # Operations since the last checkpoint (open ones are finished by the next writer)
+        checkpoint = sync.journal.last_checkpoint()
+        if checkpoint:
+            print(f"📍 Checkpoint {checkpoint['created']}: backup {checkpoint['backup']} "
+                  f"({checkpoint['operations']} operations folded)")
+        for operation in sync.journal.operations():
+            icon = {"committed": "✅", "replayed": "♻️ ", "aborted": "❌"}.get(operation['status'], "⏳")
+            print(f"{icon} {operation['id']} | {operation['operation']:<14} | {operation['status']:<9} | "
+                  f"{len(operation['files'])} files, {operation['records']} records"
+                  + (f" | {operation['reason']}" if operation.get('reason') else ''))
+        return 0
+    
+    elif len(argv) >= 2 and argv[0] == "--restore":
+        # --restore <backup id> [label ...] (labels like master_csv, working_json_app)
+        manifest_id = argv[1]
+        print(f"♻️  Restoring backup {manifest_id}...")
+        try:
+            restored = sync.backup_store.restore(manifest_id, labels=argv[2:] or None)
+        except (OSError, KeyError) as e:
+            print(f"❌ Restore failed: {e}")
+            return 1
+        for label, path in restored.items():
+            print(f"  ✅ {label}: {path}")
+        sync.refresh_status('restore', full=True)
+        return 0
+    
+    elif len(argv) >= 2 and argv[0] == "--changes-since":
+        # Folded delta of the working CSV / app campaigns since a feed revision (JSON only on stdout)
+        try:
+            revision = int(argv[1])
+        except ValueError:
+            print(f"❌ Invalid revision: {argv[1]}")
+            return 1
+        print(json.dumps(sync.change_feed.changes_since(revision), separators=COMPACT_SEPARATORS, ensure_ascii=False))
+        return 0
+    
+    elif len(argv) >= 1 and argv[0] == "--schedule":
+        # Campaign emails dated FROM..TO (YYYY-MM-DD, inclusive) from the schedule index (JSON only on stdout);
+        # --merged: of the temporal merge instead of the app campaigns, --rebuild: rebuild the index first
+        try:
+            start, end = date.fromisoformat(argv[1]), date.fromisoformat(argv[2])
+        except (IndexError, ValueError):
+            print(f"❌ Invalid date range: {' '.join(argv[1:3])} (usage: --schedule YYYY-MM-DD YYYY-MM-DD)")
+            return 1
+        entries = sync.schedule_due(start, end, name='merged' if "--merged" in argv[3:] else 'app',
+                                    rebuild="--rebuild" in argv[3:])
+        print(json.dumps({"from": start.isoformat(), "to": end.isoformat(), "entries": entries},
+                         separators=COMPACT_SEPARATORS, ensure_ascii=False))
+        return 0
+    
+    elif len(argv) >= 1 and argv[0] == "--prune-backups":
+        result = sync.backup_store.prune()
+        sync.refresh_status('prune_backups')
+        print(f"🧹 Pruned backups: {json.dumps(result)}")
+        return 0
     
-    elif len(sys.argv) >= 2 and sys.argv[1] == "--status":
-        # Show system status
-        print("📊 System Status:")
-        sync.show_status()
-        sys.exit(0)
     else:
         # Default behavior: test the sync system
         print("🚀 Testing 3-Layer Sync System")
@@ -648,4 +1991,25 @@ if __name__ == "__main__":
         print("✅ Files available in temporal layer:")
         for file_type, path in sync.temporal_paths.items():
             exists = "✅" if os.path.exists(path) else "❌"
-            print(f"  {file_type}: {exists} {path}")
\ No newline at end of file
+            print(f"  {file_type}: {exists} {path}")
+        return 0
+
+
+if __name__ == "__main__":
+    import sys
+    
+    # Configure logging
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
+    from sync_profiles import ProfileError, load_profile, pop_profile_arg
+    
+    # --profile NAME / SYNC_PROFILE / SYNC_ROOT select the data root (see sync_profiles)
+    try:
+        profile_name, argv = pop_profile_arg(sys.argv[1:])
+        profile = load_profile(profile_name)
+        sync = ThreeLayerSync(**profile.sync_kwargs())
+    except ProfileError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    logger.info(f"Sync profile: {profile.name}")
+    sys.exit(run_command(sync, argv))
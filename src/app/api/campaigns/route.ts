@@ -1,6 +1,7 @@
 import { NextRequest, NextResponse } from 'next/server';
 import fs from 'fs/promises';
 import path from 'path';
+import { writeFileAtomic } from '@/lib/utils/write-atomic';
 
 export async function GET() {
   try {
@@ -77,7 +78,7 @@ export async function PATCH(request: NextRequest) {
       campaigns.database_info.last_updated = new Date().toISOString();
       
       // Write back to file
-      await fs.writeFile(jsonPath, JSON.stringify(campaigns, null, 2));
+      await writeFileAtomic(jsonPath, JSON.stringify(campaigns, null, 2));
     }
     
     return NextResponse.json({ success: true });
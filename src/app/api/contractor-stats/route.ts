@@ -3,6 +3,7 @@ import Papa from 'papaparse';
 import fs from 'fs/promises';
 import path from 'path';
 import { withAuth } from '@/lib/auth';
+import { canonicalId } from '@/lib/utils/canonical-id';
 
 // Force dynamic rendering to prevent caching and receive query params in Vercel
 export const dynamic = 'force-dynamic';
@@ -28,6 +29,44 @@ let statsCache: any = null;
 let cacheTimestamp = 0;
 const CACHE_DURATION = 5 * 60 * 1000; // 5 minutes
 
+// Aggregates the sync keeps next to the CSV (scripts/sync_stats.py); each section
+// names the version ("<mtime_ns>-<size>") of the file it was computed from
+const STATS_VERSION = 2;
+
+async function fileStamp(filePath: string): Promise<string | null> {
+  try {
+    const stat = await fs.stat(filePath, { bigint: true });
+    return `${stat.mtimeNs}-${stat.size}`;
+  } catch {
+    return null;
+  }
+}
+
+// The precomputed stats, or null when missing or older than the data files
+async function loadPrecomputedStats(dataDir: string) {
+  try {
+    const artifact = JSON.parse(await fs.readFile(path.join(dataDir, 'contractor_stats.json'), 'utf-8'));
+    if (artifact.version !== STATS_VERSION || !artifact.contractors || !artifact.campaigns || !artifact.campaign_setup) {
+      return null;
+    }
+    const { stamp: contractorsStamp, nombres, ...filters } = artifact.contractors;
+    const { stamp: campaignsStamp, ...campaignTotals } = artifact.campaigns;
+    const { stamps: setupStamps, ...campaignFilter } = artifact.campaign_setup;
+
+    const [csvStamp, jsonStamp] = await Promise.all([
+      fileStamp(path.join(dataDir, 'contractors_original.csv')),
+      fileStamp(path.join(dataDir, 'campaigns.json')),
+    ]);
+    if (contractorsStamp !== csvStamp || setupStamps.contractors !== csvStamp ||
+        campaignsStamp !== jsonStamp || setupStamps.campaigns !== jsonStamp) {
+      return null;
+    }
+    return { stats: { ...filters, campaigns: campaignFilter }, nombres, campaignTotals, updated: artifact.updated };
+  } catch {
+    return null;
+  }
+}
+
 // Function to categorize contractors based on exact mapping
 function getMegaCategory(category: string): string {
   if (!category) return 'Other';
@@ -55,6 +94,25 @@ function getMegaCategory(category: string): string {
 
 export const GET = withAuth(async (request: NextRequest) => {
   try {
+    // Serve what the last sync computed while the data files are unchanged
+    const precomputed = await loadPrecomputedStats(path.join(process.cwd(), 'public', 'data'));
+    if (precomputed) {
+      const precomputedResponse = NextResponse.json({
+        stats: precomputed.stats,
+        nombres: precomputed.nombres,
+        campaignTotals: precomputed.campaignTotals,
+        timestamp: precomputed.updated,
+        cached: false,
+        precomputed: true
+      });
+
+      Object.entries(corsHeaders).forEach(([key, value]) => {
+        precomputedResponse.headers.set(key, value);
+      });
+
+      return precomputedResponse;
+    }
+
     // Check cache first
     const now = Date.now();
     if (statsCache && now - cacheTimestamp < CACHE_DURATION) {
@@ -98,19 +156,14 @@ export const GET = withAuth(async (request: NextRequest) => {
     
     Object.entries(contractorsObj).forEach(([contractorId, contractorData]: [string, any]) => {
       if (contractorData.campaign_data) {
-        const campaign = contractorData.campaign_data;
-        
-        // Store both padded and unpadded versions for flexible matching
-        const paddedId = contractorId;
-        const unpaddedId = parseInt(contractorId, 10).toString();
-        campaignsLookup[paddedId] = campaign;
-        campaignsLookup[unpaddedId] = campaign;
+        // Canonical ids ("04549", "4549.0" -> "4549"), as the sync's precomputed stats match them
+        campaignsLookup[canonicalId(contractorId)] = contractorData.campaign_data;
       }
     });
     
     // Process contractors for stats (faster processing)
     const contractors = parsed.data.map((row: any) => {
-      const businessId = String(row['business_id']).replace(/^0+/, '').trim();
+      const businessId = canonicalId(row['business_id']);
       const campaignData = campaignsLookup[businessId];
       
       // Determine campaign status
@@ -2,6 +2,7 @@ import { NextRequest, NextResponse } from 'next/server';
 import Papa from 'papaparse';
 import fs from 'fs/promises';
 import path from 'path';
+import { writeFileAtomic } from '@/lib/utils/write-atomic';
 
 // Cache for CSV data to avoid re-parsing
 let csvCache: any[] | null = null;
@@ -164,7 +165,7 @@ export async function PATCH(request: NextRequest) {
     const updatedCsv = Papa.unparse(parsed.data);
     
     // Write back to file
-    await fs.writeFile(csvPath, updatedCsv, 'utf-8');
+    await writeFileAtomic(csvPath, updatedCsv, 'utf-8');
     
     // Clear cache to force reload
     csvCache = null;
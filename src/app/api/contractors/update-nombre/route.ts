@@ -1,6 +1,8 @@
 import { NextRequest, NextResponse } from 'next/server';
 import fs from 'fs/promises';
 import path from 'path';
+import { canonicalId } from '@/lib/utils/canonical-id';
+import { writeFileAtomic } from '@/lib/utils/write-atomic';
 
 interface NombreChanges {
   changes: { [contractorId: string]: string };
@@ -8,6 +10,16 @@ interface NombreChanges {
   version: string;
 }
 
+// Concurrent PATCHes read-modify-write the same file: run them one after another
+// and replace the file by rename (writeFileAtomic) so readers never see it half written
+let pendingWrite: Promise<unknown> = Promise.resolve();
+
+function serialized<T>(task: () => Promise<T>): Promise<T> {
+  const result = pendingWrite.then(task, task);
+  pendingWrite = result.catch(() => undefined);
+  return result;
+}
+
 export async function PATCH(request: NextRequest) {
   try {
     const { id, nombre } = await request.json();
@@ -18,35 +30,45 @@ export async function PATCH(request: NextRequest) {
 
     console.log(`Saving nombre change for contractor ${id}: "${nombre || ''}"`);
 
-    // Read existing changes
     const changesPath = path.join(process.cwd(), 'public', 'data', 'nombre_changes.json');
-    let changesData: NombreChanges;
+    const normalizedId = canonicalId(id);
+
+    await serialized(async () => {
+      // Read existing changes
+      let changesData: NombreChanges;
     
-    try {
-      const existingContent = await fs.readFile(changesPath, 'utf-8');
-      changesData = JSON.parse(existingContent);
-    } catch (error) {
-      // Create new structure if file doesn't exist
-      changesData = {
-        changes: {},
-        last_updated: null,
-        version: "1.0"
-      };
-    }
+      try {
+        const existingContent = await fs.readFile(changesPath, 'utf-8');
+        changesData = JSON.parse(existingContent);
+      } catch (error) {
+        // Create new structure if file doesn't exist
+        changesData = {
+          changes: {},
+          last_updated: null,
+          version: "1.0"
+        };
+      }
 
-    // Update the change
-    const normalizedId = String(id).trim();
-    if (nombre && nombre.trim()) {
-      changesData.changes[normalizedId] = nombre.trim();
-    } else {
-      // Remove the entry if nombre is empty
-      delete changesData.changes[normalizedId];
-    }
+      // One entry per contractor: drop older entries saved under another spelling of the id
+      for (const key of Object.keys(changesData.changes)) {
+        if (key !== normalizedId && canonicalId(key) === normalizedId) {
+          delete changesData.changes[key];
+        }
+      }
+
+      // Update the change
+      if (nombre && nombre.trim()) {
+        changesData.changes[normalizedId] = nombre.trim();
+      } else {
+        // Remove the entry if nombre is empty
+        delete changesData.changes[normalizedId];
+      }
     
-    changesData.last_updated = new Date().toISOString();
+      changesData.last_updated = new Date().toISOString();
 
-    // Save changes
-    await fs.writeFile(changesPath, JSON.stringify(changesData, null, 2), 'utf-8');
+      // Save changes
+      await writeFileAtomic(changesPath, JSON.stringify(changesData, null, 2));
+    });
     console.log(`Saved nombre change to temporary storage: ${normalizedId} = "${nombre || ''}"`);
 
     return NextResponse.json({ 
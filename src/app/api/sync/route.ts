@@ -5,33 +5,110 @@ import path from 'path';
 
 const execAsync = promisify(exec);
 
+// Long-lived sync service (scripts/sync_service.py). When it cannot be reached we
+// fall back to spawning python3 per request.
+const SYNC_SERVICE_URL = process.env.SYNC_SERVICE_URL || 'http://127.0.0.1:8765';
+
+// The service answered with an error: returned to the caller as it is, never retried
+class SyncServiceError extends Error {
+  status: number;
+  body: string;
+  contentType: string | null;
+
+  constructor(status: number, body: string, contentType: string | null) {
+    super(`Sync service responded ${status}: ${body}`);
+    this.name = 'SyncServiceError';
+    this.status = status;
+    this.body = body;
+    this.contentType = contentType;
+  }
+
+  toResponse(): NextResponse {
+    return new NextResponse(this.body, {
+      status: this.status,
+      headers: this.contentType ? { 'Content-Type': this.contentType } : undefined
+    });
+  }
+}
+
+async function runSyncCommand(args: string[], timeout: number): Promise<{ stdout: string; stderr: string }> {
+  let response: Response | null = null;
+  try {
+    response = await fetch(`${SYNC_SERVICE_URL}/run`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ args }),
+      signal: AbortSignal.timeout(timeout),
+      cache: 'no-store'
+    });
+  } catch (error) {
+    // A timeout means the service took the command - don't run it a second time
+    if (error instanceof Error && error.name === 'TimeoutError') {
+      throw error;
+    }
+    // Service not reachable (connection refused, ...) - use the one-shot script instead
+    response = null;
+  }
+
+  if (response) {
+    // The service got the command: running it again here would repeat it
+    if (!response.ok) {
+      throw new SyncServiceError(response.status, await response.text(), response.headers.get('Content-Type'));
+    }
+    const result = await response.json();
+    if (result.exit_code !== 0) {
+      throw new Error(`Sync service command failed (exit ${result.exit_code}): ${result.output}`);
+    }
+    return { stdout: result.output, stderr: '' };
+  }
+
+  const syncScriptPath = path.join(process.cwd(), 'scripts', 'sync_system.py');
+  const command = `python3 "${syncScriptPath}" ${args.join(' ')}`;
+  console.log('Executing sync command:', command);
+  return execAsync(command, { timeout });
+}
+
+// Sync commands end their output with one "SYNC_METRICS {json}" line: per-stage
+// wall time, bytes read/written, rows/campaigns processed, peak memory, backup cost
+const METRICS_PREFIX = 'SYNC_METRICS ';
+
+function parseSyncMetrics(stdout: string): Record<string, unknown> | null {
+  const line = stdout.split('\n').reverse().find((candidate) => candidate.startsWith(METRICS_PREFIX));
+  if (!line) {
+    return null;
+  }
+  try {
+    return JSON.parse(line.slice(METRICS_PREFIX.length));
+  } catch (error) {
+    return null;
+  }
+}
+
 export async function POST(request: NextRequest) {
   try {
     const { action } = await request.json();
     
-    const syncScriptPath = path.join(process.cwd(), 'scripts', 'sync_system.py');
-    
-    let command = '';
+    let args: string[] = [];
     let description = '';
     
     switch (action) {
       case 'csv':
-        command = `python3 "${syncScriptPath}" --sync-master-to-working`;
+        args = ['--sync-master-to-working'];
         description = 'Syncing Master CSV to Working CSV';
         break;
       
       case 'campaigns':
-        command = `python3 "${syncScriptPath}" --sync-campaigns`;
+        args = ['--sync-campaigns'];
         description = 'Syncing Campaign JSON files';
         break;
       
       case 'full':
-        command = `python3 "${syncScriptPath}" --full-sync`;
+        args = ['--full-sync'];
         description = 'Performing full system sync';
         break;
       
       case 'status':
-        command = `python3 "${syncScriptPath}" --status`;
+        args = ['--status'];
         description = 'Getting system status';
         break;
       
@@ -40,9 +117,8 @@ export async function POST(request: NextRequest) {
     }
     
     console.log(`🔄 ${description}...`);
-    console.log('Executing sync command:', command);
     
-    const { stdout, stderr } = await execAsync(command, { timeout: 30000 });
+    const { stdout, stderr } = await runSyncCommand(args, 30000);
     
     if (stderr) {
       console.error('Sync script stderr:', stderr);
@@ -50,16 +126,25 @@ export async function POST(request: NextRequest) {
     
     console.log('Sync script output:', stdout);
     
+    const metrics = parseSyncMetrics(stdout);
+    if (metrics) {
+      console.log(`⏱️ ${metrics.operation}: ${metrics.wall_seconds}s`, JSON.stringify(metrics.stages));
+    }
+    
     return NextResponse.json({ 
       success: true, 
       message: `${description} completed successfully`,
       action,
       output: stdout,
+      metrics,
       stderr: stderr || null
     });
 
   } catch (error) {
     console.error('Error in sync operation:', error);
+    if (error instanceof SyncServiceError) {
+      return error.toResponse();
+    }
     return NextResponse.json(
       { error: 'Sync operation failed', details: error instanceof Error ? error.message : 'Unknown error' },
       { status: 500 }
@@ -67,22 +152,69 @@ export async function POST(request: NextRequest) {
   }
 }
 
-// GET endpoint for quick status check
-export async function GET() {
+// GET endpoint for quick status check (the status sidecar as JSON, see scripts/sync_status.py)
+// GET ?since=N returns the change feed delta since revision N instead
+// ({ full_reload: true } when the client is too far behind)
+// GET ?from=YYYY-MM-DD&to=YYYY-MM-DD returns the campaign emails due in that window
+// (&merged=1 reads the merged campaigns, see scripts/sync_schedule.py)
+export async function GET(request: NextRequest) {
+  const from = request.nextUrl.searchParams.get('from');
+  const to = request.nextUrl.searchParams.get('to');
+  if (from !== null || to !== null) {
+    const isDay = (value: string | null) => value !== null && /^\d{4}-\d{2}-\d{2}$/.test(value);
+    if (!isDay(from) || !isDay(to) || from! > to!) {
+      return NextResponse.json({ error: 'Invalid date window' }, { status: 400 });
+    }
+    const merged = request.nextUrl.searchParams.get('merged') === '1' ? ['--merged'] : [];
+    try {
+      const { stdout } = await runSyncCommand(['--schedule', from!, to!, ...merged], 15000);
+      return NextResponse.json({ success: true, ...JSON.parse(stdout) });
+    } catch (error) {
+      console.error('Error reading campaign schedule:', error);
+      if (error instanceof SyncServiceError) {
+        return error.toResponse();
+      }
+      return NextResponse.json(
+        { error: 'Failed to read campaign schedule', details: error instanceof Error ? error.message : 'Unknown error' },
+        { status: 500 }
+      );
+    }
+  }
+
+  const since = request.nextUrl.searchParams.get('since');
+  if (since !== null) {
+    if (!/^\d+$/.test(since)) {
+      return NextResponse.json({ error: 'Invalid revision' }, { status: 400 });
+    }
+    try {
+      const { stdout } = await runSyncCommand(['--changes-since', since], 15000);
+      return NextResponse.json({ success: true, ...JSON.parse(stdout) });
+    } catch (error) {
+      console.error('Error reading change feed:', error);
+      if (error instanceof SyncServiceError) {
+        return error.toResponse();
+      }
+      return NextResponse.json(
+        { error: 'Failed to read change feed', details: error instanceof Error ? error.message : 'Unknown error' },
+        { status: 500 }
+      );
+    }
+  }
+
   try {
-    const syncScriptPath = path.join(process.cwd(), 'scripts', 'sync_system.py');
-    const command = `python3 "${syncScriptPath}" --status`;
-    
-    const { stdout, stderr } = await execAsync(command, { timeout: 15000 });
+    const { stdout, stderr } = await runSyncCommand(['--status', '--json'], 15000);
     
     return NextResponse.json({ 
       success: true, 
-      status: stdout,
+      status: JSON.parse(stdout),
       stderr: stderr || null
     });
 
   } catch (error) {
     console.error('Error getting sync status:', error);
+    if (error instanceof SyncServiceError) {
+      return error.toResponse();
+    }
     return NextResponse.json(
       { error: 'Failed to get sync status', details: error instanceof Error ? error.message : 'Unknown error' },
       { status: 500 }
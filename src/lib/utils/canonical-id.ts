@@ -0,0 +1,16 @@
+// Same rule as canonical_id in scripts/sync_contractor_index.py (the only Python
+// normalizer): numeric ids by value ("04549", "4549.0" -> "4549"), anything else
+// as trimmed text. Keep the two in sync: the sync's precomputed stats and
+// nombre_changes.json keys are matched against this in the app.
+const NUMERIC_ID = /^[+-]?(\d+\.?\d*|\.\d+)(e[+-]?\d+)?$/i;
+
+export function canonicalId(id: unknown): string {
+  const text = String(id).trim();
+  if (NUMERIC_ID.test(text)) {
+    const value = Number(text);
+    if (Number.isSafeInteger(value)) {
+      return String(value);
+    }
+  }
+  return text;
+}
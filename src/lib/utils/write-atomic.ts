@@ -0,0 +1,15 @@
+import fs from 'fs/promises';
+
+// The sync scripts publish data files as hardlinks shared between locations,
+// so they must be replaced (temp file + rename), never rewritten in place.
+// Readers also never see a half-written file this way.
+export async function writeFileAtomic(filePath: string, data: string, encoding: BufferEncoding = 'utf-8') {
+  const tmpPath = `${filePath}.tmp-${process.pid}`;
+  try {
+    await fs.writeFile(tmpPath, data, encoding);
+    await fs.rename(tmpPath, filePath);
+  } catch (error) {
+    await fs.rm(tmpPath, { force: true });
+    throw error;
+  }
+}